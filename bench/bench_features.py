@@ -0,0 +1,98 @@
+# bench/bench_features.py
+"""
+Checks the vectorized add_features against the original per-group lambda
+implementation and times both on multi-season synthetic data.
+
+The team and opponent windows changed meaning in feature version 2, so those
+two columns are checked against previous_games_reference instead.
+
+    python -m bench.bench_features --seasons 7 --players 2000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from bench.report import best_of
+from bench.synthetic import weekly_data
+from src.features import add_features
+
+
+def add_features_reference(df: pd.DataFrame) -> pd.DataFrame:
+    """add_features as it was before vectorization, kept as the equivalence oracle."""
+    df = df.copy()
+    df["fp"] = df["fantasy_points_ppr"]
+    df["touches"] = df["carries"].fillna(0) + df["targets"].fillna(0)
+    df["fp_per_touch"] = df["fp"] / df["touches"].replace(0, np.nan)
+
+    df["roll_touch3"] = (
+        df.groupby("player_id")["touches"]
+          .transform(lambda s: s.shift().rolling(3, min_periods=1).mean())
+    )
+    df["roll_fppt3"] = (
+        df.groupby("player_id")["fp_per_touch"]
+          .transform(lambda s: s.shift().rolling(3, min_periods=1).mean())
+    )
+    df["team_rb_fp5"] = (
+        df.groupby("recent_team")["fp"]
+          .transform(lambda s: s.shift().rolling(5, min_periods=1).mean())
+    )
+    df["opp_rb_fp5"] = (
+        df.groupby("opponent_team")["fp"]
+          .transform(lambda s: s.shift().rolling(5, min_periods=1).mean())
+    )
+    df["team_change"] = (
+        df.groupby("player_id")["recent_team"]
+          .transform(lambda s: (s != s.shift()).astype(int))
+    )
+    df["games_with_team"] = (
+        df.groupby(["player_id", "recent_team"]).cumcount() + 1
+    )
+    df["games_since"] = (
+        df.groupby("player_id")["week"].diff().fillna(1)
+    )
+    return df
+
+
+def previous_games_reference(df: pd.DataFrame, key: str, window: int) -> np.ndarray:
+    """
+    Feature version 2 team windows: mean fp over every row of the group's
+    previous ``window`` (season, week) games, via a per-game groupby.
+    """
+    fp = df["fantasy_points_ppr"].astype(float)
+    games = fp.groupby([df[key], df["season"], df["week"]]).agg(["sum", "count"])
+    prev = games.groupby(level=0).transform(
+        lambda s: s.shift().rolling(window, min_periods=1).sum())
+    means = (prev["sum"] / prev["count"]).where(prev["count"] > 0)
+    return means.reindex(pd.MultiIndex.from_frame(df[[key, "season", "week"]])).to_numpy()
+
+
+def check_equivalence(wk: pd.DataFrame):
+    """Raises if add_features disagrees with the oracles on ``wk``."""
+    got, ref = add_features(wk), add_features_reference(wk)
+    team_windows = {"team_rb_fp5": "recent_team", "opp_rb_fp5": "opponent_team"}
+    pd.testing.assert_frame_equal(got.drop(columns=list(team_windows)),
+                                  ref.drop(columns=list(team_windows)),
+                                  check_exact=False, rtol=1e-12, check_dtype=False)
+    for column, key in team_windows.items():
+        np.testing.assert_allclose(got[column].to_numpy(), previous_games_reference(wk, key, 5),
+                                   rtol=1e-12, err_msg=column)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=7)
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    wk = weekly_data(range(2018, 2018 + args.seasons), n_players=args.players)
+    check_equivalence(wk)
+
+    ref = best_of(lambda: add_features_reference(wk), args.repeat)
+    vec = best_of(lambda: add_features(wk), args.repeat)
+    print(f"rows={len(wk)}  reference={ref:.3f}s  vectorized={vec:.3f}s  speedup={ref / vec:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# bench/bench_memory.py
+"""
+Resident size of multi-season weekly data as downloaded vs as load_weekly keeps it.
+
+    python -m bench.bench_memory --seasons 7 --players 2000
+"""
+import argparse
+
+import pandas as pd
+
+from bench.report import write_report
+from bench.synthetic import weekly_data
+from src.data_utils import compact
+from src.feature_store import FeatureStore
+from src.features import add_features
+
+
+def deep_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=7)
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    seasons = range(2024 - args.seasons + 1, 2025)
+    frames = [weekly_data([s], n_players=args.players, seed=args.seed + s) for s in seasons]
+    raw = pd.concat(frames, ignore_index=True)
+    small = pd.concat([compact(f) for f in frames], ignore_index=True)
+    results = {
+        "rows": len(raw),
+        "weekly_raw_mb": deep_mb(raw),
+        "weekly_compact_mb": deep_mb(small),
+        "reduction": deep_mb(raw) / deep_mb(small),
+        "store_raw_mb": deep_mb(FeatureStore(add_features(raw)).df),
+        "store_compact_mb": deep_mb(FeatureStore(add_features(small)).df),
+    }
+    write_report("memory", vars(args), results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# bench/bench_micro.py
+"""
+Micro-benchmarks for the hot paths, run entirely offline on synthetic data.
+
+    python -m bench.bench_micro --out bench/results/micro.json
+
+- add_features over multi-season weekly data
+- extract_prediction_request on id-only and name-based chat messages
+- scoring N players one /predict-style row at a time vs one batch call
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from bench.report import best_of, latency_summary, write_report
+from bench.synthetic import rosters, weekly_data, write_bundle
+from src.chat_utils import extract_prediction_request
+from src.feature_store import FeatureStore
+from src.features import add_features, windows_for
+from src.player_index import PlayerIndex
+
+MESSAGES_BY_ID = [
+    "Predict fantasy points for player {pid} in season 2024 week 5",
+    "What are the expected points for player {pid}, 2024 season, week 12?",
+    "How many points will {pid} score in week 3 of 2024?",
+]
+MESSAGES_BY_NAME = [
+    "Predict {name} week 5",
+    "How will {last} do in week 8 of 2024?",
+    "compare {name} and {other} for week 2",
+]
+GENERAL_MESSAGES = [
+    "What factors affect fantasy football performance?",
+    "What's the difference between PPR and standard scoring?",
+]
+
+
+def per_call(fn, inputs, repeat):
+    """Per-call latencies (seconds) over ``repeat`` passes through ``inputs``."""
+    times = []
+    for _ in range(repeat):
+        for item in inputs:
+            t0 = time.perf_counter()
+            fn(item)
+            times.append(time.perf_counter() - t0)
+    return times
+
+
+def bench_add_features(wk, repeat):
+    seconds = best_of(lambda: add_features(wk), repeat)
+    return {"rows": len(wk), "best_s": seconds, "rows_per_s": len(wk) / seconds}
+
+
+def bench_extract(wk, repeat, seed):
+    rng = np.random.default_rng(seed)
+    index = PlayerIndex.from_frames(wk, rosters(wk))
+    players = wk.drop_duplicates("player_id")
+    picks = players.iloc[rng.integers(0, len(players), 50)]
+    names = picks["player_display_name"].tolist()
+
+    by_id = [m.format(pid=pid.split("-")[-1].lstrip("0") or "0")
+             for m in MESSAGES_BY_ID for pid in picks["player_id"]]
+    by_name = [m.format(name=n, last=n.split()[-1], other=names[(i + 1) % len(names)])
+               for m in MESSAGES_BY_NAME for i, n in enumerate(names)]
+
+    results = {}
+    for label, messages, idx in [("ids", by_id, None), ("names", by_name, index),
+                                 ("general", GENERAL_MESSAGES * 25, index)]:
+        times = per_call(lambda m: extract_prediction_request(m, idx, 2024), messages, repeat)
+        results[label] = latency_summary(times)
+    return results
+
+
+def bench_inference(wk, n, repeat, seed, models_dir):
+    # Imported here: src.server pulls in FastAPI; the bundle loads on first use
+    from src.server import _score_batch, _score_row, registry
+
+    # A bundle trained on the same synthetic data, not whatever models/CURRENT names
+    write_bundle(models_dir, wk)
+    registry.models_dir = Path(models_dir)
+    model = registry.load()
+    store = FeatureStore(add_features(wk, *windows_for(model.op_features + model.eff_features)))
+    usable = ~store.df[model.op_features + model.eff_features].isna().any(axis=1).to_numpy()
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(np.flatnonzero(usable), size=min(n, int(usable.sum())), replace=False)
+    keys = list(zip(store.df["player_id"].iloc[rows], store.df["season"].iloc[rows],
+                    store.df["week"].iloc[rows]))
+
+    def one_at_a_time():
+        # What n separate /predict calls do, minus HTTP and the result cache
+        for key in keys:
+            _score_row(model, store, store.position(*key), key[1])
+
+    def batch():
+        # What one /predict/batch call does, minus HTTP
+        pos = np.asarray(store.positions(keys))
+        feat = store.df.iloc[pos]
+        _score_batch(feat, pos >= 0, [None] * len(keys))
+
+    single = best_of(one_at_a_time, repeat)
+    batched = best_of(batch, repeat)
+    return {"players": len(keys), "model_version": model.version,
+            "single_s": single, "batch_s": batched,
+            "single_per_player_us": single / len(keys) * 1e6,
+            "batch_per_player_us": batched / len(keys) * 1e6,
+            "speedup": single / batched}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=7)
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", choices=["add_features", "extract", "inference"],
+                        action="append", help="run a subset (repeatable)")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    wk = weekly_data(range(2024 - args.seasons + 1, 2025), n_players=args.players, seed=args.seed)
+    only = set(args.only or ["add_features", "extract", "inference"])
+    results = {}
+    if "add_features" in only:
+        results["add_features"] = bench_add_features(wk, args.repeat)
+    if "extract" in only:
+        results["extract_prediction_request"] = bench_extract(wk, args.repeat, args.seed)
+    if "inference" in only:
+        with tempfile.TemporaryDirectory() as models_dir:
+            results["inference"] = bench_inference(wk, args.batch_size, args.repeat, args.seed,
+                                                   models_dir)
+    write_report("micro", vars(args), results, args.out)
+
+
+if __name__ == "__main__":
+    main()
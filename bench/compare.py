@@ -0,0 +1,78 @@
+# bench/compare.py
+"""
+Compares two benchmark JSON reports metric by metric.
+
+    python -m bench.compare bench/results/before.json bench/results/after.json
+
+Prints every numeric result present in both files with the relative change.
+Timings (``*_s``, ``*_ms``, ``*_us``) should go down and throughputs
+(``*_per_s``, ``*_rps``, ``speedup``) up; anything past ``--threshold`` in
+the wrong direction is flagged and makes the exit status non-zero.
+"""
+import argparse
+import json
+import sys
+
+LOWER_IS_BETTER = ("_s", "_ms", "_us", "error_rate")
+HIGHER_IS_BETTER = ("_per_s", "_rps", "speedup")
+
+
+def _flatten(d, prefix=""):
+    for key, value in d.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from _flatten(value, name)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, float(value)
+
+
+def _direction(name):
+    leaf = name.rsplit(".", 1)[-1]
+    if leaf.endswith(HIGHER_IS_BETTER):
+        return 1
+    if leaf.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(before: dict, after: dict, threshold: float):
+    old = dict(_flatten(before["results"]))
+    new = dict(_flatten(after["results"]))
+    regressions = []
+    for name in old:
+        if name not in new:
+            continue
+        a, b = old[name], new[name]
+        change = (b - a) / a if a else 0.0
+        direction = _direction(name)
+        flag = direction and change * direction < -threshold
+        if flag:
+            regressions.append(name)
+        print(f"{'!!' if flag else '  '} {name:<55} {a:>14.4g} -> {b:<14.4g} {change:+8.1%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative change counted as a regression (default 10%%)")
+    args = parser.parse_args()
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    print(f"{before['environment'].get('commit')} -> {after['environment'].get('commit')}")
+    config_a = {k: v for k, v in before.get("config", {}).items() if k != "out"}
+    config_b = {k: v for k, v in after.get("config", {}).items() if k != "out"}
+    if config_a != config_b:
+        print("warning: the two runs used different settings; numbers may not be comparable")
+    regressions = compare(before, after, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
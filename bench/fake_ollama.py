@@ -0,0 +1,139 @@
+# bench/fake_ollama.py
+"""
+A stand-in for the Ollama HTTP API so the chat path can be exercised and timed
+without a GPU or a downloaded model.
+
+    python -m bench.fake_ollama --port 11435 --tokens 40 --token-delay 0.01
+    OLLAMA_HOST=http://localhost:11435 streamlit run projects_app.py
+
+Implements /api/tags, /api/chat and /api/generate, streaming NDJSON chunks the
+same shape as Ollama's. Replies are canned text, so latency is the only thing
+being measured.
+"""
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.chat_utils import OLLAMA_MODEL
+
+REPLY = ("Based on the model, this player projects for a solid week. Volume has been "
+         "steady and the matchup is about average, so treat the number as a baseline. ")
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Chunks are tiny; without this Nagle holds each one back ~40ms and skews time-to-first-token
+    disable_nagle_algorithm = True
+    # Set by serve(): load_delay, token_delay, tokens
+    config = {}
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._json(200, {"models": [{"name": OLLAMA_MODEL, "model": OLLAMA_MODEL,
+                                         "modified_at": _now(), "size": 0}]})
+        elif self.path in ("/", "/api/version"):
+            self._json(200, {"version": "0.0.0-fake"})
+        else:
+            self._json(404, {"error": "not found"})
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        if self.path not in ("/api/chat", "/api/generate"):
+            self._json(404, {"error": "not found"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        req = json.loads(self.rfile.read(length) or b"{}")
+        chat = self.path == "/api/chat"
+        cfg = self.config
+
+        limit = (req.get("options") or {}).get("num_predict")
+        n_tokens = cfg["tokens"] if not limit or limit < 0 else min(limit, cfg["tokens"])
+        words = (REPLY * (n_tokens // len(REPLY.split()) + 1)).split()[:n_tokens]
+        time.sleep(cfg["load_delay"])
+
+        def chunk(text, done):
+            out = {"model": req.get("model", OLLAMA_MODEL), "created_at": _now(), "done": done}
+            if chat:
+                out["message"] = {"role": "assistant", "content": text}
+            else:
+                out["response"] = text
+            if done:
+                out.update(done_reason="stop", eval_count=len(words), prompt_eval_count=0)
+            return out
+
+        if not req.get("stream", True):
+            time.sleep(cfg["token_delay"] * len(words))
+            self._json(200, chunk(" ".join(words), True))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, word in enumerate(words):
+            time.sleep(cfg["token_delay"])
+            self._write_chunk(chunk(word if i == 0 else " " + word, False))
+        self._write_chunk(chunk("", True))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, payload):
+        data = json.dumps(payload).encode() + b"\n"
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+def serve(host: str = "127.0.0.1", port: int = 11435, tokens: int = 40,
+          token_delay: float = 0.01, load_delay: float = 0.0, background: bool = False):
+    """Starts the fake server; with ``background`` it runs in a daemon thread and is returned."""
+    handler = type("Handler", (FakeOllamaHandler,), {"config": {
+        "tokens": tokens, "token_delay": token_delay, "load_delay": load_delay}})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    if background:
+        threading.Thread(target=server.serve_forever, name="fake-ollama", daemon=True).start()
+        return server
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--tokens", type=int, default=40, help="words per streamed reply")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="seconds between chunks")
+    parser.add_argument("--load-delay", type=float, default=0.0,
+                        help="seconds before the first chunk (model load / prompt prefill)")
+    args = parser.parse_args()
+    print(f"Fake Ollama on http://{args.host}:{args.port}")
+    serve(args.host, args.port, args.tokens, args.token_delay, args.load_delay)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# bench/import_time.py
+"""
+Import-time profile of the service entry points, via ``python -X importtime``.
+
+    python -m bench.import_time --out bench/results/import.json
+
+Each module is imported in a fresh interpreter ``--repeat`` times; the best
+run is kept. Reports the module's cumulative import time, the interpreter's
+wall time, and the slowest imports underneath it, so a heavy dependency
+creeping back into the import path shows up in bench.compare.
+"""
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from bench.report import write_report
+
+MODULES = ["src.server", "src.chat_utils", "src.feature_store"]
+
+
+def import_profile(module: str):
+    """(wall seconds, [(name, self_us, cumulative_us)] in import order) for one fresh import."""
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, cwd=Path(__file__).parent.parent)
+    wall = time.perf_counter() - t0
+    if proc.returncode:
+        raise SystemExit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return wall, rows
+
+
+def profile_module(module: str, repeat: int, top: int) -> dict:
+    best = None
+    for _ in range(repeat):
+        wall, rows = import_profile(module)
+        total = next(c for name, _, c in rows if name == module)
+        if best is None or total < best[1]:
+            best = (wall, total, rows)
+    wall, total, rows = best
+    # Slowest packages by cumulative time, not counting the module itself
+    slowest = sorted((r for r in rows if r[0] != module and "." not in r[0]),
+                     key=lambda r: r[2], reverse=True)[:top]
+    return {"import_s": total / 1e6, "interpreter_wall_s": wall,
+            "modules_imported": len(rows),
+            "slowest": [{"module": name, "cumulative_ms": c / 1000, "self_ms": s / 1000}
+                        for name, s, c in slowest]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest top-level packages to list")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+    results = {m: profile_module(m, args.repeat, args.top) for m in args.modules}
+    write_report("import_time", vars(args), results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# bench/load_test.py
+"""
+HTTP load generator for the prediction API: throughput and p50/p95/p99 latency.
+
+    # self-contained: synthetic data, a fresh uvicorn server, no network
+    python -m bench.load_test --serve --concurrency 8 --requests 5000 --out bench/results/load.json
+
+    # against a running server whose NFL_CACHE_DIR is data/bench
+    python -m bench.load_test --url http://localhost:8000 --cache-dir data/bench
+
+Keys are drawn from the weekly data the server is serving, so every request
+hits real rows. Only the standard library is used on the request path.
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from bench.report import latency_summary, write_report
+from bench.synthetic import write_bundle, write_cache
+
+
+def load_keys(cache_dir: Path):
+    frames = [pd.read_parquet(p, columns=["player_id", "season", "week"])
+              for p in sorted(Path(cache_dir).glob("weekly_*.parquet"))]
+    if not frames:
+        raise SystemExit(f"No weekly_*.parquet files in {cache_dir}")
+    df = pd.concat(frames, ignore_index=True)
+    return [(pid.item() if hasattr(pid, "item") else pid, int(s), int(w))
+            for pid, s, w in df.itertuples(index=False)]
+
+
+def make_bodies(keys, endpoint: str, n: int, batch_size: int, seed: int):
+    """Pre-encodes every request body so the generator measures the server, not json.dumps."""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(keys), n * (batch_size if endpoint == "batch" else 1))
+    if endpoint == "batch":
+        return [json.dumps({"items": [dict(zip(("player_id", "season", "week"), keys[j]))
+                                      for j in picks[i * batch_size:(i + 1) * batch_size]]}).encode()
+                for i in range(n)]
+    return [json.dumps(dict(zip(("player_id", "season", "week"), keys[j]))).encode() for j in picks]
+
+
+class Worker(threading.Thread):
+    """One keep-alive connection sending requests back to back until the shared queue is drained."""
+
+    def __init__(self, host, port, path, bodies, cursor, lock, deadline):
+        super().__init__(daemon=True)
+        self.conn_args = (host, port)
+        self.path = path
+        self.bodies = bodies
+        self.cursor = cursor
+        self.lock = lock
+        self.deadline = deadline
+        self.latencies = []
+        self.statuses = Counter()
+
+    def _next(self):
+        with self.lock:
+            i = self.cursor[0]
+            self.cursor[0] += 1
+        if self.deadline is not None:
+            if time.perf_counter() > self.deadline:
+                return None
+            return self.bodies[i % len(self.bodies)]
+        return self.bodies[i] if i < len(self.bodies) else None
+
+    def run(self):
+        conn = http.client.HTTPConnection(*self.conn_args, timeout=30)
+        headers = {"Content-Type": "application/json"}
+        while True:
+            body = self._next()
+            if body is None:
+                break
+            t0 = time.perf_counter()
+            try:
+                conn.request("POST", self.path, body, headers)
+                resp = conn.getresponse()
+                resp.read()
+                status = resp.status
+            except (OSError, http.client.HTTPException) as e:
+                status = type(e).__name__
+                conn.close()
+                conn = http.client.HTTPConnection(*self.conn_args, timeout=30)
+            self.latencies.append(time.perf_counter() - t0)
+            self.statuses[status] += 1
+        conn.close()
+
+
+def run_load(url, endpoint, bodies, concurrency, duration=None, warmup=0):
+    parts = urlsplit(url)
+    path = {"predict": "/predict", "batch": "/predict/batch"}[endpoint]
+    lock = threading.Lock()
+
+    if warmup:
+        w = Worker(parts.hostname, parts.port or 80, path, bodies[:warmup], [0], lock, None)
+        w.run()
+
+    cursor = [0]
+    deadline = time.perf_counter() + duration if duration else None
+    workers = [Worker(parts.hostname, parts.port or 80, path, bodies, cursor, lock, deadline)
+               for _ in range(concurrency)]
+    t0 = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    wall = time.perf_counter() - t0
+
+    latencies = [x for w in workers for x in w.latencies]
+    statuses = Counter()
+    for w in workers:
+        statuses.update(w.statuses)
+    ok = statuses.get(200, 0)
+    return {"requests": len(latencies), "wall_s": wall,
+            "throughput_rps": len(latencies) / wall if wall else 0.0,
+            "ok": ok, "error_rate": 1 - ok / len(latencies) if latencies else 0.0,
+            "statuses": {str(k): v for k, v in sorted(statuses.items(), key=str)},
+            "latency": latency_summary(latencies)}
+
+
+def _wait_ready(url, proc, timeout=60):
+    parts = urlsplit(url)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"Server exited with code {proc.returncode}")
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=2)
+            # /readyz, not /healthz: don't time requests that wait for the warm-up
+            conn.request("GET", "/readyz")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit("Server did not become ready in time")
+
+
+def start_server(workdir: Path, seasons, players, seed, port, cache_size):
+    """Writes synthetic data and a bundle into ``workdir`` and serves them with uvicorn, offline."""
+    cache_dir = workdir / "weekly"
+    wk = write_cache(cache_dir, seasons, n_players=players, seed=seed)
+    write_bundle(workdir / "models", wk)
+    env = dict(os.environ,
+               NFL_CACHE_DIR=str(cache_dir), NFL_OFFLINE="1",
+               NFL_MODELS_DIR=str(workdir / "models"),
+               NFL_FEATURE_PATH=str(workdir / "features.parquet"),
+               NFL_WARM_SEASONS=",".join(str(s) for s in seasons),
+               PREDICT_CACHE_SIZE=str(cache_size))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.server:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=Path(__file__).parent.parent, env=env)
+    return cache_dir, proc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--endpoint", choices=["predict", "batch"], default="predict")
+    parser.add_argument("--batch-size", type=int, default=50, help="items per /predict/batch call")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--duration", type=float,
+                        help="run for this many seconds instead of a fixed request count")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache-dir", type=Path, help="weekly_*.parquet the server is serving")
+    parser.add_argument("--serve", action="store_true",
+                        help="start a local server on synthetic data (ignores --url/--cache-dir)")
+    parser.add_argument("--seasons", default="2023,2024", help="synthetic seasons for --serve")
+    parser.add_argument("--players", type=int, default=600, help="synthetic players for --serve")
+    parser.add_argument("--port", type=int, default=8765, help="port for --serve")
+    parser.add_argument("--server-cache-size", type=int, default=0,
+                        help="PREDICT_CACHE_SIZE for --serve; 0 measures uncached predictions")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    proc = None
+    tmp = None
+    try:
+        if args.serve:
+            tmp = tempfile.TemporaryDirectory(prefix="predictor-bench-")
+            seasons = [int(s) for s in args.seasons.split(",")]
+            args.url = f"http://127.0.0.1:{args.port}"
+            args.cache_dir, proc = start_server(Path(tmp.name), seasons, args.players,
+                                                args.seed, args.port, args.server_cache_size)
+            _wait_ready(args.url, proc)
+        if args.cache_dir is None:
+            parser.error("--cache-dir is required unless --serve is given")
+
+        keys = load_keys(args.cache_dir)
+        n = args.requests if not args.duration else max(args.requests, 10_000)
+        bodies = make_bodies(keys, args.endpoint, n, args.batch_size, args.seed)
+        results = run_load(args.url, args.endpoint, bodies, args.concurrency,
+                           args.duration, args.warmup)
+        if args.endpoint == "batch":
+            results["predictions_per_s"] = results["throughput_rps"] * args.batch_size
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+        if tmp is not None:
+            tmp.cleanup()
+
+    config = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+    write_report("load_test", config, results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# bench/synthetic.py
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+TEAMS = [
+    "ARI", "ATL", "BAL", "BUF", "CAR", "CHI", "CIN", "CLE", "DAL", "DEN", "DET",
+    "GB", "HOU", "IND", "JAX", "KC", "LA", "LAC", "LV", "MIA", "MIN", "NE", "NO",
+    "NYG", "NYJ", "PHI", "PIT", "SEA", "SF", "TB", "TEN", "WAS",
+]
+POSITIONS = ["QB", "RB", "WR", "TE"]
+FIRST_NAMES = [
+    "Aaron", "Bijan", "Breece", "Calvin", "Christian", "Cooper", "Dalvin", "Davante",
+    "DeVon", "Derrick", "Garrett", "Isiah", "Jahmyr", "Jalen", "Jamarr", "Jaylen",
+    "Joe", "Jonathan", "Josh", "Justin", "Kenneth", "Kyren", "Lamar", "Marvin",
+    "Mike", "Najee", "Nico", "Patrick", "Puka", "Rachaad", "Rhamondre", "Saquon",
+    "Stefon", "Tank", "Tee", "Tony", "Travis", "Trey", "Tyreek", "Zay",
+]
+LAST_NAMES = [
+    "Achane", "Adams", "Allen", "Bowers", "Brown", "Burrow", "Chase", "Cook",
+    "Diggs", "Dobbins", "Etienne", "Evans", "Flowers", "Gibbs", "Hall", "Harris",
+    "Henry", "Higgins", "Hill", "Jackson", "Jacobs", "Jefferson", "Kamara", "Kelce",
+    "Kupp", "LaPorta", "Lamb", "London", "Mahomes", "McCaffrey", "Mixon", "Nabers",
+    "Nacua", "Olave", "Pacheco", "Pitts", "Robinson", "Samuel", "Stevenson", "Swift",
+    "Taylor", "Walker", "Warren", "Watson", "White", "Williams", "Wilson", "Worthy",
+    "Wright", "Young",
+]
+
+
+def player_id(i: int) -> str:
+    """GSIS-style ids, the same shape nfl_data_py uses (e.g. 00-0033873)."""
+    return f"00-{i:07d}"
+
+
+def player_name(i: int) -> str:
+    """A deterministic, realistic-looking full name; unique for the first 2000 ids."""
+    return f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {LAST_NAMES[i // len(FIRST_NAMES) % len(LAST_NAMES)]}"
+
+
+def weekly_data(seasons, n_players: int = 600, weeks: int = 18,
+                play_rate: float = 0.8, seed: int = 0) -> pd.DataFrame:
+    """
+    Fake ``nfl.import_weekly_data(years=seasons)`` output with the columns the
+    project uses, in the same order (season by season, player by player).
+    """
+    rng = np.random.default_rng(seed)
+    team = rng.integers(0, len(TEAMS), n_players)
+    position = rng.integers(0, len(POSITIONS), n_players)
+    names = [player_name(i) for i in range(n_players)]
+    frames = []
+    for season in seasons:
+        moved = rng.random(n_players) < 0.15
+        team[moved] = rng.integers(0, len(TEAMS), moved.sum())
+
+        pid, wk = np.meshgrid(np.arange(n_players), np.arange(1, weeks + 1), indexing="ij")
+        played = rng.random(pid.shape) < play_rate
+        pid, wk = pid[played], wk[played]
+        n = len(pid)
+        pos = np.array(POSITIONS)[position[pid]]
+
+        carries = rng.poisson(np.where(pos == "RB", 12, np.where(pos == "QB", 3, 0.3)))
+        targets = rng.poisson(np.where(pos == "WR", 7, np.where(pos == "TE", 4,
+                              np.where(pos == "RB", 3, 0.0))))
+        receptions = rng.binomial(targets, 0.65)
+        rushing_yards = np.round(carries * rng.normal(4.3, 1.5, n), 0)
+        receiving_yards = np.round(receptions * rng.normal(10.5, 3.0, n), 0)
+        rushing_tds = rng.binomial(carries, 0.03)
+        receiving_tds = rng.binomial(receptions, 0.06)
+        fantasy_points = (0.1 * (rushing_yards + receiving_yards)
+                          + 6 * (rushing_tds + receiving_tds))
+        opponent = rng.integers(0, len(TEAMS) - 1, n)
+        opponent = np.where(opponent >= team[pid], opponent + 1, opponent)
+
+        frames.append(pd.DataFrame({
+            "player_id": [player_id(i) for i in pid],
+            "player_name": [f"{names[i][0]}.{names[i].split()[-1]}" for i in pid],
+            "player_display_name": [names[i] for i in pid],
+            "position": pos,
+            "position_group": pos,
+            "recent_team": np.array(TEAMS)[team[pid]],
+            "season": season,
+            "week": wk,
+            "season_type": "REG",
+            "opponent_team": np.array(TEAMS)[opponent],
+            "completions": 0.0,
+            "attempts": 0.0,
+            "passing_yards": 0.0,
+            "passing_tds": 0.0,
+            "interceptions": 0.0,
+            "carries": carries.astype(float),
+            "rushing_yards": rushing_yards,
+            "rushing_tds": rushing_tds.astype(float),
+            "receptions": receptions.astype(float),
+            "targets": targets.astype(float),
+            "receiving_yards": receiving_yards,
+            "receiving_tds": receiving_tds.astype(float),
+            "target_share": np.nan,
+            "air_yards_share": np.nan,
+            "fantasy_points": fantasy_points,
+            "fantasy_points_ppr": fantasy_points + receptions,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def rosters(weekly: pd.DataFrame) -> pd.DataFrame:
+    """Fake ``nfl.import_seasonal_rosters`` rows for every player in ``weekly``."""
+    latest = weekly.drop_duplicates(["season", "player_id"], keep="last")
+    first = latest["player_display_name"].str.split().str[0]
+    last = latest["player_display_name"].str.split().str[-1]
+    return pd.DataFrame({
+        "season": latest["season"].to_numpy(),
+        "player_id": latest["player_id"].to_numpy(),
+        "player_name": latest["player_display_name"].to_numpy(),
+        "first_name": first.to_numpy(),
+        "last_name": last.to_numpy(),
+        "football_name": first.to_numpy(),
+        "team": latest["recent_team"].to_numpy(),
+        "position": latest["position"].to_numpy(),
+    })
+
+
+def write_cache(cache_dir, seasons, n_players: int = 600, seed: int = 0) -> pd.DataFrame:
+    """
+    Writes weekly_{season}.parquet and rosters_{season}.parquet into ``cache_dir``
+    so the server and app run against it with NFL_CACHE_DIR=cache_dir NFL_OFFLINE=1.
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    wk = weekly_data(seasons, n_players=n_players, seed=seed)
+    for season, part in wk.groupby("season"):
+        part.to_parquet(cache_dir / f"weekly_{season}.parquet", index=False)
+        rosters(part).to_parquet(cache_dir / f"rosters_{season}.parquet", index=False)
+    return wk
+
+
+def write_bundle(models_dir, weekly: pd.DataFrame) -> Path:
+    """
+    Trains a bundle on ``weekly`` (all but its last season) into ``models_dir``
+    and makes it current, so offline runs never depend on the committed bundle
+    or its feature version. Serve it with NFL_MODELS_DIR=models_dir.
+    """
+    # Imported here: training pulls in scikit-learn
+    from src.features import add_features
+    from src.train import DEFAULT_CONFIG, train_bundle
+    return train_bundle(add_features(weekly), DEFAULT_CONFIG, int(weekly["season"].max()),
+                        Path(models_dir))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic weekly/roster cache and model bundle for offline runs")
+    parser.add_argument("--out", type=Path, default=Path("data/bench"))
+    parser.add_argument("--seasons", default="2023,2024")
+    parser.add_argument("--players", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    wk = write_cache(args.out, [int(s) for s in args.seasons.split(",")], args.players, args.seed)
+    write_bundle(args.out / "models", wk)
+    print(f"Wrote {len(wk)} rows and a bundle to {args.out}; serve with "
+          f"NFL_CACHE_DIR={args.out} NFL_MODELS_DIR={args.out / 'models'} NFL_OFFLINE=1")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,65 @@
 import streamlit as st
-import ollama
-import requests
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
+from src.cache_utils import SQLiteCache
 from src.chat_utils import (
-    extract_prediction_request, 
-    make_prediction_request, 
-    format_prediction_response,
-    create_system_prompt
+    check_api_health,
+    create_http_session,
+    extract_prediction_requests,
+    make_prediction_requests,
+    format_prediction_responses,
+    explain_predictions,
+    response_cache_key,
+    create_system_prompt,
+    prime_model,
+    stream_chat,
+    OLLAMA_MODEL
 )
 
-# Initialize Ollama client
-try:
-    ollama_client = ollama.Client(host='http://localhost:11434')
-except:
-    ollama_client = None
-
 # API configuration
-API_BASE_URL = "http://localhost:8000"
+API_BASE_URL = os.environ.get("PREDICTOR_API_URL", "http://localhost:8000")
+
+# Generated replies, persisted across restarts
+CHAT_CACHE_PATH = Path(os.environ.get(
+    "CHAT_CACHE_PATH", Path(__file__).parent / "data" / "chat_cache.sqlite"))
+CHAT_CACHE_SIZE = int(os.environ.get("CHAT_CACHE_SIZE", "1000"))
+
+@st.cache_resource
+def get_http_session():
+    # One keep-alive connection pool shared across reruns and sessions
+    return create_http_session()
+
+@st.cache_resource(show_spinner=False)
+def get_ollama_client():
+    # Imported on first use so the other tabs render without loading the ollama package
+    try:
+        import ollama
+        return ollama.Client(host=os.environ.get("OLLAMA_HOST", 'http://localhost:11434'))
+    except Exception:
+        return None
+
+@st.cache_resource(show_spinner="Loading player names...")
+def get_player_index():
+    # Built once per process from the cached nfl_data_py data; None falls back to numeric IDs.
+    # pandas and the data modules load here, the first time the chat needs them.
+    from src.data_utils import current_season
+    from src.player_index import build_player_index
+    season = current_season()
+    try:
+        return build_player_index(range(season - 2, season + 1))
+    except Exception:
+        return None
+
+@st.cache_resource
+def get_response_cache():
+    return SQLiteCache(CHAT_CACHE_PATH, maxsize=CHAT_CACHE_SIZE)
+
+@st.cache_data(ttl=10, show_spinner=False)
+def api_is_available(base_url: str) -> bool:
+    return check_api_health(base_url, get_http_session())
 
 st.title("Ryan Kupiec - Personal Projects & Resume")
 
@@ -119,6 +161,7 @@ with tab2:
 
 with tab3:
     st.header("🤖 AI Fantasy Football Assistant")
+    ollama_client = get_ollama_client()
     
     # Check if Ollama is available
     if ollama_client is None:
@@ -127,12 +170,12 @@ with tab3:
     else:
         st.success("✅ Ollama is connected and ready!")
     
-    # Check if the prediction API is available
-    try:
-        response = requests.get(f"{API_BASE_URL}/docs", timeout=5)
-        api_available = True
-    except:
-        api_available = False
+    # Check if the prediction API is available (cached for a few seconds across reruns)
+    api_available = api_is_available(API_BASE_URL)
+    
+    # Template explanations are instant; the LLM rewrite takes seconds
+    use_llm = st.checkbox("Explain predictions with the LLM", value=False,
+                          disabled=ollama_client is None)
     
     if not api_available:
         st.error("⚠️ Fantasy Points Prediction API is not running. Please start the API server.")
@@ -161,21 +204,36 @@ with tab3:
             message_placeholder = st.empty()
             
             try:
-                if ollama_client and api_available:
-                    # Check if this is a prediction request
-                    prediction_params = extract_prediction_request(prompt)
-                    
-                    if prediction_params:
-                        # Make the API call
-                        prediction_result = make_prediction_request(
+                from src.data_utils import current_season
+                # Check if this is a prediction request
+                prediction_params = extract_prediction_requests(
+                    prompt, get_player_index(), default_season=current_season()
+                )
+                prediction_results = None
+                messages = None
+                
+                if prediction_params and api_available:
+                    llm = use_llm and ollama_client is not None
+                    # Warm up the model with the system prompt while the API call runs;
+                    # all requested players go out in one batch round trip
+                    with ThreadPoolExecutor(max_workers=1) as pool:
+                        if llm:
+                            pool.submit(prime_model, ollama_client)
+                        prediction_results = make_prediction_requests(
                             API_BASE_URL,
-                            prediction_params["player_id"],
-                            prediction_params["season"],
-                            prediction_params["week"]
+                            prediction_params,
+                            session=get_http_session()
                         )
-                        
+                    for params, result in zip(prediction_params, prediction_results):
+                        if "player_name" in params and "data" in result:
+                            result["data"]["player_name"] = params["player_name"]
+                    
+                    if not llm:
+                        # Fast path: answered from the prediction data alone
+                        assistant_response = explain_predictions(prediction_results)
+                    else:
                         # Format the response
-                        api_response = format_prediction_response(prediction_result)
+                        api_response = format_prediction_responses(prediction_results)
                         
                         # Get AI explanation
                         ai_prompt = f"""A user asked: "{prompt}"
@@ -185,41 +243,43 @@ I made an API call and got this result:
 
 Please provide a helpful, conversational response that:
 1. Acknowledges their request
-2. Explains the prediction result in simple terms
+2. Explains the prediction result in simple terms (if several players were compared, say who to start)
 3. Provides context about what the prediction means
 4. Offers additional insights or tips
 
 Keep it friendly and informative!"""
                         
-                        ai_response = ollama_client.chat(
-                            model='llama3.2:3b',
-                            messages=[
-                                {"role": "system", "content": create_system_prompt()},
-                                {"role": "user", "content": ai_prompt}
-                            ]
-                        )
-                        
-                        assistant_response = ai_response['message']['content']
-                        
-                    else:
-                        # General conversation - use Ollama with system prompt
-                        ai_response = ollama_client.chat(
-                            model='llama3.2:3b',
-                            messages=[
-                                {"role": "system", "content": create_system_prompt()},
-                                {"role": "user", "content": prompt}
-                            ]
-                        )
-                        
-                        assistant_response = ai_response['message']['content']
-                        
-                        # Add helpful tip for prediction requests
-                        if any(keyword in prompt.lower() for keyword in ['predict', 'points', 'fantasy', 'player']):
-                            assistant_response += "\n\n💡 **Tip:** I can make actual predictions! Try asking something like 'Predict fantasy points for player 12345 in season 2024 week 1'"
-                    
+                        messages = [
+                            {"role": "system", "content": create_system_prompt()},
+                            {"role": "user", "content": ai_prompt}
+                        ]
+                
+                elif not prediction_params and ollama_client:
+                    # General conversation - use Ollama with system prompt
+                    messages = [
+                        {"role": "system", "content": create_system_prompt()},
+                        {"role": "user", "content": prompt}
+                    ]
+                
                 else:
                     assistant_response = "I'm sorry, but I'm currently unable to access the prediction API or Ollama. Please make sure both services are running."
                 
+                if messages is not None:
+                    # Repeated or near-identical questions about the same numbers skip generation
+                    cache_key = response_cache_key(prompt, prediction_results, OLLAMA_MODEL)
+                    assistant_response = get_response_cache().get(cache_key)
+                    if assistant_response is None:
+                        # Stream the reply into the bubble as it is generated
+                        assistant_response = ""
+                        for piece in stream_chat(ollama_client, messages):
+                            assistant_response += piece
+                            message_placeholder.markdown(assistant_response + "▌")
+                        get_response_cache().set(cache_key, assistant_response)
+                    
+                    # Add helpful tip for prediction requests
+                    if not prediction_params and any(keyword in prompt.lower() for keyword in ['predict', 'points', 'fantasy', 'player']):
+                        assistant_response += "\n\n💡 **Tip:** I can make actual predictions! Try asking something like 'Predict fantasy points for player 12345 in season 2024 week 1'"
+                
             except Exception as e:
                 assistant_response = f"I encountered an error: {str(e)}"
             
@@ -243,13 +303,14 @@ Keep it friendly and informative!"""
             
             if st.button("Test Prediction"):
                 try:
-                    response = requests.post(
+                    response = get_http_session().post(
                         f"{API_BASE_URL}/predict",
                         json={
                             "player_id": test_player_id,
                             "season": test_season,
                             "week": test_week
-                        }
+                        },
+                        timeout=10
                     )
                     
                     if response.status_code == 200:
@@ -270,6 +331,8 @@ Keep it friendly and informative!"""
             - "Predict fantasy points for player 12345 in season 2024 week 1"
             - "What are the expected points for player 67890, 2024 season, week 5?"
             - "Can you predict fantasy points for player 11111 in 2024 week 10?"
+            - "Bijan week 5" (players can be named instead of numbered)
+            - "Compare 123, 456 and 789 for week 5"
             
             **General questions:**
             - "What factors affect fantasy football performance?"
@@ -0,0 +1,45 @@
+# src/async_utils.py
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+# Bounded pool for blocking I/O and pandas/NumPy work, so a burst of requests
+# queues here instead of exhausting the server's threadpool.
+MAX_WORKERS = int(os.environ.get("PREDICTOR_WORKERS", min(4, os.cpu_count() or 1)))
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="predictor")
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Runs ``fn`` on the bounded executor without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(fn, *args, **kwargs))
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls: while a call for ``key`` is running, later
+    callers await the same result instead of starting their own.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, fn, *args):
+        fut = self._calls.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(run_blocking(fn, *args))
+            self._calls[key] = fut
+            fut.add_done_callback(partial(self._done, key))
+        # shield: one caller being cancelled must not cancel the shared call
+        return await asyncio.shield(fut)
+
+    def _done(self, key, fut):
+        self._calls.pop(key, None)
+        # Every waiter may have been cancelled (e.g. warm-up at shutdown); the
+        # failure was still seen, so asyncio shouldn't report it as unhandled
+        if not fut.cancelled():
+            fut.exception()
+
+    def __len__(self):
+        return len(self._calls)
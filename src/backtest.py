@@ -0,0 +1,293 @@
+# src/backtest.py
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.data_utils import load_weekly_seasons
+from src.features import add_features, windows_for
+from src.model_utils import LinearModel
+from src.train import (EFF_FEATURES, OP_FEATURES, config_features, fetch_seasons, load_config,
+                       load_features_incremental)
+
+
+def _week_codes(df: pd.DataFrame):
+    """Chronological index of each row's (season, week), plus the ordered weeks."""
+    key = df["season"].to_numpy(dtype=np.int64) * 100 + df["week"].to_numpy(dtype=np.int64)
+    weeks = np.unique(key)
+    return np.searchsorted(weeks, key), weeks
+
+
+def weekly_stats(X: np.ndarray, y: np.ndarray, codes: np.ndarray, n_weeks: int):
+    """
+    Per-week sufficient statistics for a least-squares fit. With a = [1, x],
+    G[t] = sum a a^T and b[t] = sum a y over the complete rows of week t, so
+    G[0, 0] is the row count and G[0, 1:] the feature sums.
+    """
+    ok = ~np.isnan(X).any(axis=1) & ~np.isnan(y)
+    A = np.column_stack([np.ones(ok.sum()), X[ok]])
+    c, yv = codes[ok], y[ok]
+    k = A.shape[1]
+    G = np.empty((n_weeks, k, k))
+    b = np.empty((n_weeks, k))
+    for i in range(k):
+        b[:, i] = np.bincount(c, weights=A[:, i] * yv, minlength=n_weeks)
+        for j in range(i, k):
+            G[:, i, j] = G[:, j, i] = np.bincount(c, weights=A[:, i] * A[:, j], minlength=n_weeks)
+    return G, b
+
+
+def ridge_from_stats(G: np.ndarray, b: np.ndarray, alpha: float) -> LinearModel:
+    """
+    Exactly what train._fit (StandardScaler + Ridge) would learn from the rows
+    summarized by (G, b), folded into a LinearModel, without touching the rows.
+    """
+    n = G[0, 0]
+    mu = G[0, 1:] / n
+    ybar = b[0] / n
+    scatter = G[1:, 1:] - n * np.outer(mu, mu)          # centered X^T X
+    cross = b[1:] - n * mu * ybar                        # centered X^T y
+    scale = np.sqrt(np.clip(np.diag(scatter) / n, 0, None))
+    scale[scale < 10 * np.finfo(float).eps] = 1.0        # StandardScaler leaves constants unscaled
+    beta = np.linalg.solve(scatter / np.outer(scale, scale) + alpha * np.eye(len(mu)),
+                           cross / scale)
+    coef = beta / scale
+    return LinearModel(coef, ybar - coef @ mu)
+
+
+def ridge_path_from_stats(G: np.ndarray, b: np.ndarray, alphas):
+    """
+    ridge_from_stats for many alphas at once: one eigendecomposition of the
+    standardized scatter, after which each alpha costs a p-vector rescale.
+    Returns (coef[len(alphas), p], intercept[len(alphas)]).
+    """
+    n = G[0, 0]
+    mu = G[0, 1:] / n
+    ybar = b[0] / n
+    scatter = G[1:, 1:] - n * np.outer(mu, mu)
+    cross = b[1:] - n * mu * ybar
+    scale = np.sqrt(np.clip(np.diag(scatter) / n, 0, None))
+    scale[scale < 10 * np.finfo(float).eps] = 1.0
+    eigvals, V = np.linalg.eigh(scatter / np.outer(scale, scale))
+    q = V.T @ (cross / scale)
+    alphas = np.asarray(alphas, dtype=float)
+    beta = (V @ (q[:, None] / (eigvals[:, None] + alphas[None, :]))).T
+    coef = beta / scale
+    return coef, ybar - coef @ mu
+
+
+def _team_prior_sums(df: pd.DataFrame, codes: np.ndarray, n_weeks: int):
+    """Cumulative per-team sums/counts of touches and fp_per_touch through each week."""
+    teams, team_codes = np.unique(df["recent_team"].astype(str).to_numpy(), return_inverse=True)
+    cell = codes * len(teams) + team_codes
+    out = {}
+    for col in ("touches", "fp_per_touch"):
+        v = df[col].to_numpy(dtype=float)
+        ok = ~np.isnan(v)
+        size = n_weeks * len(teams)
+        sums = np.bincount(cell[ok], weights=v[ok], minlength=size).reshape(n_weeks, -1)
+        counts = np.bincount(cell[ok], minlength=size).reshape(n_weeks, -1)
+        out[col] = (np.cumsum(sums, axis=0), np.cumsum(counts, axis=0))
+    return team_codes, out
+
+
+def _decayed_team_priors(df: pd.DataFrame, team_codes: np.ndarray, decay: float):
+    """
+    Per-row team means over the seasons before the row's, each weighted by
+    decay ** (season - 1 - earlier), as build_priors(decay=...) builds them.
+    NaN where the team has no earlier rows.
+    """
+    seasons, season_codes = np.unique(df["season"].to_numpy(dtype=np.int64), return_inverse=True)
+    n_teams = int(team_codes.max()) + 1 if len(team_codes) else 0
+    age = seasons[:, None] - 1 - seasons[None, :]               # [target, earlier]
+    weights = np.where(age >= 0, float(decay) ** np.maximum(age, 0), 0.0)
+    cell = season_codes * n_teams + team_codes
+    out = {}
+    for col in ("touches", "fp_per_touch"):
+        v = df[col].to_numpy(dtype=float)
+        ok = ~np.isnan(v)
+        size = len(seasons) * n_teams
+        sums = np.bincount(cell[ok], weights=v[ok], minlength=size).reshape(len(seasons), -1)
+        counts = np.bincount(cell[ok], minlength=size).reshape(len(seasons), -1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[col] = ((weights @ sums) / (weights @ counts))[season_codes, team_codes]
+    return out
+
+
+def walk_forward(df: pd.DataFrame, start_season: int = None, alpha: float = 1.0,
+                 blend_k: float = 5, eff_alpha: float = None,
+                 op_features=OP_FEATURES, eff_features=EFF_FEATURES,
+                 prior_decay: float = None) -> pd.DataFrame:
+    """
+    Scores every week from ``start_season`` on with models and priors fitted only
+    on the weeks before it, exactly as train.py would have fitted them then.
+
+    ``df`` is featurized once up front. That is only valid because no feature
+    looks ahead: player windows use the player's earlier rows, and team and
+    opponent windows use earlier weeks in calendar order, never the frame's
+    row order. So a week's values never depend on that week's or later results.
+    Each week's refit is a small linear solve on running sufficient statistics
+    instead of a pass over all earlier rows. Rows the server would reject
+    (missing features) are skipped.
+    With ``prior_decay``, team priors are the per-season ones train.py builds
+    with that decay; teams without earlier seasons fall back to the global mean.
+    """
+    df = df.reset_index(drop=True)
+    codes, weeks = _week_codes(df)
+    n_weeks = len(weeks)
+    start_season = start_season or int(df["season"].min()) + 1
+    first = int(np.searchsorted(weeks, start_season * 100))
+
+    models = {}
+    for name, features, target, a in (("op", op_features, "touches", alpha),
+                                      ("eff", eff_features, "fp_per_touch",
+                                       alpha if eff_alpha is None else eff_alpha)):
+        X = df[features].to_numpy(dtype=float)
+        G, b = weekly_stats(X, df[target].to_numpy(dtype=float), codes, n_weeks)
+        G, b = np.cumsum(G, axis=0), np.cumsum(b, axis=0)
+        coef = np.full((n_weeks, len(features)), np.nan)
+        intercept = np.full(n_weeks, np.nan)
+        for t in range(max(first, 1), n_weeks):
+            # Trained on weeks < t: the running totals through t - 1
+            if G[t - 1, 0, 0] > len(features):
+                m = ridge_from_stats(G[t - 1], b[t - 1], a)
+                coef[t], intercept[t] = m.coef, m.intercept
+        models[name] = (X, coef, intercept)
+
+    team_codes, prior_sums = _team_prior_sums(df, codes, n_weeks)
+    decayed = _decayed_team_priors(df, team_codes, prior_decay) if prior_decay is not None else None
+    priors = {}
+    for col, (sums, counts) in prior_sums.items():
+        prev_sums = np.vstack([np.zeros_like(sums[:1]), sums[:-1]])
+        prev_counts = np.vstack([np.zeros_like(counts[:1]), counts[:-1]])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            team = prev_sums[codes, team_codes] / prev_counts[codes, team_codes]
+            overall = prev_sums.sum(axis=1)[codes] / prev_counts.sum(axis=1)[codes]
+        if decayed is not None:
+            team = decayed[col]
+        priors[col] = np.where(np.isnan(team), overall, team)
+
+    X_op, coef_op, b_op = models["op"]
+    X_eff, coef_eff, b_eff = models["eff"]
+    scored = ((codes >= first) & ~np.isnan(b_op[codes]) & ~np.isnan(b_eff[codes])
+              & ~np.isnan(X_op).any(axis=1) & ~np.isnan(X_eff).any(axis=1)
+              & df["fp"].notna().to_numpy())
+    idx = np.flatnonzero(scored)
+    c = codes[idx]
+
+    touch_hat = np.einsum("ij,ij->i", X_op[idx], coef_op[c]) + b_op[c]
+    fppt_hat = np.einsum("ij,ij->i", X_eff[idx], coef_eff[c]) + b_eff[c]
+    n = df["games_with_team"].to_numpy(dtype=float)[idx]
+    w = n / (n + blend_k)
+    touch = w * touch_hat + (1 - w) * priors["touches"][idx]
+    fppt = w * fppt_hat + (1 - w) * priors["fp_per_touch"][idx]
+
+    cols = [col for col in ("player_id", "season", "week", "position", "recent_team") if col in df]
+    out = df.loc[idx, cols].reset_index(drop=True)
+    out["actual"] = df["fp"].to_numpy(dtype=float)[idx]
+    out["predicted"] = touch * fppt
+    out["error"] = out["predicted"] - out["actual"]
+    return out
+
+
+def error_table(preds: pd.DataFrame, by) -> pd.DataFrame:
+    """Count, MAE, RMSE and mean error (bias) of ``preds`` grouped by ``by``."""
+    err = preds.assign(abs_err=preds["error"].abs(), sq_err=preds["error"] ** 2)
+    table = err.groupby(by, observed=True).agg(
+        n=("error", "size"), mae=("abs_err", "mean"), rmse=("sq_err", "mean"),
+        bias=("error", "mean"))
+    table["rmse"] = np.sqrt(table["rmse"])
+    return table
+
+
+def summarize(preds: pd.DataFrame) -> dict:
+    """Overall metrics plus tables by position, team, season and week."""
+    overall = error_table(preds.assign(all="all"), "all").iloc[0]
+    report = {"overall": {k: float(v) for k, v in overall.items()}}
+    for name, by in (("position", "position"), ("team", "recent_team"),
+                     ("season", "season"), ("week", ["season", "week"])):
+        keys = [by] if isinstance(by, str) else by
+        if all(k in preds for k in keys):
+            report[f"by_{name}"] = error_table(preds, by)
+    return report
+
+
+def _to_json(report: dict) -> dict:
+    out = {}
+    for key, value in report.items():
+        if isinstance(value, pd.DataFrame):
+            value = value.reset_index()
+            out[key] = json.loads(value.to_json(orient="records"))
+        else:
+            out[key] = value
+    return out
+
+
+def run(df: pd.DataFrame, start_season: int = None, alpha: float = 1.0, blend_k: float = 5,
+        out: Path = None, predictions: Path = None, **model_args) -> dict:
+    """
+    Backtests featurized ``df``, prints the headline tables and optionally saves
+    everything. ``model_args`` go to walk_forward (eff_alpha, feature lists, prior_decay).
+    """
+    preds = walk_forward(df, start_season, alpha, blend_k, **model_args)
+    report = summarize(preds)
+
+    o = report["overall"]
+    print(f"Scored {int(o['n'])} player-weeks: MAE {o['mae']:.3f}  RMSE {o['rmse']:.3f}  "
+          f"bias {o['bias']:+.3f}")
+    for name in ("by_season", "by_position"):
+        if name in report:
+            print(f"\n{report[name].round(3).to_string()}")
+
+    if out:
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(_to_json(report), indent=2))
+    if predictions:
+        predictions.parent.mkdir(parents=True, exist_ok=True)
+        preds.to_parquet(predictions, index=False)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Walk-forward backtest: every week scored by models fitted only on earlier weeks")
+    parser.add_argument("--first-season", type=int, default=2018)
+    parser.add_argument("--last-season", type=int, default=2024)
+    parser.add_argument("--start-season", type=int, default=None,
+                        help="first season to score (default: first season + 1)")
+    parser.add_argument("--config", type=Path, help="hyperparameters from src.tune (default: train's)")
+    parser.add_argument("--op-alpha", type=float)
+    parser.add_argument("--eff-alpha", type=float)
+    parser.add_argument("--blend-k", type=float)
+    parser.add_argument("--player-window", type=int)
+    parser.add_argument("--team-window", type=int)
+    parser.add_argument("--prior-decay", type=float)
+    parser.add_argument("--incremental", action="store_true",
+                        help="reuse cached per-season feature shards")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", type=Path, help="write all metric tables as JSON")
+    parser.add_argument("--predictions", type=Path, help="write per-row predictions as Parquet")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config, op_alpha=args.op_alpha, eff_alpha=args.eff_alpha,
+                         blend_k=args.blend_k, player_window=args.player_window,
+                         team_window=args.team_window, prior_decay=args.prior_decay)
+    op_features, eff_features = config_features(config)
+    windows = windows_for(op_features + eff_features)
+
+    seasons = list(range(args.first_season, args.last_season + 1))
+    if args.incremental:
+        df = load_features_incremental(seasons, args.workers, windows)
+    else:
+        fetch_seasons(seasons, args.workers)
+        df = add_features(load_weekly_seasons(seasons), *windows)
+
+    run(df, args.start_season, config["op_alpha"], config["blend_k"], args.out, args.predictions,
+        eff_alpha=config["eff_alpha"], op_features=op_features, eff_features=eff_features,
+        prior_decay=config["prior_decay"])
+
+
+if __name__ == "__main__":
+    main()
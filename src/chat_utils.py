@@ -1,47 +1,178 @@
 import re
 import requests
 import json
-from typing import Optional, Dict, Any
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Iterator, List, Union
 
-def extract_prediction_request(user_message: str) -> Optional[Dict[str, Any]]:
+OLLAMA_MODEL = "llama3.2:3b"
+
+# One left-to-right pass over the message picks out every piece an intent needs.
+_INTENT_RE = re.compile(r"""
+      \b(?:season\s+)?(?P<season>20\d{2})\b
+    | \b(?:week|wk)\.?\s*(?P<week>\d{1,2})\b
+    | \bplayer\s+(?:id\s*)?[:#]?\s*(?P<player_id>\d+)\b
+    | \b(?P<number>\d+)\b
+    | (?P<word>[A-Za-z][A-Za-z'.\-]*)
+""", re.IGNORECASE | re.VERBOSE)
+
+_PREDICT_WORDS = {"predict", "prediction", "projection", "project", "projected",
+                  "expected", "expect", "points", "score", "start", "sit", "compare"}
+_STOPWORDS = _PREDICT_WORDS | {
+    "a", "about", "an", "and", "are", "at", "be", "can", "could", "do", "does", "fantasy",
+    "for", "from", "get", "give", "going", "how", "i", "in", "is", "it", "many", "me",
+    "much", "my", "of", "on", "or", "player", "please", "season", "should", "tell",
+    "the", "this", "to", "vs", "week", "what", "whats", "what's", "will", "with",
+    "would", "you", "id", "ppr", "number", "nfl", "game", "next", "versus",
+    "who", "which", "better", "between", "than", "ids", "players",
+}
+# Words that continue a list of ids: "player 123, 456 and 789", "123 vs 456"
+_LIST_WORDS = {"and", "or", "vs", "versus"}
+_LIST_GAP = re.compile(r"[\s,&/]*")
+
+def _parse_intent(user_message: str):
+    """
+    Single scan: season, week, numbers and candidate name words in order.
+    Each number is (value, after the season?, list index, given as "player N"?),
+    where a list is a run of numbers joined only by commas, "and", "or" or "vs".
+    ``predict_list`` is the number of lists started before the first prediction word.
+    """
+    season = week = predict_list = None
+    numbers, words = [], []
+    lists, in_list, list_end = 0, False, 0
+    for m in _INTENT_RE.finditer(user_message):
+        kind = m.lastgroup
+        value = m.group(kind)
+        if kind in ("player_id", "number"):
+            if not (in_list and _LIST_GAP.fullmatch(user_message, list_end, m.start())):
+                lists += 1
+            in_list, list_end = True, m.end()
+            numbers.append((int(value), season is not None, lists, kind == "player_id"))
+            continue
+        if kind == "word" and in_list and value.lower() in _LIST_WORDS \
+                and _LIST_GAP.fullmatch(user_message, list_end, m.start()):
+            list_end = m.end()
+            continue
+        in_list = False
+        if kind == "season" and season is None:
+            season = int(value)
+        elif kind == "week" and week is None:
+            week = int(value)
+        elif kind == "word":
+            words.append(value.strip("'.-"))
+            if predict_list is None and words[-1].lower() in _PREDICT_WORDS:
+                predict_list = lists
+    return season, week, numbers, words, predict_list
+
+def _resolve_names(words, player_index):
+    """Players named in ``words``: exact two-word aliases first, then single words."""
+    found, used = [], set()
+    for i in range(len(words) - 1):
+        pair = f"{words[i]} {words[i + 1]}"
+        if words[i].lower() not in _STOPWORDS and pair in player_index:
+            found.append((i, player_index.exact(pair)[0]))
+            used.update((i, i + 1))
+    for i, word in enumerate(words):
+        if i in used or word.lower() in _STOPWORDS or len(word) < 3:
+            continue
+        # Only capitalized words get prefix/fuzzy matching, so ordinary words don't match names
+        player = (player_index.exact(word) or [None])[0]
+        if player is None and word[0].isupper():
+            player = player_index.resolve(word)
+        if player is not None:
+            found.append((i, player))
+    return [p for _, p in sorted(found, key=lambda t: t[0])]
+
+def extract_prediction_requests(user_message: str, player_index=None,
+                                default_season: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Extract every requested prediction from user message, e.g.
+    "compare 123, 456 and 789 for week 5" gives three requests.
+    Players can be given by ID ("player 12345") or, with a ``player_index``,
+    by name ("Bijan week 5"); a missing season defaults to ``default_season``.
+    Returns an empty list if no valid prediction request is found.
+    """
+    season, week, numbers, words, predict_list = _parse_intent(user_message)
+    wants_prediction = predict_list is not None
+
+    # A small bare number after the season is the week
+    candidates = []
+    for value, after_season, in_list, explicit in numbers:
+        if not explicit and week is None and after_season and 1 <= value <= 18:
+            week = value
+        else:
+            candidates.append((value, in_list, explicit))
+
+    # Numbers are IDs only in some lists: every list holding a "player N" ID
+    # ("player 123, 456 and 789"), else the list nearest the prediction word,
+    # preferring one after it. "2 questions" or "top 10" elsewhere aren't IDs.
+    id_lists = {in_list for _, in_list, explicit in candidates if explicit}
+    if not id_lists and candidates and wants_prediction:
+        after = [in_list for _, in_list, _ in candidates if in_list > predict_list]
+        id_lists = {min(after) if after else max(in_list for _, in_list, _ in candidates)}
+    players = [(pid, None) for pid, in_list, _ in candidates if in_list in id_lists]
+    if player_index is not None and (week is not None or wants_prediction):
+        players += [(p.player_id, p.name) for p in _resolve_names(words, player_index)]
+
+    if season is None:
+        season = default_season
+    if not players or season is None or week is None:
+        return []
+    # Validate ranges
+    if not (2020 <= season <= 2030 and 1 <= week <= 18):
+        return []
+
+    requests_, seen = [], set()
+    for player_id, player_name in players:
+        if player_id in seen:
+            continue
+        seen.add(player_id)
+        request = {
+            "player_id": player_id,
+            "season": season,
+            "week": week
+        }
+        if player_name:
+            request["player_name"] = player_name
+        requests_.append(request)
+    return requests_
+
+def extract_prediction_request(user_message: str, player_index=None,
+                               default_season: Optional[int] = None) -> Optional[Dict[str, Any]]:
     """
     Extract prediction parameters from user message.
-    Returns None if no valid prediction request is found.
-    """
-    # Common patterns for prediction requests
-    patterns = [
-        r"predict.*?player\s+(?:id\s+)?(\d+).*?(?:season\s+)?(\d{4}).*?(?:week\s+)?(\d{1,2})",
-        r"player\s+(?:id\s+)?(\d+).*?(?:season\s+)?(\d{4}).*?(?:week\s+)?(\d{1,2}).*?predict",
-        r"fantasy\s+points.*?player\s+(?:id\s+)?(\d+).*?(?:season\s+)?(\d{4}).*?(?:week\s+)?(\d{1,2})",
-        r"(\d+).*?(\d{4}).*?(\d{1,2}).*?predict",
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, user_message, re.IGNORECASE)
-        if match:
-            try:
-                player_id = int(match.group(1))
-                season = int(match.group(2))
-                week = int(match.group(3))
-                
-                # Validate ranges
-                if 2020 <= season <= 2030 and 1 <= week <= 18:
-                    return {
-                        "player_id": player_id,
-                        "season": season,
-                        "week": week
-                    }
-            except (ValueError, IndexError):
-                continue
-    
-    return None
-
-def make_prediction_request(api_base_url: str, player_id: int, season: int, week: int) -> Dict[str, Any]:
+    Returns the first request found by extract_prediction_requests, or None.
+    """
+    found = extract_prediction_requests(user_message, player_index, default_season)
+    return found[0] if found else None
+
+def create_http_session(pool_size: int = 10) -> requests.Session:
+    """
+    Create a keep-alive session so repeated API calls reuse TCP connections.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def check_api_health(api_base_url: str, session: Optional[requests.Session] = None, timeout: float = 2) -> bool:
+    """
+    Probe the API's lightweight /healthz endpoint.
+    """
+    try:
+        response = (session or requests).get(f"{api_base_url}/healthz", timeout=timeout)
+        return response.status_code == 200
+    except requests.exceptions.RequestException:
+        return False
+
+def make_prediction_request(api_base_url: str, player_id: Union[int, str], season: int, week: int,
+                            session: Optional[requests.Session] = None) -> Dict[str, Any]:
     """
     Make a prediction request to the API.
     """
     try:
-        response = requests.post(
+        response = (session or requests).post(
             f"{api_base_url}/predict",
             json={
                 "player_id": player_id,
@@ -72,16 +203,61 @@ def make_prediction_request(api_base_url: str, player_id: int, season: int, week
             "message": "Sorry, I couldn't connect to the prediction service."
         }
 
+def make_prediction_requests(api_base_url: str, prediction_requests: List[Dict[str, Any]],
+                             session: Optional[requests.Session] = None) -> List[Dict[str, Any]]:
+    """
+    Make several prediction requests in one round trip via /predict/batch.
+    Results come back in the same order and shape as make_prediction_request;
+    if the batch endpoint is unavailable, the single calls are sent concurrently.
+    """
+    if len(prediction_requests) == 1:
+        req = prediction_requests[0]
+        return [make_prediction_request(api_base_url, req["player_id"], req["season"], req["week"], session)]
+
+    items = [{k: req[k] for k in ("player_id", "season", "week")} for req in prediction_requests]
+    try:
+        response = (session or requests).post(f"{api_base_url}/predict/batch", json={"items": items}, timeout=10)
+    except requests.exceptions.RequestException as e:
+        return [{
+            "success": False,
+            "error": str(e),
+            "message": "Sorry, I couldn't connect to the prediction service."
+        } for _ in items]
+
+    if response.status_code != 200:
+        with ThreadPoolExecutor(max_workers=min(8, len(items))) as pool:
+            return list(pool.map(
+                lambda req: make_prediction_request(api_base_url, req["player_id"], req["season"], req["week"], session),
+                items))
+
+    results = []
+    for pred in response.json()["predictions"]:
+        if pred.get("error"):
+            results.append({
+                "success": False,
+                "error": pred["error"],
+                "data": pred,
+                "message": f"Sorry, I couldn't get a prediction for player {pred['player_id']}: {pred['error']}"
+            })
+        else:
+            results.append({
+                "success": True,
+                "data": pred,
+                "message": f"Prediction successful! Expected fantasy points: {pred['expected_points']:.2f}"
+            })
+    return results
+
 def format_prediction_response(prediction_result: Dict[str, Any]) -> str:
     """
     Format the prediction result into a user-friendly message.
     """
     if prediction_result["success"]:
         data = prediction_result["data"]
+        name_line = f"**Player:** {data['player_name']}\n" if data.get("player_name") else ""
         return f"""
 🎯 **Fantasy Points Prediction**
 
-**Player ID:** {data['player_id']}
+{name_line}**Player ID:** {data['player_id']}
 **Season:** {data['season']}
 **Week:** {data['week']}
 **Expected Points:** **{data['expected_points']:.2f}**
@@ -91,6 +267,103 @@ This prediction is based on historical performance data and advanced statistical
     else:
         return f"❌ **Error:** {prediction_result['message']}"
 
+def format_prediction_responses(prediction_results: List[Dict[str, Any]]) -> str:
+    """
+    Format one or more prediction results; several become a ranked comparison.
+    """
+    if len(prediction_results) == 1:
+        return format_prediction_response(prediction_results[0])
+
+    ok = sorted((r for r in prediction_results if r["success"]),
+                key=lambda r: r["data"]["expected_points"], reverse=True)
+    lines = ["🎯 **Fantasy Points Comparison**", ""]
+    if ok:
+        data = ok[0]["data"]
+        lines.append(f"**Season {data['season']}, Week {data['week']}**")
+        lines.append("")
+    for rank, r in enumerate(ok, 1):
+        data = r["data"]
+        name = data.get("player_name") or f"Player {data['player_id']}"
+        lines.append(f"{rank}. **{name}** (ID {data['player_id']}): **{data['expected_points']:.2f}** points")
+    for r in prediction_results:
+        if not r["success"]:
+            lines.append(f"❌ {r['message']}")
+    return "\n".join(lines)
+
+# Weekly PPR projections, best first: (at least, what it makes the player)
+_TIERS = [
+    (20, "a must-start with a top-tier projection"),
+    (15, "a strong starter"),
+    (10, "a solid flex option"),
+    (6, "a bench or deep-league flex play"),
+    (float("-inf"), "a sit in most leagues"),
+]
+
+def _tier(points: float) -> str:
+    return next(label for floor, label in _TIERS if points >= floor)
+
+def _player_label(data: Dict[str, Any]) -> str:
+    return data.get("player_name") or f"Player {data['player_id']}"
+
+def explain_predictions(prediction_results: List[Dict[str, Any]]) -> str:
+    """
+    Template explanation of prediction results, built from the numbers alone:
+    the formatted result, what the projection means and, for several players,
+    who to start. Instant and deterministic; the LLM is an optional extra.
+    """
+    lines = [format_prediction_responses(prediction_results), ""]
+    ok = sorted((r["data"] for r in prediction_results if r["success"]),
+                key=lambda d: d["expected_points"], reverse=True)
+    if not ok:
+        lines.append("Double-check the player, season and week (weeks run 1-18); the model "
+                     "needs a few earlier games from the player to make a projection.")
+        return "\n".join(lines)
+
+    if len(ok) == 1:
+        data = ok[0]
+        lines.append(f"{_player_label(data)} projects for **{data['expected_points']:.2f}** PPR "
+                     f"points in week {data['week']} of {data['season']}: "
+                     f"{_tier(data['expected_points'])}.")
+    else:
+        best, runner_up = ok[0], ok[1]
+        gap = best["expected_points"] - runner_up["expected_points"]
+        if gap < 1:
+            lines.append(f"It's close: {_player_label(best)} and {_player_label(runner_up)} are "
+                         f"within a point of each other ({gap:.2f}), so let injury news and "
+                         f"matchups break the tie.")
+        else:
+            lines.append(f"Start **{_player_label(best)}**: projected {gap:.2f} points ahead of "
+                         f"{_player_label(runner_up)} and {_tier(best['expected_points'])}.")
+    lines.append("")
+    lines.append("Projections combine each player's recent touches and points per touch with "
+                 "their team's and opponent's recent production, weighted toward the team "
+                 "average for players with few games on their team. Treat them as a median "
+                 "outcome, not a ceiling.")
+    return "\n".join(lines)
+
+def _normalize_prompt(prompt: str) -> str:
+    """Case, punctuation and spacing don't change the question."""
+    return " ".join(re.sub(r"[^\w\s]", " ", prompt.lower()).split())
+
+def response_cache_key(prompt: str, prediction_results: Optional[List[Dict[str, Any]]],
+                       model: str = OLLAMA_MODEL) -> str:
+    """
+    Key for caching a generated reply: the normalized prompt, the prediction
+    numbers it explains (rounded as displayed) and the model that wrote it.
+    """
+    payload = [
+        {"player_id": r.get("data", {}).get("player_id"),
+         "player_name": r.get("data", {}).get("player_name"),
+         "season": r.get("data", {}).get("season"),
+         "week": r.get("data", {}).get("week"),
+         "expected_points": (round(r["data"]["expected_points"], 2)
+                             if r["success"] else None),
+         "error": None if r["success"] else r["message"]}
+        for r in prediction_results or []
+    ]
+    text = json.dumps([_normalize_prompt(prompt), payload, model], sort_keys=True, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()
+
 def create_system_prompt() -> str:
     """
     Create the system prompt for the Ollama model.
@@ -104,22 +377,44 @@ def create_system_prompt() -> str:
 
 **How to Make Predictions:**
 When users ask for predictions, look for:
-- Player ID (number)
-- Season (4-digit year like 2024)
+- Player name (like "Bijan Robinson" or just "Bijan") or player ID
+- Season (4-digit year like 2024; defaults to the current season)
 - Week (1-18)
 
 **Example user requests you can handle:**
 - "Predict fantasy points for player 12345 in season 2024 week 1"
 - "What are the expected points for player 67890, 2024 season, week 5?"
 - "Can you predict fantasy points for player 11111 in 2024 week 10?"
+- "Bijan week 5"
+- "Compare 123, 456 and 789 for week 5"
 
 **API Response Format:**
 The API returns predictions with expected fantasy points based on historical data and statistical modeling.
 
 **Important Notes:**
 - Always be helpful and informative
-- If you can't extract prediction parameters, ask the user to provide player ID, season, and week
+- If you can't extract prediction parameters, ask the user to provide a player name or ID, season, and week
 - Explain what the predictions mean and provide context
 - Be conversational and engaging
 
-Remember: You're here to help users make informed fantasy football decisions!""" 
\ No newline at end of file
+Remember: You're here to help users make informed fantasy football decisions!"""
+
+def stream_chat(client, messages: List[Dict[str, str]], model: str = OLLAMA_MODEL) -> Iterator[str]:
+    """
+    Yield the assistant reply piece by piece as Ollama generates it.
+    """
+    for chunk in client.chat(model=model, messages=messages, stream=True):
+        yield chunk["message"]["content"]
+
+def prime_model(client, model: str = OLLAMA_MODEL) -> None:
+    """
+    Load the model and prefill the system prompt so the real request that
+    follows (same prefix) starts generating sooner. Safe to run while the
+    prediction API call is still in flight.
+    """
+    client.chat(
+        model=model,
+        messages=[{"role": "system", "content": create_system_prompt()}],
+        options={"num_predict": 1},
+        keep_alive="10m",
+    )
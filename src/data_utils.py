@@ -0,0 +1,196 @@
+# src/data_utils.py
+import os
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.async_utils import SingleFlight
+from src.cache_utils import LRUCache
+from src.metrics import stage
+
+CACHE_DIR = Path(os.environ.get(
+    "NFL_CACHE_DIR", Path(__file__).parent.parent / "data" / "weekly"))
+# Seconds before an in-progress season is re-downloaded; finished seasons never expire.
+CURRENT_SEASON_TTL = float(os.environ.get("NFL_CACHE_TTL", 6 * 3600))
+# Serve only from CACHE_DIR and never touch the network.
+OFFLINE = os.environ.get("NFL_OFFLINE", "0") == "1"
+
+# The only weekly columns features, training and serving read; everything else
+# stays on disk. position is kept for per-position backtest errors.
+WEEKLY_COLUMNS = ["player_id", "season", "week", "recent_team", "opponent_team", "position",
+                  "carries", "targets", "fantasy_points_ppr"]
+# Extra columns the player-name index reads straight from disk.
+NAME_COLUMNS = ["player_id", "player_name", "player_display_name", "position",
+                "recent_team", "season", "week"]
+CATEGORICAL = ["player_id", "recent_team", "opponent_team", "position"]
+_DTYPES = {"season": np.int16, "week": np.int8,
+           "carries": np.float32, "targets": np.float32, "fantasy_points_ppr": np.float32}
+
+_memory = LRUCache(maxsize=int(os.environ.get("NFL_CACHE_SEASONS", 8)))
+_locks = {}
+_locks_guard = threading.Lock()
+_flight = SingleFlight()
+
+
+def current_season(today=None) -> int:
+    """NFL seasons start in September, so Jan-Aug belong to the previous year."""
+    today = today or date.today()
+    return today.year if today.month >= 9 else today.year - 1
+
+
+def season_path(season: int) -> Path:
+    return CACHE_DIR / f"weekly_{season}.parquet"
+
+
+def _season_lock(season: int) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(season, threading.Lock())
+
+
+def season_ttl(season: int):
+    """Seconds a cached copy of ``season`` stays fresh, or None if it never expires."""
+    return CURRENT_SEASON_TTL if season >= current_season() else None
+
+
+def _is_stale(path: Path, season: int) -> bool:
+    ttl = season_ttl(season)
+    return ttl is not None and time.time() - path.stat().st_mtime > ttl
+
+
+def needs_fetch(season: int) -> bool:
+    """True if load_weekly would have to go to the network for ``season``."""
+    path = season_path(season)
+    return not OFFLINE and (not path.exists() or _is_stale(path, season))
+
+
+def _fetch(season: int) -> pd.DataFrame:
+    import nfl_data_py as nfl
+    return nfl.import_weekly_data(years=[season])
+
+
+def _write(df: pd.DataFrame, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    df.to_parquet(tmp, index=False)
+    tmp.replace(path)
+
+
+def compact(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Prunes to WEEKLY_COLUMNS, stores ids/teams/positions as categoricals (int8
+    codes for teams) and downcasts numerics, then sorts by (player_id, week).
+    That is nflverse's own order, so order-dependent features are unchanged.
+    """
+    df = df[[c for c in WEEKLY_COLUMNS if c in df.columns]]
+    df = df.astype({c: t for c, t in _DTYPES.items() if c in df.columns})
+    df = df.astype({c: "category" for c in CATEGORICAL if c in df.columns})
+    df = df.sort_values(["player_id", "week"], kind="stable")
+    return df.reset_index(drop=True)
+
+
+def _read(path: Path, columns) -> pd.DataFrame:
+    import pyarrow.parquet as pq
+    present = set(pq.read_schema(path).names)
+    return pd.read_parquet(path, columns=[c for c in columns if c in present])
+
+
+def load_weekly(season: int, refresh: bool = False) -> pd.DataFrame:
+    """
+    Weekly data for one season, served from memory, then disk, then nfl_data_py.
+    Only WEEKLY_COLUMNS are read and kept, in compact dtypes (see compact).
+    The returned frame is shared between callers and must not be mutated.
+    """
+    if not refresh:
+        df = _memory.get(season)
+        if df is not None:
+            return df
+
+    path = season_path(season)
+    with _season_lock(season):
+        if not refresh:
+            df = _memory.get(season)
+            if df is not None:
+                return df
+
+        if path.exists() and (OFFLINE or not (refresh or _is_stale(path, season))):
+            with stage("read_cache"):
+                df = compact(_read(path, WEEKLY_COLUMNS))
+        elif OFFLINE:
+            raise FileNotFoundError(f"No cached weekly data for {season} in {CACHE_DIR}")
+        else:
+            try:
+                with stage("download"):
+                    df = _fetch(season)
+                _write(df, path)
+                df = compact(df)
+            except Exception:
+                # Upstream is down: a stale copy is better than no answer.
+                if not path.exists():
+                    raise
+                df = compact(_read(path, WEEKLY_COLUMNS))
+
+        _memory.set(season, df, ttl=season_ttl(season))
+    return df
+
+
+def peek_weekly(season: int):
+    """The in-memory frame for ``season`` if it is cached and fresh, else None. Never blocks on I/O."""
+    return _memory.get(season)
+
+
+async def load_weekly_async(season: int) -> pd.DataFrame:
+    """load_weekly for async callers: memory hits return at once, misses share one fetch."""
+    df = _memory.get(season)
+    if df is not None:
+        return df
+    return await _flight.do(season, load_weekly, season)
+
+
+def load_weekly_seasons(seasons) -> pd.DataFrame:
+    """Seasons stacked in the order given, keeping categoricals across differing categories."""
+    df = pd.concat([load_weekly(s) for s in seasons], ignore_index=True)
+    return df.astype({c: "category" for c in CATEGORICAL
+                      if c in df.columns and df[c].dtype != "category"})
+
+
+def load_weekly_names(season: int) -> pd.DataFrame:
+    """Name and position columns for the player index, read from the disk cache on demand."""
+    load_weekly(season)     # fetches the season if it isn't cached yet
+    return _read(season_path(season), NAME_COLUMNS)
+
+
+def load_rosters(season: int) -> pd.DataFrame:
+    """Seasonal rosters (names, nicknames, positions), cached on disk like weekly data."""
+    path = CACHE_DIR / f"rosters_{season}.parquet"
+    if path.exists() and (OFFLINE or not _is_stale(path, season)):
+        return pd.read_parquet(path)
+    if OFFLINE:
+        raise FileNotFoundError(f"No cached roster for {season} in {CACHE_DIR}")
+    import nfl_data_py as nfl
+    df = nfl.import_seasonal_rosters([season])
+    _write(df, path)
+    return df
+
+
+def refresh_season(season: int) -> pd.DataFrame:
+    return load_weekly(season, refresh=True)
+
+
+def warm_cache(seasons):
+    """Loads each season into memory (downloading if needed); returns the ones that failed."""
+    failed = []
+    for season in seasons:
+        try:
+            load_weekly(season)
+        except Exception:
+            failed.append(season)
+    return failed
+
+
+def warm_seasons_from_env():
+    raw = os.environ.get("NFL_WARM_SEASONS", "")
+    return [int(s) for s in raw.split(",") if s.strip()]
@@ -0,0 +1,142 @@
+# src/export_utils.py
+import importlib.util
+import io
+import json
+import math
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+JSON = "application/json"
+NDJSON = "application/x-ndjson"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+MSGPACK = "application/x-msgpack"
+# msgpack is optional: only offered when it's installed
+HAVE_MSGPACK = importlib.util.find_spec("msgpack") is not None
+
+PREDICTION_SCHEMA = pa.schema([
+    ("player_id", pa.string()),
+    ("season", pa.int16()),
+    ("week", pa.int8()),
+    ("expected_points", pa.float64()),
+    ("error", pa.string()),
+    ("model_version", pa.string()),
+])
+
+
+def negotiate(accept, offered):
+    """
+    The media type in ``offered`` that the Accept header ranks highest
+    (most specific range wins, ties go to the earlier offer), the first
+    offer when there's no header, or None if nothing offered is acceptable.
+    """
+    if not accept:
+        return offered[0]
+    ranges = {}
+    for part in accept.split(","):
+        media, *params = [p.strip() for p in part.split(";")]
+        q = next((p[2:] for p in params if p.startswith("q=")), "1")
+        try:
+            ranges[media.lower()] = float(q)
+        except ValueError:
+            continue
+    best, best_q = None, 0.0
+    for media in offered:
+        kind = media.split("/")[0]
+        q = next((ranges[r] for r in (media, f"{kind}/*", "*/*") if r in ranges), 0.0)
+        if q > best_q:
+            best, best_q = media, q
+    return best
+
+
+def schema_for(frame: pd.DataFrame) -> pa.Schema:
+    """Arrow schema for batches of ``frame``; every non-numeric column becomes strings."""
+    fields = []
+    for name, dtype in frame.dtypes.items():
+        if not pd.api.types.is_numeric_dtype(dtype):
+            fields.append(pa.field(name, pa.string()))
+        else:
+            fields.append(pa.field(name, pa.from_numpy_dtype(dtype)))
+    return pa.schema(fields)
+
+
+def record_batch(frame: pd.DataFrame, schema: pa.Schema) -> pa.RecordBatch:
+    """
+    ``frame`` as one record batch of ``schema``. Numeric columns are handed
+    over as-is (NaN stays NaN, so readers get them back zero-copy); missing
+    strings become nulls.
+    """
+    arrays = []
+    for field in schema:
+        col = frame[field.name]
+        if pa.types.is_string(field.type):
+            arrays.append(pa.array(col.to_numpy(dtype=object), field.type, from_pandas=True))
+        else:
+            arrays.append(pa.array(col.to_numpy(), field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def prediction_batch(player_ids, seasons, weeks, points, errors, versions) -> pa.RecordBatch:
+    """Scored rows as a PREDICTION_SCHEMA batch; expected_points is null where there's an error."""
+    failed = np.array([e is not None for e in errors], dtype=bool)
+    return pa.RecordBatch.from_arrays([
+        pa.array([str(pid) for pid in player_ids], pa.string()),
+        pa.array(np.asarray(seasons), pa.int16()),
+        pa.array(np.asarray(weeks), pa.int8()),
+        pa.array(np.asarray(points, dtype=float), pa.float64(), mask=failed),
+        pa.array(list(errors), pa.string()),
+        pa.array(list(versions), pa.string()),
+    ], schema=PREDICTION_SCHEMA)
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
+
+def _json_value(value):
+    # NaN isn't JSON
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+
+def _json_rows(batch: pa.RecordBatch):
+    return [json.dumps({k: _json_value(v) for k, v in row.items()}) for row in batch.to_pylist()]
+
+
+def encode(media_type, schema: pa.Schema, batches):
+    """
+    Serializes record batches as they arrive, yielding one chunk per batch,
+    so a long export is never held in memory whole:
+
+    - Arrow IPC stream: the schema, then one message per batch
+      (``pyarrow.ipc.open_stream`` reads it back)
+    - msgpack: one ``{column: values}`` map per batch (read with ``msgpack.Unpacker``)
+    - NDJSON: one object per line
+    - JSON: one array of row objects, still written batch by batch
+    """
+    if media_type == ARROW_STREAM:
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+                yield _drain(sink)
+        yield _drain(sink)      # end-of-stream marker
+    elif media_type == MSGPACK:
+        import msgpack
+        for batch in batches:
+            yield msgpack.packb(batch.to_pydict())
+    elif media_type == JSON:
+        yield b"["
+        sep = ""
+        for batch in batches:
+            rows = _json_rows(batch)
+            if rows:
+                yield (sep + ",".join(rows)).encode()
+                sep = ","
+        yield b"]"
+    else:
+        for batch in batches:
+            yield "".join(row + "\n" for row in _json_rows(batch)).encode()
@@ -0,0 +1,346 @@
+# src/feature_store.py
+import argparse
+import hashlib
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.async_utils import SingleFlight
+from src.cache_utils import LRUCache
+from src.data_utils import current_season, load_weekly, load_weekly_seasons, peek_weekly
+from src.features import (PLAYER_WINDOWS, TEAM_WINDOWS, add_features, add_features_after,
+                          is_windowed, windowed_columns, windows_for)
+from src.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+FEATURE_PATH = Path(os.environ.get(
+    "NFL_FEATURE_PATH", Path(__file__).parent.parent / "data" / "features.parquet"))
+# Seasons served outside the store are featurized after the seasons from here on,
+# as train.py (--first-season) and build_feature_store (--seasons) do by default
+HISTORY_START = int(os.environ.get("NFL_HISTORY_START", 2018))
+KEY = ["player_id", "season", "week"]
+FEATURE_COLUMNS = [
+    "recent_team", "opponent_team", "touches", "fp_per_touch",
+    "roll_touch3", "roll_fppt3", "team_rb_fp5", "opp_rb_fp5",
+    "team_change", "games_with_team", "games_since",
+]
+
+
+# (season, week) packs into season * 100 + week; players are spaced this far apart
+_PLAYER_STRIDE = 1_000_000
+
+
+class FeatureStore:
+    """
+    Featurized weekly rows indexed by (player_id, season, week).
+    ``version`` changes whenever the underlying data does, so it can key caches
+    and ETags. Stores built in the process hash their rows, so the same data
+    gets the same version across restarts and workers.
+
+    Rows are kept sorted by an int64 key packing (player code, season, week), so
+    a lookup is one dict hit for the player plus a binary search, and the index
+    costs 8 bytes a row instead of a tuple and dict entry per row. Numeric
+    features are also kept as one float64 matrix, so a single row can be
+    scored from a NumPy vector without going through pandas.
+    """
+
+    def __init__(self, df: pd.DataFrame, source=None, version: str = None):
+        cols = KEY + [c for c in FEATURE_COLUMNS if c in df.columns]
+        cols += [c for c in df.columns if is_windowed(c) and c not in cols]
+        df = df[cols]
+        codes, players = pd.factorize(df["player_id"])
+        keys = (codes.astype(np.int64) * _PLAYER_STRIDE
+                + df["season"].to_numpy(dtype=np.int64) * 100
+                + df["week"].to_numpy(dtype=np.int64))
+        order = np.argsort(keys, kind="stable")
+        self.df = df.iloc[order].reset_index(drop=True)
+        self._keys = keys[order]
+        self._players = {pid: code for code, pid in enumerate(players)}
+        numeric = [c for c in cols if c not in KEY and pd.api.types.is_numeric_dtype(self.df[c])]
+        self.matrix = self.df[numeric].to_numpy(dtype=np.float64)
+        self.teams = self.df["recent_team"].to_numpy(dtype=object)
+        self._columns = {c: j for j, c in enumerate(numeric)}
+        self._indices = {}
+        self.windows = windows_for(cols)
+        self.source = source
+        self.version = version or f"data-{_content_hash(self.df)}"
+        self.seasons = set(self.df["season"].unique().tolist())
+
+    @classmethod
+    def load(cls, path: Path = FEATURE_PATH):
+        return cls(pd.read_parquet(path), version=f"store-{path.stat().st_mtime_ns}")
+
+    def save(self, path: Path = FEATURE_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        self.df.to_parquet(tmp, index=False)
+        tmp.replace(path)
+
+    def covers(self, windows) -> bool:
+        """True if every rolling window in ``windows`` was featurized into this store."""
+        return all(set(need) <= set(have) for need, have in zip(windows, self.windows))
+
+    def lookup(self, player_id, season: int, week: int):
+        """Returns the feature row as a Series, or None if the key is unknown."""
+        i = self.positions([(player_id, season, week)])[0]
+        return None if i < 0 else self.df.iloc[i]
+
+    def position(self, player_id, season: int, week: int) -> int:
+        """Row position of one key, -1 if it is unknown."""
+        code = self._players.get(player_id, -1)
+        if code < 0:
+            return -1
+        wanted = code * _PLAYER_STRIDE + int(season) * 100 + int(week)
+        i = int(np.searchsorted(self._keys, wanted))
+        return i if i < len(self._keys) and self._keys[i] == wanted else -1
+
+    def vector(self, i: int, columns) -> np.ndarray:
+        """Row ``i``'s values of the numeric ``columns`` as a float64 vector."""
+        key = tuple(columns)
+        idx = self._indices.get(key)
+        if idx is None:
+            idx = self._indices[key] = np.array([self._columns[c] for c in columns], dtype=np.intp)
+        return self.matrix[i, idx]
+
+    def positions(self, keys):
+        """Row positions for many keys at once, -1 where the key is unknown."""
+        if not len(self._keys):
+            return [-1] * len(keys)
+        pids, seasons, weeks = zip(*keys)
+        codes = np.fromiter((self._players.get(p, -1) for p in pids), np.int64, len(keys))
+        wanted = (codes * _PLAYER_STRIDE + np.asarray(seasons, dtype=np.int64) * 100
+                  + np.asarray(weeks, dtype=np.int64))
+        i = np.minimum(np.searchsorted(self._keys, wanted), len(self._keys) - 1)
+        hit = (codes >= 0) & (self._keys[i] == wanted)
+        return np.where(hit, i, -1).tolist()
+
+    def week(self, season: int, week: int) -> pd.DataFrame:
+        mask = (self.df["season"].to_numpy() == season) & (self.df["week"].to_numpy() == week)
+        return self.df[mask]
+
+    def __len__(self):
+        return len(self.df)
+
+
+def _content_hash(df: pd.DataFrame) -> str:
+    h = hashlib.sha1(repr(list(df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def build_feature_store(seasons, path: Path = FEATURE_PATH,
+                        windows=(PLAYER_WINDOWS, TEAM_WINDOWS)) -> FeatureStore:
+    """
+    Runs add_features once over all seasons together, exactly as train.py does,
+    so rolling windows carry across season boundaries the same way.
+    """
+    store = FeatureStore(add_features(load_weekly_seasons(seasons), *windows))
+    store.save(path)
+    return store
+
+
+_persisted = None
+_season_stores = LRUCache(maxsize=4)
+# History frames by the season they precede, so rebuilding the in-progress
+# season after a new week doesn't reload every earlier season
+_histories = LRUCache(maxsize=2)
+_flight = SingleFlight()
+# Rolling windows the served models need; tuned bundles may use non-default ones
+_windows = (PLAYER_WINDOWS, TEAM_WINDOWS)
+
+
+def require_features(features):
+    """Makes every store produced from now on carry the windowed columns ``features`` need."""
+    global _windows
+    windows = windows_for(features)
+    if windows != _windows:
+        _windows = windows
+        _season_stores.clear()
+
+
+def _persisted_store():
+    global _persisted
+    if _persisted is None and FEATURE_PATH.exists():
+        _persisted = FeatureStore.load(FEATURE_PATH)
+    return _persisted
+
+
+def reload_persisted():
+    global _persisted
+    _persisted = FeatureStore.load(FEATURE_PATH) if FEATURE_PATH.exists() else None
+    return _persisted
+
+
+def _history(season: int):
+    """
+    Weekly data for the seasons from HISTORY_START up to ``season``. A season
+    that fails to load (not cached offline, upstream down) is skipped with a
+    warning rather than failing the request; the history is then kept only
+    until the next rebuild, so the season is retried.
+    """
+    cached = _histories.get(season)
+    if cached is not None:
+        return cached[0]
+    seasons, failed = [], False
+    for s in range(HISTORY_START, season):
+        try:
+            load_weekly(s)
+        except Exception as e:
+            logger.warning("Featurizing %s without history season %s: %s: %s",
+                           season, s, type(e).__name__, e)
+            failed = True
+            continue
+        seasons.append(s)
+    history = load_weekly_seasons(seasons) if seasons else None
+    if not failed:
+        _histories.set(season, (history,))
+    return history
+
+
+def forget_history():
+    """Drops cached history frames, e.g. after an earlier season is refreshed."""
+    _histories.clear()
+
+
+def season_store(season: int) -> FeatureStore:
+    """
+    Featurizes a season on demand as if appended to the seasons before it, so
+    rolling windows and games_with_team match a store built over all of them.
+    Rebuilt whenever the season's cached data changes.
+    """
+    df = load_weekly(season)
+    store = _season_stores.get(season)
+    if store is None or store.source is not df or not store.covers(_windows):
+        history = _history(season)
+        with stage("add_features"):
+            store = FeatureStore(add_features_after(history, df, *_windows), source=df)
+        _season_stores.set(season, store)
+    return store
+
+
+def _serves(store, season: int) -> bool:
+    # The in-progress season always comes from its live weekly data, so newly
+    # published weeks and /cache/refresh show up without rebuilding the store
+    return (store is not None and season in store.seasons and season < current_season()
+            and store.covers(_windows))
+
+
+def _store_for(season: int) -> FeatureStore:
+    store = _persisted_store()
+    if _serves(store, season):
+        return store
+    return season_store(season)
+
+
+def _ready_store(season: int):
+    """The store for ``season`` if it can be used without any I/O or featurizing, else None."""
+    if _serves(_persisted, season):
+        return _persisted
+    store = _season_stores.get(season)
+    if store is not None and store.source is peek_weekly(season) and store.covers(_windows):
+        return store
+    return None
+
+
+async def store_for_async(season: int) -> FeatureStore:
+    """
+    Store lookup for async callers. Fetching and featurizing a season runs on
+    the bounded executor, and concurrent requests for one season share it.
+    """
+    store = _ready_store(season)
+    if store is not None:
+        return store
+    return await _flight.do(season, _store_for, season)
+
+
+async def warm_stores(seasons):
+    """
+    Featurizes ``seasons`` ahead of traffic, loading their history on the way,
+    so the first request for the in-progress season doesn't. Returns the
+    seasons that failed.
+    """
+    failed = []
+    for season in seasons:
+        try:
+            await store_for_async(season)
+        except Exception as e:
+            logger.warning("Could not warm features for %s: %s: %s", season, type(e).__name__, e)
+            failed.append(season)
+    return failed
+
+
+async def get_features_async(player_id, season: int, week: int):
+    return (await store_for_async(season)).lookup(player_id, season, week)
+
+
+def get_features(player_id, season: int, week: int):
+    return _store_for(season).lookup(player_id, season, week)
+
+
+def get_features_frame(keys):
+    """
+    Feature rows for many (player_id, season, week) keys, aligned with ``keys``.
+    Returns the frame plus a boolean array marking which keys were found;
+    rows for unknown keys (or seasons with no data at all) are all-NaN.
+    """
+    keys = list(keys)
+    columns = KEY + FEATURE_COLUMNS + [c for c in windowed_columns(*_windows)
+                                       if c not in FEATURE_COLUMNS]
+    frame = pd.DataFrame(index=range(len(keys)), columns=columns, dtype=object)
+    found = np.zeros(len(keys), dtype=bool)
+
+    by_season = {}
+    for i, key in enumerate(keys):
+        by_season.setdefault(key[1], []).append(i)
+    parts = []
+    for season, idx in by_season.items():
+        try:
+            store = _store_for(season)
+        except FileNotFoundError:
+            continue
+        pos = np.asarray(store.positions([keys[i] for i in idx]))
+        hit = pos >= 0
+        rows = store.df.iloc[pos[hit]].copy()
+        rows.index = np.asarray(idx)[hit]
+        parts.append(rows)
+        found[np.asarray(idx)[hit]] = True
+
+    if parts:
+        rows = pd.concat(parts)
+        frame = rows.reindex(range(len(keys)))
+    return frame, found
+
+
+def get_week_features(season: int, week: int) -> pd.DataFrame:
+    """All featurized rows for one week of a season."""
+    return _store_for(season).week(season, week)
+
+
+def _parse_seasons(text: str):
+    if "-" in text:
+        start, end = text.split("-")
+        return list(range(int(start), int(end) + 1))
+    return [int(s) for s in text.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the precomputed feature store")
+    parser.add_argument("--seasons", default="2018-2024",
+                        help="range like 2018-2024 or list like 2023,2024")
+    parser.add_argument("--out", type=Path, default=FEATURE_PATH)
+    parser.add_argument("--player-windows", default=",".join(map(str, PLAYER_WINDOWS)),
+                        help="rolling windows a tuned bundle needs, e.g. 3,6")
+    parser.add_argument("--team-windows", default=",".join(map(str, TEAM_WINDOWS)))
+    args = parser.parse_args()
+    windows = windows_for(windowed_columns([int(w) for w in args.player_windows.split(",")],
+                                           [int(w) for w in args.team_windows.split(",")]))
+    store = build_feature_store(_parse_seasons(args.seasons), args.out, windows)
+    print(f"Built feature store with {len(store)} rows at {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# src/features.py
+import re
+
+import numpy as np
+import pandas as pd
+
+# Look-back of the per-player and per-team rolling means; the column names carry
+# the window (roll_touch3, team_rb_fp5), so several lengths can live side by side.
+PLAYER_WINDOWS = (3,)
+TEAM_WINDOWS = (5,)
+# Bumped whenever a feature's meaning changes. Bundles record the version they
+# were trained on, and the server refuses bundles trained on another one.
+#   1: team_rb_fp/opp_rb_fp rolled over the frame's rows in (player, week) order
+#   2: they average the team's previous game weeks in calendar order
+FEATURE_VERSION = 2
+_WINDOWED = re.compile(r"^(roll_touch|roll_fppt|team_rb_fp|opp_rb_fp)(\d+)$")
+
+# Keys of (group code, season * 100 + week) pairs; season * 100 + week stays below this
+_GAME_STRIDE = 1_000_000
+
+def _previous_sums(columns, codes: np.ndarray, window: int):
+    """
+    For rows ordered group-contiguously with group ``codes``: each of ``columns``
+    summed over the previous ``window`` rows of the same group.
+    """
+    n = len(codes)
+    pos = np.arange(n)
+    is_start = np.ones(n, dtype=bool)
+    is_start[1:] = codes[1:] != codes[:-1]
+    group_start = np.maximum.accumulate(np.where(is_start, pos, 0))
+
+    out = [np.zeros(n) for _ in columns]
+    for lag in range(1, window + 1):
+        idx = np.flatnonzero(pos - lag >= group_start)
+        for total, col in zip(out, columns):
+            total[idx] += col[idx - lag]
+    return out
+
+def _shifted_rolling_mean(values: pd.Series, keys: pd.Series, window: int) -> np.ndarray:
+    """
+    Vectorized equivalent of
+    ``values.groupby(keys).transform(lambda s: s.shift().rolling(window, min_periods=1).mean())``:
+    the mean of each row's previous ``window`` non-missing values within its group.
+    """
+    codes, _ = pd.factorize(keys)              # missing keys get -1, like groupby's dropna
+    order = np.argsort(codes, kind="stable")   # group-contiguous, original order within group
+    c = codes[order]
+    v = values.to_numpy(dtype=float, na_value=np.nan)[order]
+    ok = ~np.isnan(v)
+    total, count = _previous_sums([np.where(ok, v, 0.0), ok.astype(float)], c, window)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out_sorted = np.where(count > 0, total / count, np.nan)
+    out_sorted[c == -1] = np.nan
+    out = np.empty(len(v))
+    out[order] = out_sorted
+    return out
+
+def _previous_games_mean(values: pd.Series, keys: pd.Series, season: pd.Series,
+                         week: pd.Series, window: int) -> np.ndarray:
+    """
+    Mean of ``values`` over all rows of each row's group in the group's previous
+    ``window`` games (distinct season/week pairs), in calendar order. A row's
+    own week is excluded, so teammates never see each other's result from the
+    same game and no later week can leak in, whatever order the frame is in.
+    """
+    codes, _ = pd.factorize(keys)
+    has_key = codes >= 0
+    game = season.to_numpy(dtype=np.int64) * 100 + week.to_numpy(dtype=np.int64)
+    games, row_game = np.unique(codes[has_key].astype(np.int64) * _GAME_STRIDE + game[has_key],
+                                return_inverse=True)
+    v = values.to_numpy(dtype=float, na_value=np.nan)[has_key]
+    ok = ~np.isnan(v)
+    sums = np.bincount(row_game, weights=np.where(ok, v, 0.0), minlength=len(games))
+    counts = np.bincount(row_game, weights=ok.astype(float), minlength=len(games))
+    # ``games`` is sorted by group, then calendar: group-contiguous and chronological
+    total, count = _previous_sums([sums, counts], games // _GAME_STRIDE, window)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(count > 0, total / count, np.nan)
+    out = np.full(len(codes), np.nan)
+    out[has_key] = mean[row_game]
+    return out
+
+def windows_for(features):
+    """(player_windows, team_windows) needed to produce ``features``, defaults included."""
+    player, team = set(PLAYER_WINDOWS), set(TEAM_WINDOWS)
+    for name in features:
+        m = _WINDOWED.match(name)
+        if m:
+            (player if m.group(1).startswith("roll_") else team).add(int(m.group(2)))
+    return tuple(sorted(player)), tuple(sorted(team))
+
+def is_windowed(name: str) -> bool:
+    return bool(_WINDOWED.match(name))
+
+def windowed_columns(player_windows=PLAYER_WINDOWS, team_windows=TEAM_WINDOWS):
+    """Names of the rolling-mean columns add_features produces for these windows."""
+    return ([f"{name}{w}" for w in player_windows for name in ("roll_touch", "roll_fppt")]
+            + [f"{name}{w}" for w in team_windows for name in ("team_rb_fp", "opp_rb_fp")])
+
+def windowed_features(features, player_window: int, team_window: int):
+    """``features`` with the default rolling windows swapped for the given ones."""
+    out = []
+    for name in features:
+        m = _WINDOWED.match(name)
+        if m:
+            name = m.group(1) + str(player_window if m.group(1).startswith("roll_") else team_window)
+        out.append(name)
+    return out
+
+def add_features(df: pd.DataFrame, player_windows=PLAYER_WINDOWS,
+                 team_windows=TEAM_WINDOWS) -> pd.DataFrame:
+    df = df.copy()
+    # Upcast: the weekly frame keeps points as float32 to save memory
+    df["fp"] = df["fantasy_points_ppr"].astype(np.float64)
+    df["touches"] = df["carries"].fillna(0) + df["targets"].fillna(0)
+    df["fp_per_touch"] = df["fp"] / df["touches"].replace(0, np.nan)
+
+    for w in player_windows:
+        df[f"roll_touch{w}"] = _shifted_rolling_mean(df["touches"], df["player_id"], w)
+        df[f"roll_fppt{w}"] = _shifted_rolling_mean(df["fp_per_touch"], df["player_id"], w)
+    # Team and opponent windows span the previous w games in calendar order
+    for w in team_windows:
+        df[f"team_rb_fp{w}"] = _previous_games_mean(df["fp"], df["recent_team"],
+                                                    df["season"], df["week"], w)
+        df[f"opp_rb_fp{w}"] = _previous_games_mean(df["fp"], df["opponent_team"],
+                                                   df["season"], df["week"], w)
+    prev_team = df.groupby("player_id")["recent_team"].shift()
+    df["team_change"] = (df["recent_team"] != prev_team).astype(int)
+    df["games_with_team"] = (
+        df.groupby(["player_id", "recent_team"]).cumcount() + 1
+    )
+    df["games_since"] = (
+        df.groupby("player_id")["week"].diff().fillna(1)
+    )
+    return df
+
+def context_rows(player_windows=PLAYER_WINDOWS, team_windows=TEAM_WINDOWS):
+    """
+    Longest look-back of any window in add_features, per grouping key: rows
+    for players, games (season/week pairs) for teams and opponents.
+    """
+    return {"player_id": max(player_windows), "recent_team": max(team_windows),
+            "opponent_team": max(team_windows)}
+
+CONTEXT_ROWS = context_rows()
+
+def add_features_after(history: pd.DataFrame, df: pd.DataFrame,
+                       player_windows=PLAYER_WINDOWS, team_windows=TEAM_WINDOWS) -> pd.DataFrame:
+    """
+    add_features for ``df`` as if it were appended to ``history`` and the whole
+    frame featurized, without reprocessing all of ``history``.
+
+    Only the trailing rows of each player, and every row of each team's and
+    opponent's trailing games, that a rolling window can reach are carried
+    over as context; games_with_team is then shifted by the number of earlier
+    games with that team that fell outside the context.
+    """
+    if history is None or history.empty:
+        return add_features(df, player_windows, team_windows)
+
+    keep = np.zeros(len(history), dtype=bool)
+    game = history["season"].to_numpy(dtype=np.int64) * 100 + history["week"].to_numpy(dtype=np.int64)
+    for key, n in context_rows(player_windows, team_windows).items():
+        if key == "player_id":
+            keep |= (history.groupby(key).cumcount(ascending=False) < n).to_numpy()
+        else:
+            recent = (pd.Series(game, index=history.index).groupby(history[key], observed=True)
+                      .rank(method="dense", ascending=False))
+            keep |= (recent <= n).to_numpy()
+    context = history[keep]
+
+    out = add_features(pd.concat([context, df], ignore_index=True),
+                       player_windows, team_windows).iloc[len(context):]
+    out.index = df.index
+
+    pair = ["player_id", "recent_team"]
+    earlier = history.groupby(pair, observed=True).size().sub(
+        context.groupby(pair, observed=True).size(), fill_value=0)
+    offset = earlier.reindex(pd.MultiIndex.from_frame(out[pair])).fillna(0).to_numpy()
+    out["games_with_team"] = out["games_with_team"] + offset.astype(out["games_with_team"].dtype)
+    return out
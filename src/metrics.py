@@ -0,0 +1,193 @@
+# src/metrics.py
+import io
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from src.cache_utils import LRUCache
+
+# Seconds; spans a parquet read of a cached season up to a cold download.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_str(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, help: str, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict):
+        return tuple(str(labels.get(n, "")) for n in self.labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_one(key, value))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _render_one(self, key, value):
+        return [f"{self.name}{_label_str(self.labels, key)} {value:g}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return 0 if state is None else state[2]
+
+    def _render_one(self, key, state):
+        counts, total, n = state
+        names = self.labels + ("le",)
+        lines, cum = [], 0
+        for bound, c in zip(self.buckets, counts):
+            cum += c
+            lines.append(f"{self.name}_bucket{_label_str(names, key + (f'{bound:g}',))} {cum}")
+        lines.append(f"{self.name}_bucket{_label_str(names, key + ('+Inf',))} {n}")
+        lines.append(f"{self.name}_sum{_label_str(self.labels, key)} {total:.9g}")
+        lines.append(f"{self.name}_count{_label_str(self.labels, key)} {n}")
+        return lines
+
+
+REQUESTS = Counter(
+    "predictor_requests_total", "HTTP requests by route, status, result-cache outcome and model version",
+    ["route", "status", "cache", "model_version"])
+REQUEST_SECONDS = Histogram(
+    "predictor_request_seconds", "End-to-end request latency", ["route"])
+STAGE_SECONDS = Histogram(
+    "predictor_stage_seconds", "Time spent in each stage of the prediction path", ["stage"])
+ERRORS = Counter(
+    "predictor_errors_total",
+    "Prediction failures by reason (no_data is a 404, missing_features a 400); batch items count individually",
+    ["reason"])
+
+_REGISTRY = [REQUESTS, REQUEST_SECONDS, STAGE_SECONDS, ERRORS]
+
+
+def stage(name: str):
+    """``with stage("add_features"): ...`` records the block under predictor_stage_seconds."""
+    return STAGE_SECONDS.time(stage=name)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Profiling is opt-in twice over: the server must allow it, and each request must ask for it.
+PROFILING_ENABLED = os.environ.get("PREDICT_PROFILING", "0") == "1"
+PROFILE_HEADER = "x-profile"
+profiles = LRUCache(maxsize=int(os.environ.get("PREDICT_PROFILES_KEPT", 20)))
+
+
+class _Profile:
+    """Wraps pyinstrument's sampling profiler when installed, else cProfile."""
+
+    def __init__(self):
+        try:
+            from pyinstrument import Profiler
+            self._profiler = Profiler(async_mode="enabled")
+            self.kind = "pyinstrument"
+        except ImportError:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self.kind = "cprofile"
+
+    def start(self):
+        if self.kind == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self) -> str:
+        if self.kind == "pyinstrument":
+            self._profiler.stop()
+            return self._profiler.output_text(unicode=False, color=False)
+        self._profiler.disable()
+        import pstats
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(40)
+        return out.getvalue()
+
+
+@contextmanager
+def profiled(enabled: bool):
+    """
+    Profiles the enclosed block when ``enabled`` and keeps the report in ``profiles``.
+    Yields the profile id (None when not profiling).
+    """
+    if not enabled:
+        yield None
+        return
+    profile = _Profile()
+    try:
+        profile.start()
+    except (RuntimeError, ValueError):
+        # cProfile allows one active profiler per process; skip rather than fail the request
+        yield None
+        return
+    profile_id = uuid.uuid4().hex[:12]
+    try:
+        yield profile_id
+    finally:
+        profiles.set(profile_id, {"profiler": profile.kind, "report": profile.stop()})
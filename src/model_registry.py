@@ -0,0 +1,210 @@
+# src/model_registry.py
+import math
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from src.features import FEATURE_VERSION
+from src.model_utils import (CURRENT_PATH, LEGACY_FEATURE_VERSION, MODELS_DIR, TeamPriors,
+                             load_bundle, load_bundle_dir)
+
+
+class LoadedModel:
+    """One immutable, fully loaded bundle. Swapped as a whole, never mutated."""
+
+    def __init__(self, bundle: dict):
+        self.version = bundle.get("version", "legacy")
+        # Serving features computed differently from training would skew every prediction
+        self.feature_version = bundle.get("feature_version", LEGACY_FEATURE_VERSION)
+        if self.feature_version != FEATURE_VERSION:
+            raise ValueError(
+                f"Bundle {self.version} was trained on feature version {self.feature_version}, "
+                f"but features are now computed as version {FEATURE_VERSION}; "
+                f"retrain it with python -m src.train")
+        self.op_model = bundle["op_model"]
+        self.eff_model = bundle["eff_model"]
+        self.global_touch = bundle["global_touch"]
+        self.global_fppt = bundle["global_fppt"]
+        self.priors = bundle.get("priors") or TeamPriors.from_frame(
+            bundle["priors_team"], self.global_touch, self.global_fppt)
+        self.op_features = bundle["op_features"]
+        self.eff_features = bundle["eff_features"]
+        self.blend_k = bundle["blend_k"]
+        self.fppt_touch_std = bundle.get("fppt_touch_std")
+
+
+class _State(NamedTuple):
+    """Everything a request reads, published together and never mutated."""
+    models: Dict[str, LoadedModel]
+    default: Optional[str]
+    split: Optional[List[Tuple[str, float]]]    # (version, cumulative weight), summing to 1
+
+
+def _check_version(version: str):
+    # Versions name directories under models_dir; nothing else is loadable
+    if not version or version in (".", "..") or Path(version).name != version or "\\" in version:
+        raise ValueError(f"Invalid model version: {version!r}")
+
+
+class ModelRegistry:
+    """
+    Holds several loaded bundle versions and which one serves by default.
+
+    Readers never take the lock: every change builds a new _State (models,
+    default and split together) and publishes it with one assignment, so a
+    request sees either the old or the new state whole. Loading a bundle from
+    disk happens before the lock is taken, so a reload never stalls in-flight
+    predictions.
+    """
+
+    def __init__(self, models_dir: Path = MODELS_DIR, max_versions: int = 3):
+        self.models_dir = models_dir
+        self.max_versions = max_versions
+        self._state = _State({}, None, None)
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._current_seen = None
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def versions(self):
+        return sorted(self._state.models)
+
+    @property
+    def default_version(self):
+        return self._state.default
+
+    @property
+    def split(self):
+        split = self._state.split
+        return dict(_split_weights(split)) if split else None
+
+    def on_change(self, fn):
+        """Registers ``fn(registry)`` to be called after any swap."""
+        self._listeners.append(fn)
+
+    def _notify(self):
+        for fn in self._listeners:
+            fn(self)
+
+    def load(self, version: str = None, make_default: bool = True) -> LoadedModel:
+        """Loads ``version`` (or whatever models/CURRENT names) and optionally serves it by default."""
+        if version is None:
+            model = LoadedModel(load_bundle(self.models_dir))
+        else:
+            _check_version(version)
+            model = LoadedModel(load_bundle_dir(self.models_dir / version))
+
+        with self._lock:
+            state = self._state
+            models = dict(state.models)
+            models[model.version] = model
+            default = model.version if make_default or state.default is None else state.default
+            keep = {default} | {v for v, _ in (state.split or [])}
+            for v in sorted(models):
+                if len(models) <= self.max_versions:
+                    break
+                if v not in keep and v != model.version:
+                    del models[v]
+            self._state = _State(models, default, state.split)
+        self._notify()
+        return model
+
+    def unload(self, version: str):
+        with self._lock:
+            state = self._state
+            if version == state.default:
+                raise ValueError("Cannot unload the default version")
+            if state.split and any(v == version for v, _ in state.split):
+                raise ValueError("Cannot unload a version that is part of the traffic split")
+            models = dict(state.models)
+            models.pop(version, None)
+            self._state = state._replace(models=models)
+        self._notify()
+
+    def set_split(self, weights: dict = None):
+        """Routes traffic across versions by weight, e.g. {"v1": 0.9, "v2": 0.1}; None clears it."""
+        split = None
+        if weights:
+            bad = {v: w for v, w in weights.items() if not (math.isfinite(w) and w >= 0)}
+            if bad:
+                raise ValueError(f"Split weights must be finite and non-negative: {bad}")
+            total = float(sum(weights.values()))
+            if total <= 0:
+                raise ValueError("Split weights must sum to a positive number")
+            cum, split = 0.0, []
+            for version, weight in weights.items():
+                cum += weight / total
+                split.append((version, cum))
+        with self._lock:
+            state = self._state
+            unknown = [v for v, _ in (split or []) if v not in state.models]
+            if unknown:
+                raise KeyError(f"Unknown model versions: {unknown}")
+            self._state = state._replace(split=split)
+
+    def get(self, version: str = None, key=None) -> LoadedModel:
+        """
+        The model to serve with. An explicit ``version`` wins; otherwise the traffic
+        split (if any) picks one, deterministically by ``key`` so the same player
+        always lands in the same arm; otherwise the default.
+        """
+        models, default, split = self._state
+        if version is not None:
+            try:
+                return models[version]
+            except KeyError:
+                raise KeyError(f"Unknown model version: {version}")
+        if split:
+            u = (zlib.crc32(str(key).encode()) % 10_000) / 10_000 if key is not None \
+                else np.random.random()
+            for v, cum in split:
+                if u < cum and v in models:
+                    return models[v]
+        return models[default]
+
+    def check_current(self) -> bool:
+        """Loads the bundle named by models/CURRENT if it changed since last check."""
+        current = self.models_dir / CURRENT_PATH.name
+        if not current.exists():
+            return False
+        name = current.read_text().strip()
+        if name == self._current_seen:
+            return False
+        state = self._state
+        if not (name in state.models and name == state.default):
+            self.load(name)
+        self._current_seen = name
+        return True
+
+    def watch(self, interval: float = 10.0):
+        """Polls models/CURRENT in a daemon thread and swaps in new bundles as train.py writes them."""
+        if self._watcher is not None:
+            return
+        current = self.models_dir / CURRENT_PATH.name
+        if current.exists():
+            self._current_seen = current.read_text().strip()
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.check_current()
+                except Exception:
+                    # A half-written or corrupt bundle: keep serving the old one.
+                    pass
+
+        self._watcher = threading.Thread(target=run, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def _split_weights(split):
+    prev = 0.0
+    for version, cum in split:
+        yield version, cum - prev
+        prev = cum
@@ -1,10 +1,234 @@
 # src/model_utils.py
-import pickle
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
 from pathlib import Path
 
-BUNDLE_PATH = Path(__file__).parent.parent / "models" / "model_bundle.pkl"
+import numpy as np
+import pandas as pd
 
-def load_bundle():
+MODELS_DIR = Path(os.environ.get("NFL_MODELS_DIR", Path(__file__).parent.parent / "models"))
+BUNDLE_PATH = MODELS_DIR / "model_bundle.pkl"   # legacy pickle format
+CURRENT_PATH = MODELS_DIR / "CURRENT"           # names the active bundle directory
+SCHEMA_VERSION = 3
+# 1: team-only priors; 2 adds optional per-season priors; 3 records feature_version
+SUPPORTED_SCHEMAS = (1, 2, 3)
+# Bundles that don't record a feature version were trained on version 1 features
+LEGACY_FEATURE_VERSION = 1
+
+class LinearModel:
+    """
+    A fitted Pipeline(StandardScaler, Ridge) folded into one weight vector and
+    intercept: ((x - mean) / scale) @ coef + b == x @ (coef / scale) + b'.
+    """
+
+    def __init__(self, coef, intercept):
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        sc = pipeline.named_steps["sc"]
+        lr = pipeline.named_steps["lr"]
+        coef = np.asarray(lr.coef_, dtype=np.float64) / sc.scale_
+        return cls(coef, lr.intercept_ - coef @ sc.mean_)
+
+    def predict(self, X) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) @ self.coef + self.intercept
+
+class TeamPriors:
+    """
+    Team priors compiled into dense arrays indexed by [season row, team code].
+
+    The last team column holds the global means, so unknown teams need no
+    branch. With per-season priors, row 0 is all-global (for seasons before
+    the first one built) and a season uses the latest row at or before it.
+    """
+
+    def __init__(self, teams, touch, fppt, seasons=None):
+        self.teams = [str(t) for t in teams]
+        self._codes = {t: i for i, t in enumerate(self.teams)}
+        self.unknown = len(self.teams)
+        self.seasons = None if seasons is None else np.asarray(seasons, dtype=np.int64)
+        self.touch = np.atleast_2d(np.asarray(touch, dtype=np.float64))
+        self.fppt = np.atleast_2d(np.asarray(fppt, dtype=np.float64))
+
+    @classmethod
+    def from_frame(cls, priors: pd.DataFrame, global_touch: float, global_fppt: float):
+        """Compiles build_priors output indexed by team, or by (season, team)."""
+        if isinstance(priors.index, pd.MultiIndex):
+            touch = priors["team_touch_mean"].unstack("recent_team")
+            fppt = priors["team_fppt_mean"].unstack("recent_team").reindex_like(touch)
+            teams, seasons = list(touch.columns), list(touch.index)
+            touch, fppt = touch.to_numpy(dtype=np.float64), fppt.to_numpy(dtype=np.float64)
+        else:
+            teams, seasons = list(priors.index), None
+            touch = priors["team_touch_mean"].to_numpy(dtype=np.float64)[None, :]
+            fppt = priors["team_fppt_mean"].to_numpy(dtype=np.float64)[None, :]
+        return cls(teams,
+                   _with_globals(touch, global_touch, seasons is not None),
+                   _with_globals(fppt, global_fppt, seasons is not None),
+                   seasons)
+
+    def codes(self, teams) -> np.ndarray:
+        get, unknown = self._codes.get, self.unknown
+        teams = teams.tolist() if hasattr(teams, "tolist") else teams
+        return np.fromiter((get(t, unknown) for t in teams), dtype=np.intp, count=len(teams))
+
+    def rows(self, seasons) -> np.ndarray:
+        if self.seasons is None:
+            return np.zeros(len(seasons), dtype=np.intp)
+        return np.searchsorted(self.seasons, np.asarray(seasons, dtype=np.int64), side="right")
+
+    def lookup(self, teams, seasons):
+        """Prior touches and fp-per-touch for each (team, season) pair."""
+        r, c = self.rows(seasons), self.codes(teams)
+        return self.touch[r, c], self.fppt[r, c]
+
+def _with_globals(table: np.ndarray, global_value: float, per_season: bool) -> np.ndarray:
+    """Fills gaps with the global mean, appends the unknown-team column and, per season, the all-global row 0."""
+    table = np.where(np.isnan(table), global_value, table)
+    table = np.hstack([table, np.full((len(table), 1), global_value)])
+    if per_season:
+        table = np.vstack([np.full((1, table.shape[1]), global_value), table])
+    return table
+
+def _as_linear(model) -> LinearModel:
+    return model if isinstance(model, LinearModel) else LinearModel.from_pipeline(model)
+
+def _sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+def _checksum(files: dict) -> str:
+    h = hashlib.sha256()
+    for name in sorted(files):
+        h.update(f"{name}:{files[name]}\n".encode())
+    return h.hexdigest()
+
+def new_version() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+def save_bundle(bundle: dict, models_dir: Path = MODELS_DIR, version: str = None,
+                make_current: bool = True) -> Path:
+    """
+    Writes ``bundle`` as models/<version>/: a JSON manifest plus one .npy per array.
+    Pipelines are folded into LinearModels on the way out, so no pickle is involved.
+    """
+    version = version or new_version()
+    out = models_dir / version
+    out.mkdir(parents=True, exist_ok=True)
+
+    op_model = _as_linear(bundle["op_model"])
+    eff_model = _as_linear(bundle["eff_model"])
+    priors = bundle.get("priors") or TeamPriors.from_frame(
+        bundle["priors_team"], bundle["global_touch"], bundle["global_fppt"])
+    arrays = {
+        "op_coef": op_model.coef,
+        "eff_coef": eff_model.coef,
+        "prior_touch": priors.touch,
+        "prior_fppt": priors.fppt,
+    }
+    if priors.seasons is not None:
+        arrays["prior_seasons"] = priors.seasons
+    files = {}
+    for name, arr in arrays.items():
+        path = out / f"{name}.npy"
+        np.save(path, arr, allow_pickle=False)
+        files[path.name] = _sha256(path)
+
+    manifest = {
+        "schema_version": SCHEMA_VERSION,
+        "version": version,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "op_features": list(bundle["op_features"]),
+        "eff_features": list(bundle["eff_features"]),
+        "op_intercept": op_model.intercept,
+        "eff_intercept": eff_model.intercept,
+        "teams": priors.teams,
+        "global_touch": float(bundle["global_touch"]),
+        "global_fppt": float(bundle["global_fppt"]),
+        "blend_k": bundle["blend_k"],
+        # src.features.FEATURE_VERSION the models were trained on
+        "feature_version": int(bundle.get("feature_version", LEGACY_FEATURE_VERSION)),
+        # Per-touch efficiency noise for simulations; optional, older bundles lack it
+        "fppt_touch_std": bundle.get("fppt_touch_std"),
+        # Hyperparameters the bundle was trained with; informational only
+        "training": bundle.get("training"),
+        "files": files,
+        "checksum": _checksum(files),
+    }
+    (out / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+    if make_current:
+        current = models_dir / CURRENT_PATH.name
+        tmp = current.with_suffix(".tmp")
+        tmp.write_text(version)
+        tmp.replace(current)
+    return out
+
+def load_bundle_dir(path: Path, verify: bool = True) -> dict:
+    """Loads a models/<version>/ directory, memory-mapping the arrays."""
+    manifest = json.loads((path / "manifest.json").read_text())
+    if manifest.get("schema_version") not in SUPPORTED_SCHEMAS:
+        raise ValueError(f"Unsupported bundle schema {manifest.get('schema_version')} in {path}")
+    files = manifest["files"]
+    if verify:
+        actual = {name: _sha256(path / name) for name in files}
+        if actual != files or _checksum(actual) != manifest["checksum"]:
+            raise ValueError(f"Checksum mismatch in bundle {path}")
+
+    arr = {Path(name).stem: np.load(path / name, mmap_mode="r", allow_pickle=False)
+           for name in files}
+    if manifest["schema_version"] == 1:
+        # v1 stored bare team means; add the unknown-team column
+        priors = TeamPriors(manifest["teams"],
+                            _with_globals(arr["prior_touch"][None, :], manifest["global_touch"], False),
+                            _with_globals(arr["prior_fppt"][None, :], manifest["global_fppt"], False))
+    else:
+        priors = TeamPriors(manifest["teams"], arr["prior_touch"], arr["prior_fppt"],
+                            arr.get("prior_seasons"))
+    return {
+        "version":      manifest["version"],
+        "op_model":     LinearModel(arr["op_coef"], manifest["op_intercept"]),
+        "eff_model":    LinearModel(arr["eff_coef"], manifest["eff_intercept"]),
+        "priors":       priors,
+        "global_touch": manifest["global_touch"],
+        "global_fppt":  manifest["global_fppt"],
+        "op_features":  manifest["op_features"],
+        "eff_features": manifest["eff_features"],
+        "blend_k":      manifest["blend_k"],
+        "feature_version": manifest.get("feature_version", LEGACY_FEATURE_VERSION),
+        "fppt_touch_std": manifest.get("fppt_touch_std"),
+        "training":     manifest.get("training"),
+    }
+
+def load_legacy_bundle(path: Path = BUNDLE_PATH) -> dict:
+    """Reads the old model_bundle.pkl (needs sklearn) and compiles its pipelines."""
+    import pickle
+    with open(path, "rb") as f:
+        bundle = pickle.load(f)
+    bundle["op_model"] = _as_linear(bundle["op_model"])
+    bundle["eff_model"] = _as_linear(bundle["eff_model"])
+    bundle.setdefault("version", "legacy")
+    bundle.setdefault("feature_version", LEGACY_FEATURE_VERSION)
+    return bundle
+
+def load_bundle(models_dir: Path = MODELS_DIR) -> dict:
     """Returns the dict with models, priors, features, etc."""
-    with open(BUNDLE_PATH, "rb") as f:
-        return pickle.load(f)
\ No newline at end of file
+    current = models_dir / CURRENT_PATH.name
+    if current.exists():
+        return load_bundle_dir(models_dir / current.read_text().strip())
+    return load_legacy_bundle(models_dir / BUNDLE_PATH.name)
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert model_bundle.pkl to the versioned bundle format")
+    parser.add_argument("--pkl", type=Path, default=BUNDLE_PATH)
+    parser.add_argument("--version", default=None)
+    args = parser.parse_args()
+    out = save_bundle(load_legacy_bundle(args.pkl), args.pkl.parent, args.version)
+    print(f"Wrote bundle to {out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# src/player_index.py
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Dict, List, NamedTuple, Optional
+
+import pandas as pd
+
+_NON_ALNUM = re.compile(r"[^a-z0-9 ]+")
+_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+
+
+def normalize(name: str) -> str:
+    """Lower-case, accent-free, punctuation-free, single-spaced."""
+    name = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode()
+    name = _NON_ALNUM.sub(" ", name.lower().replace(".", " ").replace("'", ""))
+    return " ".join(w for w in name.split() if w not in _SUFFIXES)
+
+
+def _trigrams(text: str):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Player(NamedTuple):
+    player_id: str
+    name: str
+    team: str
+    position: str
+    season: int
+
+
+class PlayerIndex:
+    """
+    In-memory name -> player lookup. Every player is reachable by full name,
+    first name, last name, abbreviated name (b robinson) and roster nickname.
+
+    ``resolve`` tries, in order: exact alias (dict), alias prefix (bisect over
+    sorted aliases), then fuzzy match (trigram overlap). Ties go to the player
+    seen most recently, so "robinson" prefers an active player over a retired one.
+    """
+
+    def __init__(self, players: List[Player], aliases: Dict[str, set]):
+        self.players = {p.player_id: p for p in players}
+        self._aliases = {a: sorted(ids, key=self._rank) for a, ids in aliases.items()}
+        self._sorted = sorted(self._aliases)
+        self._grams = defaultdict(list)
+        for alias in self._sorted:
+            for g in _trigrams(alias):
+                self._grams[g].append(alias)
+
+    def _rank(self, player_id):
+        p = self.players[player_id]
+        return (-p.season, p.name)
+
+    def __len__(self):
+        return len(self.players)
+
+    def __contains__(self, alias: str):
+        return normalize(alias) in self._aliases
+
+    def exact(self, query: str) -> List[Player]:
+        return [self.players[i] for i in self._aliases.get(normalize(query), [])]
+
+    def prefix(self, query: str, limit: int = 5) -> List[Player]:
+        q = normalize(query)
+        out, seen = [], set()
+        i = bisect_left(self._sorted, q)
+        while i < len(self._sorted) and self._sorted[i].startswith(q) and len(out) < limit:
+            for pid in self._aliases[self._sorted[i]]:
+                if pid not in seen:
+                    seen.add(pid)
+                    out.append(self.players[pid])
+            i += 1
+        return sorted(out, key=lambda p: self._rank(p.player_id))[:limit]
+
+    def fuzzy(self, query: str, limit: int = 5, min_score: float = 0.45) -> List[Player]:
+        q = normalize(query)
+        grams = _trigrams(q)
+        if not grams:
+            return []
+        hits = Counter()
+        for g in grams:
+            hits.update(self._grams.get(g, ()))
+        scored = []
+        for alias, shared in hits.most_common(limit * 4):
+            score = shared / len(grams | _trigrams(alias))
+            if score >= min_score:
+                scored.append((score, alias))
+        scored.sort(key=lambda t: -t[0])
+        out, seen = [], set()
+        for _, alias in scored:
+            for pid in self._aliases[alias]:
+                if pid not in seen:
+                    seen.add(pid)
+                    out.append(self.players[pid])
+        return out[:limit]
+
+    def resolve(self, query: str, team: str = None, position: str = None) -> Optional[Player]:
+        """Best single match for ``query``, optionally restricted to a team or position."""
+        def ok(p):
+            return (team is None or p.team == team) and (position is None or p.position == position)
+        for lookup in (self.exact, self.prefix, self.fuzzy):
+            matches = [p for p in lookup(query) if ok(p)]
+            if matches:
+                return matches[0]
+        return None
+
+    @classmethod
+    def from_frames(cls, weekly: pd.DataFrame, rosters: pd.DataFrame = None) -> "PlayerIndex":
+        """Builds the index from nfl_data_py weekly data, plus roster nicknames when available."""
+        latest = (weekly.sort_values(["season", "week"])
+                        .drop_duplicates("player_id", keep="last"))
+        players, aliases = [], defaultdict(set)
+
+        def add(alias, pid):
+            alias = normalize(alias)
+            if alias:
+                aliases[alias].add(pid)
+
+        for row in latest.itertuples(index=False):
+            pid = row.player_id
+            name = getattr(row, "player_display_name", None) or row.player_name
+            players.append(Player(pid, name, row.recent_team, row.position, int(row.season)))
+            full = normalize(name)
+            add(full, pid)
+            parts = full.split()
+            if len(parts) > 1:
+                add(parts[0], pid)
+                add(parts[-1], pid)
+                add(f"{parts[0][0]} {parts[-1]}", pid)
+            add(row.player_name, pid)
+
+        if rosters is not None and not rosters.empty:
+            known = set(latest["player_id"])
+            for row in rosters.itertuples(index=False):
+                pid = getattr(row, "player_id", None)
+                if pid not in known:
+                    continue
+                for col in ("football_name", "first_name"):
+                    value = getattr(row, col, None)
+                    if isinstance(value, str):
+                        add(value, pid)
+                        last = getattr(row, "last_name", None)
+                        if isinstance(last, str):
+                            add(f"{value} {last}", pid)
+        return cls(players, aliases)
+
+
+def build_player_index(seasons) -> PlayerIndex:
+    """Index of everyone in the weekly data for ``seasons``; seasons that fail to load are skipped."""
+    from src.data_utils import load_rosters, load_weekly_names
+    weekly, rosters = [], []
+    for season in seasons:
+        try:
+            weekly.append(load_weekly_names(season))
+        except Exception:
+            continue
+        try:
+            rosters.append(load_rosters(season))
+        except Exception:
+            # Nicknames are a nice-to-have; names from weekly data still resolve.
+            pass
+    if not weekly:
+        raise FileNotFoundError(f"No weekly data available for {list(seasons)}")
+    return PlayerIndex.from_frames(pd.concat(weekly, ignore_index=True),
+                                   pd.concat(rosters, ignore_index=True) if rosters else None)
@@ -1,80 +1,576 @@
 # src/server.py
-from fastapi import FastAPI, HTTPException
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Union
+import hashlib
+import hmac
+import time
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-import nfl_data_py as nfl
+import numpy as np
 import pandas as pd
 
-from src.model_utils import load_bundle
-from src.train import add_features 
+from src.async_utils import SingleFlight, run_blocking
+from src.cache_utils import LRUCache
+from src.data_utils import current_season, refresh_season, warm_cache, warm_seasons_from_env
+from src.export_utils import (ARROW_STREAM, HAVE_MSGPACK, JSON, MSGPACK, NDJSON,
+                              PREDICTION_SCHEMA, encode, negotiate, prediction_batch,
+                              record_batch, schema_for)
+from src.feature_store import (forget_history, get_features_frame, get_week_features,
+                               reload_persisted, require_features, store_for_async, warm_stores)
+from src.metrics import (ERRORS, PROFILE_HEADER, PROFILING_ENABLED, REQUEST_SECONDS, REQUESTS,
+                         profiled, profiles, render, stage)
+from src.model_registry import LoadedModel, ModelRegistry
 
-app = FastAPI(title="Fantasy‑Points Predictor")
-bundle = load_bundle()
+# The bundle loads in the background at startup (or on first use), not at import
+registry = ModelRegistry()
 
-op_model = bundle["op_model"]
-eff_model = bundle["eff_model"]
-priors_team = bundle["priors_team"]
-global_touch = bundle["global_touch"]
-global_fppt = bundle["global_fppt"]
-op_features = bundle["op_features"]
-eff_features = bundle["eff_features"]
-blend_k = bundle["blend_k"]
+# Finished predictions keyed by (player_id, season, week, model_version, data_version).
+# The versions in the key make stale hits impossible; clearing on swap just frees memory.
+result_cache = LRUCache(maxsize=int(os.environ.get("PREDICT_CACHE_SIZE", 10_000)),
+                        ttl=float(os.environ.get("PREDICT_CACHE_TTL", 3600)))
+registry.on_change(lambda _: result_cache.clear())
+
+def _require_model_features(reg: ModelRegistry):
+    # Tuned bundles may use non-default rolling windows; featurize what they all need
+    require_features([f for v in reg.versions()
+                      for f in reg.get(v).op_features + reg.get(v).eff_features])
+
+registry.on_change(_require_model_features)
+
+# Model swaps and cache refreshes need "Authorization: Bearer $ADMIN_TOKEN";
+# without ADMIN_TOKEN those endpoints are turned off
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+# Upper bound on /project/season simulations per request
+MAX_SIMS = int(os.environ.get("PROJECT_MAX_SIMS", 20_000))
+
+# Media types by Accept header: bulk endpoints default to JSON, exports to Arrow
+BULK_TYPES = [JSON, ARROW_STREAM] + ([MSGPACK] if HAVE_MSGPACK else [])
+EXPORT_TYPES = [ARROW_STREAM] + ([MSGPACK] if HAVE_MSGPACK else []) + [NDJSON, JSON]
+
+_model_flight = SingleFlight()
+# Background warm-up progress, reported by /readyz
+warmup = {"models": False, "data": False, "error": None}
+
+def _load_models():
+    if registry.default_version is None:
+        registry.load()
+
+async def _models_ready():
+    """Waits for the default bundle, loading it here if the warm-up hasn't yet."""
+    if registry.default_version is None:
+        try:
+            await _model_flight.do("models", _load_models)
+        except (FileNotFoundError, ValueError) as e:
+            raise HTTPException(503, f"Model not loaded: {e}")
+
+async def _warm_up():
+    try:
+        await _models_ready()
+        warmup["models"] = True
+        # NFL_WARM_SEASONS=2023,2024 preloads those seasons
+        seasons = warm_seasons_from_env()
+        await run_blocking(warm_cache, seasons)
+        await run_blocking(reload_persisted)
+        # Featurize them and the in-progress season, with their history, ahead of the first request
+        await warm_stores(sorted({current_season(), *seasons}))
+    except Exception as e:
+        # Seasons that failed to warm still load on first use; a missing model keeps /readyz at 503
+        warmup["error"] = f"{type(e).__name__}: {e}"
+    warmup["data"] = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Accept connections right away; /readyz turns 200 once the warm-up is done
+    task = asyncio.create_task(_warm_up())
+    # MODEL_WATCH_INTERVAL=10 picks up bundles written by train.py without a restart
+    interval = float(os.environ.get("MODEL_WATCH_INTERVAL", 0))
+    if interval > 0:
+        registry.watch(interval)
+    yield
+    task.cancel()
+    registry.stop()
+
+app = FastAPI(title="Fantasy‑Points Predictor", lifespan=lifespan)
+
+@app.middleware("http")
+async def instrument(request: Request, call_next):
+    """
+    Request latency and counts per route. Handlers label the result-cache outcome
+    and serving model through ``request.state``. With PREDICT_PROFILING=1 a request
+    sending ``X-Profile: 1`` is profiled and answered with an ``X-Profile-Id``.
+    """
+    start = time.perf_counter()
+    with profiled(PROFILING_ENABLED and request.headers.get(PROFILE_HEADER) == "1") as profile_id:
+        response = await call_next(request)
+    route = request.scope.get("route")
+    # Templated paths keep label cardinality bounded (/cache/refresh/{season})
+    route = route.path if route is not None else "unmatched"
+    REQUEST_SECONDS.observe(time.perf_counter() - start, route=route)
+    REQUESTS.inc(route=route, status=response.status_code,
+                 cache=getattr(request.state, "cache", ""),
+                 model_version=getattr(request.state, "model_version", ""))
+    if profile_id:
+        response.headers["X-Profile-Id"] = profile_id
+    return response
 
 class PredictReq(BaseModel):
-    player_id: int
+    # nfl_data_py ids are GSIS strings like "00-0038542"; plain ints are still accepted
+    player_id: Union[int, str]
     season: int
     week: int
+    model_version: Optional[str] = None
 
 class PredictResp(BaseModel):
-    player_id: int
+    player_id: Union[int, str]
     season: int
     week: int
     expected_points: float
+    model_version: str
+
+class BatchReq(BaseModel):
+    items: List[PredictReq]
+    model_version: Optional[str] = None
+
+class WeekReq(BaseModel):
+    season: int
+    week: int
+    model_version: Optional[str] = None
+
+class BatchItemResp(BaseModel):
+    player_id: Union[int, str]
+    season: int
+    week: int
+    expected_points: Optional[float] = None
+    error: Optional[str] = None
+    model_version: Optional[str] = None
+
+class BatchResp(BaseModel):
+    predictions: List[BatchItemResp]
+
+class ProjectReq(BaseModel):
+    season: int
+    from_week: Optional[int] = None      # default: the week after the latest with data
+    through_week: Optional[int] = None   # default: the last regular-season week
+    player_ids: Optional[List[Union[int, str]]] = None
+    sims: int = 2000
+    seed: Optional[int] = None
+    model_version: Optional[str] = None
+
+class Projection(BaseModel):
+    player_id: Union[int, str]
+    recent_team: str
+    mean: float
+    std: float
+    percentiles: Dict[str, float]
+
+class ProjectResp(BaseModel):
+    season: int
+    from_week: int
+    through_week: int
+    sims: int
+    model_version: str
+    projections: List[Projection]
+
+class ReloadReq(BaseModel):
+    version: Optional[str] = None
+    make_default: bool = True
+
+class SplitReq(BaseModel):
+    weights: Optional[Dict[str, float]] = None
+
+def _get_model(version: Optional[str], key=None) -> LoadedModel:
+    try:
+        return registry.get(version, key)
+    except KeyError as e:
+        ERRORS.inc(reason="unknown_model")
+        raise HTTPException(404, str(e.args[0]))
+
+def _missing_features(model: LoadedModel, feat: pd.DataFrame):
+    """Per-row error message for rows lacking an op or eff feature, else None."""
+    op_na = feat[model.op_features].isna().to_numpy()
+    eff_na = feat[model.eff_features].isna().to_numpy()
+    errors = [None] * len(feat)
+    for i in np.flatnonzero(op_na.any(axis=1) | eff_na.any(axis=1)):
+        errors[i] = _missing_message(model, op_na[i], eff_na[i])
+    return errors
+
+def _missing_message(model: LoadedModel, op_na, eff_na):
+    if not (op_na.any() or eff_na.any()):
+        return None
+    missing_op = [f for f, na in zip(model.op_features, op_na) if na]
+    missing_eff = [f for f, na in zip(model.eff_features, eff_na) if na]
+    return f"Missing required features: op={missing_op}, eff={missing_eff}"
+
+def _expected_points(model: LoadedModel, feat: pd.DataFrame) -> np.ndarray:
+    """Scores every row at once; ``feat`` must not contain missing model features."""
+    with stage("op_predict"):
+        touch_hat = model.op_model.predict(feat[model.op_features].to_numpy(dtype=float))
+    with stage("eff_predict"):
+        fppt_hat = model.eff_model.predict(feat[model.eff_features].to_numpy(dtype=float))
+    return _blend(model, touch_hat, fppt_hat, feat["games_with_team"].to_numpy(dtype=float),
+                  feat["recent_team"], feat["season"])
+
+def _blend(model: LoadedModel, touch_hat, fppt_hat, n, teams, seasons):
+    """Shrinks the model estimates toward the team priors by games with the team."""
+    with stage("blend"):
+        prior_touches, prior_fppt = model.priors.lookup(teams, seasons)
+
+        w = n / (n + model.blend_k)
+        touch_blend = w * touch_hat + (1 - w) * prior_touches
+        fppt_blend = w * fppt_hat + (1 - w) * prior_fppt
+
+    return touch_blend * fppt_blend
+
+def _score_batch(feat: pd.DataFrame, found: np.ndarray, requested: List[Optional[str]]):
+    """
+    Expected points, per-row error and per-row model version for a frame where
+    some rows may be unusable. Rows are grouped by the model serving them, so a
+    traffic split still scores each arm in one vectorized call.
+    """
+    models = [_get_model(version, pid) for version, pid in zip(requested, feat["player_id"])]
+    points = np.full(len(feat), np.nan)
+    errors = [None] * len(feat)
+    for i in np.flatnonzero(~found):
+        errors[i] = "No data for that player/season/week"
+    ERRORS.inc(int((~found).sum()), reason="no_data")
+
+    by_version = {}
+    for i, model in enumerate(models):
+        by_version.setdefault(model.version, (model, []))[1].append(i)
+    for model, idx in by_version.values():
+        idx = np.asarray(idx)
+        idx = idx[found[idx]]
+        if not len(idx):
+            continue
+        sub = feat.iloc[idx]
+        sub_errors = _missing_features(model, sub)
+        ok = np.array([e is None for e in sub_errors], dtype=bool)
+        ERRORS.inc(int((~ok).sum()), reason="missing_features")
+        for i, err in zip(idx, sub_errors):
+            errors[i] = err
+        if ok.any():
+            points[idx[ok]] = _expected_points(model, sub[ok])
+    return points, errors, [m.version for m in models]
+
+async def _ensure_seasons(seasons):
+    """Loads and featurizes each season off the event loop; True if any season has no data."""
+    missing = False
+    for season in set(seasons):
+        try:
+            await store_for_async(season)
+        except FileNotFoundError:
+            missing = True
+    return missing
+
+def _negotiate(request: Request, offered) -> str:
+    media_type = negotiate(request.headers.get("accept"), offered)
+    if media_type is None:
+        raise HTTPException(406, f"Acceptable media types: {', '.join(offered)}")
+    return media_type
+
+def _encoded(media_type: str, batch) -> Response:
+    return Response(b"".join(encode(media_type, PREDICTION_SCHEMA, [batch])), media_type=media_type)
+
+def _season_weeks(store, season: int):
+    df = store.df
+    return np.unique(df["week"].to_numpy()[df["season"].to_numpy() == season]).tolist()
+
+def _cache_headers(key):
+    etag = '"' + hashlib.sha1(repr(key).encode()).hexdigest()[:16] + '"'
+    # Always revalidate: a hot-swapped model changes the answer even for finished seasons
+    return {"ETag": etag, "Cache-Control": "no-cache"}
 
 @app.post("/predict", response_model=PredictResp)
-def predict(req: PredictReq):
-    df = nfl.import_weekly_data(years=[req.season])
-    df = df[(df.player_id == req.player_id) & 
-            (df.season == req.season)   & 
-            (df.week == req.week)]
-    if df.empty:
+async def predict(req: PredictReq, request: Request, response: Response):
+    await _models_ready()
+    model = _get_model(req.model_version, req.player_id)
+    request.state.model_version = model.version
+    try:
+        with stage("load_store"):
+            store = await store_for_async(req.season)
+    except FileNotFoundError:
+        ERRORS.inc(reason="no_data")
+        raise HTTPException(404, "No data for that season")
+
+    key = (req.player_id, req.season, req.week, model.version, store.version)
+    headers = _cache_headers(key)
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        request.state.cache = "not_modified"
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+    cached = result_cache.get(key)
+    if cached is not None:
+        request.state.cache = "hit"
+        return cached
+    request.state.cache = "miss"
+
+    with stage("lookup"):
+        i = store.position(req.player_id, req.season, req.week)
+    if i < 0:
+        ERRORS.inc(reason="no_data")
         raise HTTPException(404, "No data for that player/season/week")
-    row = add_features(df).iloc[0]
-
-    # Check if we have all required features
-    missing_op = [f for f in op_features if pd.isna(row[f])]
-    missing_eff = [f for f in eff_features if pd.isna(row[f])]
-    
-    if missing_op or missing_eff:
-        raise HTTPException(400, f"Missing required features: op={missing_op}, eff={missing_eff}")
-    
-    X_op  = row[op_features].values.reshape(1, -1)
-    X_eff = row[eff_features].values.reshape(1, -1)
-
-    touch_hat = float(op_model.predict(X_op))
-    fppt_hat  = float(eff_model.predict(X_eff))
-
-    n = row["games_with_team"]
-    team = row["recent_team"]
-    prior_touches = (priors_team
-                     .get("team_touch_mean")
-                     .loc[team]
-                     if team in priors_team.index
-                     else global_touch)
-    prior_fppt = (priors_team
-                  .get("team_fppt_mean")
-                  .loc[team]
-                  if team in priors_team.index
-                  else global_fppt)
-
-    w = n / (n + blend_k)
-    touch_blend = w * touch_hat + (1 - w) * prior_touches
-    fppt_blend = w * fppt_hat + (1 - w) * prior_fppt
-
-    pred = touch_blend * fppt_blend
-
-    return PredictResp(
+
+    pred, error = _score_row(model, store, i, req.season)
+    if error:
+        ERRORS.inc(reason="missing_features")
+        raise HTTPException(400, error)
+
+    result = PredictResp(
         player_id=req.player_id,
         season=req.season,
         week=req.week,
-        expected_points=pred
-    )
\ No newline at end of file
+        expected_points=pred,
+        model_version=model.version
+    )
+    result_cache.set(key, result)
+    return result
+
+def _score_row(model: LoadedModel, store, i: int, season: int):
+    """
+    (expected points, None) for store row ``i``, or (None, error) if it lacks a
+    model feature. Scores the store's float vectors directly, no DataFrame involved.
+    """
+    with stage("check_features"):
+        x_op = store.vector(i, model.op_features)
+        x_eff = store.vector(i, model.eff_features)
+        error = _missing_message(model, np.isnan(x_op), np.isnan(x_eff))
+    if error:
+        return None, error
+
+    with stage("op_predict"):
+        touch_hat = model.op_model.predict(x_op[None, :])
+    with stage("eff_predict"):
+        fppt_hat = model.eff_model.predict(x_eff[None, :])
+    return float(_blend(model, touch_hat, fppt_hat, store.vector(i, ["games_with_team"]),
+                        store.teams[i:i + 1], [season])[0]), None
+
+def _batch_sync(keys, requested):
+    with stage("lookup"):
+        feat, found = get_features_frame(keys)
+    feat["player_id"] = [k[0] for k in keys]
+    return _score_batch(feat, found, requested)
+
+def _batch_encoded(media_type, keys, requested):
+    points, errors, versions = _batch_sync(keys, requested)
+    player_ids, seasons, weeks = zip(*keys) if keys else ((), (), ())
+    return _encoded(media_type, prediction_batch(player_ids, seasons, weeks,
+                                                 points, errors, versions))
+
+@app.post("/predict/batch", response_model=BatchResp)
+async def predict_batch(req: BatchReq, request: Request):
+    """
+    Scores many players in one call; failures are reported per item instead of
+    failing the batch. ``Accept: application/vnd.apache.arrow.stream`` (or
+    ``application/x-msgpack``) answers with one columnar batch instead of JSON.
+    """
+    media_type = _negotiate(request, BULK_TYPES)
+    keys = [(item.player_id, item.season, item.week) for item in req.items]
+    requested = [item.model_version or req.model_version for item in req.items]
+    await _models_ready()
+    await _ensure_seasons(k[1] for k in keys)
+    if media_type != JSON:
+        return await run_blocking(_batch_encoded, media_type, keys, requested)
+    points, errors, versions = await run_blocking(_batch_sync, keys, requested)
+    return BatchResp(predictions=[
+        BatchItemResp(player_id=pid, season=season, week=week,
+                      expected_points=None if err else float(pts), error=err,
+                      model_version=version)
+        for (pid, season, week), pts, err, version in zip(keys, points, errors, versions)
+    ])
+
+def _week_sync(season, week, version):
+    with stage("lookup"):
+        feat = get_week_features(season, week)
+    points, errors, versions = _score_batch(feat, np.ones(len(feat), dtype=bool),
+                                            [version] * len(feat))
+    return feat, points, errors, versions
+
+def _week_batch(season, week, version):
+    feat, points, errors, versions = _week_sync(season, week, version)
+    return prediction_batch(feat["player_id"], np.full(len(feat), season), np.full(len(feat), week),
+                            points, errors, versions)
+
+@app.post("/predict/week", response_model=BatchResp)
+async def predict_week(req: WeekReq, request: Request):
+    """Scores every player with data in the given week; negotiates formats like /predict/batch."""
+    media_type = _negotiate(request, BULK_TYPES)
+    await _models_ready()
+    if await _ensure_seasons([req.season]):
+        ERRORS.inc(reason="no_data")
+        raise HTTPException(404, "No data for that season")
+    if media_type != JSON:
+        batch = await run_blocking(_week_batch, req.season, req.week, req.model_version)
+        return _encoded(media_type, batch)
+    feat, points, errors, versions = await run_blocking(_week_sync, req.season, req.week,
+                                                        req.model_version)
+    return BatchResp(predictions=[
+        BatchItemResp(player_id=pid, season=req.season, week=req.week,
+                      expected_points=None if err else float(pts), error=err,
+                      model_version=version)
+        for pid, pts, err, version in zip(feat["player_id"], points, errors, versions)
+    ])
+
+@app.get("/export/predictions/{season}")
+async def export_predictions(season: int, request: Request, model_version: Optional[str] = None):
+    """
+    Every scored player-week of a season, streamed one week per record batch:
+    an Arrow IPC stream by default, msgpack or NDJSON on request.
+    """
+    media_type = _negotiate(request, EXPORT_TYPES)
+    await _models_ready()
+    _get_model(model_version)       # unknown versions fail before the stream starts
+    if await _ensure_seasons([season]):
+        ERRORS.inc(reason="no_data")
+        raise HTTPException(404, "No data for that season")
+    weeks = _season_weeks(await store_for_async(season), season)
+    # A plain generator: Starlette pulls each week on its thread pool, off the event loop
+    batches = (_week_batch(season, week, model_version) for week in weeks)
+    return StreamingResponse(encode(media_type, PREDICTION_SCHEMA, batches), media_type=media_type)
+
+@app.get("/export/features/{season}")
+async def export_features(season: int, request: Request):
+    """A season's feature store rows, streamed one week per record batch like /export/predictions."""
+    media_type = _negotiate(request, EXPORT_TYPES)
+    try:
+        store = await store_for_async(season)
+    except FileNotFoundError:
+        ERRORS.inc(reason="no_data")
+        raise HTTPException(404, "No data for that season")
+    schema = schema_for(store.df)
+    batches = (record_batch(store.week(season, week), schema)
+               for week in _season_weeks(store, season))
+    return StreamingResponse(encode(media_type, schema, batches), media_type=media_type)
+
+def _project_sync(model: LoadedModel, store, req: ProjectReq, from_week: int, through_week: int):
+    # Imported on first use: most workers never serve this endpoint
+    from src.simulate import simulate_rest_of_season
+    df = store.df
+    rows = df[df["season"].to_numpy() == req.season]
+    rows = rows[rows["week"].to_numpy() < from_week]
+    if req.player_ids is not None:
+        wanted = {str(pid) for pid in req.player_ids}
+        rows = rows[rows["player_id"].astype(str).isin(wanted).to_numpy()]
+    if rows.empty:
+        return None
+    with stage("simulate"):
+        return simulate_rest_of_season(model, rows, through_week, req.sims, req.seed,
+                                       first_week=from_week)
+
+@app.post("/project/season", response_model=ProjectResp)
+async def project_season(req: ProjectReq):
+    """
+    Rest-of-season Monte Carlo: ``sims`` simulated trajectories per player from
+    ``from_week`` through ``through_week``, summarized as total-points percentiles.
+    """
+    await _models_ready()
+    model = _get_model(req.model_version)
+    if not 1 <= req.sims <= MAX_SIMS:
+        raise HTTPException(400, f"sims must be between 1 and {MAX_SIMS}")
+    if await _ensure_seasons([req.season]):
+        ERRORS.inc(reason="no_data")
+        raise HTTPException(404, "No data for that season")
+    store = await store_for_async(req.season)
+    from src.simulate import last_regular_week
+    from_week = req.from_week
+    if from_week is None:
+        from_week = max(_season_weeks(store, req.season)) + 1
+    through_week = req.through_week or last_regular_week(req.season)
+    if from_week > through_week:
+        raise HTTPException(400, f"from_week {from_week} is after through_week {through_week}")
+    out = await run_blocking(_project_sync, model, store, req, from_week, through_week)
+    if out is None:
+        ERRORS.inc(reason="no_data")
+        raise HTTPException(404, "No data for those players before that week")
+    names = out.attrs["percentiles"]
+    return ProjectResp(
+        season=req.season, from_week=out.attrs["first_week"],
+        through_week=out.attrs["through_week"], sims=req.sims, model_version=model.version,
+        projections=[Projection(player_id=pid, recent_team=team, mean=mean, std=std,
+                                percentiles=dict(zip(names, pct)))
+                     for pid, team, mean, std, *pct in out[["player_id", "recent_team", "mean", "std"]
+                                                            + names].itertuples(index=False)])
+
+@app.get("/healthz")
+@app.get("/livez")
+def livez():
+    """Liveness: the process is up and serving. Touches no data or models."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: 200 once the model and warm seasons are loaded, 503 while warming up."""
+    ready = registry.default_version is not None and warmup["data"]
+    body = {"status": "ready" if ready else "warming", "model_version": registry.default_version,
+            **warmup}
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text exposition of request counts, errors and per-stage latency."""
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(profile_id: str):
+    """The report for a request profiled via ``X-Profile: 1``."""
+    profile = profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(404, "Unknown or expired profile id")
+    return f"# profiler: {profile['profiler']}\n{profile['report']}"
+
+@app.get("/cache/stats")
+def cache_stats():
+    return {"predictions": result_cache.stats()}
+
+def require_admin(authorization: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(403, "Admin endpoints are disabled; set ADMIN_TOKEN to enable them")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(401, "Missing or wrong admin token",
+                            headers={"WWW-Authenticate": "Bearer"})
+
+@app.post("/cache/refresh/{season}", dependencies=[Depends(require_admin)])
+async def refresh_cache(season: int):
+    """Re-downloads a season, e.g. after a new week of an in-progress season is published."""
+    df = await run_blocking(refresh_season, season)
+    forget_history()
+    return {"season": season, "rows": len(df)}
+
+@app.get("/admin/models", dependencies=[Depends(require_admin)])
+def list_models():
+    return {"versions": registry.versions(),
+            "default": registry.default_version,
+            "split": registry.split}
+
+@app.post("/admin/models/reload", dependencies=[Depends(require_admin)])
+def reload_model(req: ReloadReq):
+    """Loads a bundle (default: whatever models/CURRENT names) and swaps it in atomically."""
+    try:
+        model = registry.load(req.version, req.make_default)
+    except (FileNotFoundError, ValueError) as e:
+        raise HTTPException(400, f"Could not load bundle: {e}")
+    return {"loaded": model.version, **list_models()}
+
+@app.post("/admin/models/split", dependencies=[Depends(require_admin)])
+def set_split(req: SplitReq):
+    """Splits default traffic across loaded versions by weight; an empty body clears the split."""
+    try:
+        registry.set_split(req.weights)
+    except KeyError as e:
+        raise HTTPException(404, str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return list_models()
+
+@app.delete("/admin/models/{version}", dependencies=[Depends(require_admin)])
+def unload_model(version: str):
+    try:
+        registry.unload(version)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return list_models()
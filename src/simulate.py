@@ -0,0 +1,273 @@
+# src/simulate.py
+import argparse
+import re
+import time
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+_ROLLING = re.compile(r"^roll_(touch|fppt)(\d+)$")
+# Used when a bundle predates train.fppt_touch_std
+DEFAULT_FPPT_TOUCH_STD = 2.0
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+
+# Draws come from inverse-CDF tables indexed by random integers, several times
+# faster than Generator.poisson / standard_normal on millions of cells.
+# Poisson means are rounded to 1/_LAM_STEPS and capped at _LAM_MAX touches.
+_LAM_STEPS = 16
+_LAM_MAX = 60
+# Cells (sims x players) simulated at a time; keeps the working set in cache
+_CHUNK_CELLS = 1 << 16
+_tables = {}
+
+
+def _poisson_table() -> np.ndarray:
+    """[mean * _LAM_STEPS, u] -> Poisson quantile at the midpoint of 256 uniform bins."""
+    if "poisson" not in _tables:
+        lam = np.arange(_LAM_MAX * _LAM_STEPS + 1) / _LAM_STEPS
+        k = np.arange(4 * _LAM_MAX)
+        log_pmf = (k[None, :] * np.log(np.maximum(lam[:, None], 1e-300)) - lam[:, None]
+                   - np.cumsum(np.log(np.maximum(k, 1)))[None, :])
+        cdf = np.cumsum(np.exp(log_pmf), axis=1)
+        cdf[0] = 1.0                                    # mean 0: always 0 touches
+        u = (np.arange(256) + 0.5) / 256
+        table = (cdf[:, :, None] < u[None, None, :]).sum(axis=1)
+        _tables["poisson"] = table.astype(np.float32).ravel()
+    return _tables["poisson"]
+
+
+def _normal_table() -> np.ndarray:
+    """Standard normal quantiles at the midpoints of 65536 uniform bins."""
+    if "normal" not in _tables:
+        dist = NormalDist()
+        _tables["normal"] = np.array([dist.inv_cdf((i + 0.5) / 65536) for i in range(65536)],
+                                     dtype=np.float32)
+    return _tables["normal"]
+
+
+def last_regular_week(season: int) -> int:
+    return 18 if season >= 2021 else 17
+
+
+def _start_state(rows: pd.DataFrame, depth: int):
+    """
+    Each player's latest row, plus their last ``depth`` touches and
+    fp_per_touch values as [depth, players] arrays, newest first (NaN-padded).
+    """
+    rows = rows.sort_values(["player_id", "week"], kind="stable")
+    by_player = rows.groupby("player_id", observed=True, sort=False)
+    last = by_player.tail(1).reset_index(drop=True)
+    recent = by_player.tail(depth)
+    player = pd.Index(last["player_id"].astype(object)).get_indexer(recent["player_id"].astype(object))
+    age = recent.groupby("player_id", observed=True, sort=False).cumcount(ascending=False).to_numpy()
+    touches = np.full((depth, len(last)), np.nan)
+    fppt = np.full((depth, len(last)), np.nan)
+    touches[age, player] = recent["touches"].to_numpy(dtype=float)
+    fppt[age, player] = recent["fp_per_touch"].to_numpy(dtype=float)
+    return last, touches, fppt
+
+
+class _Rolling:
+    """
+    Trailing NaN-skipping means of one simulated stat over several windows.
+    A ring buffer holds the last ``max(windows)`` values per (sim, player),
+    with NaN stored as 0 plus a 0/1 "present" flag; each window keeps a
+    running sum and count, so a step costs O(windows) array passes.
+    """
+
+    def __init__(self, recent: np.ndarray, windows, n_sims: int):
+        self.size = max(windows)
+        self.t = 0
+        ok = ~np.isnan(recent[:self.size])
+        # Value from ``age`` steps back lives in slot (-1 - age) % size
+        slots = (-1 - np.arange(self.size)) % self.size
+        self.values = np.zeros((self.size, n_sims, recent.shape[1]), dtype=np.float32)
+        self.present = np.zeros_like(self.values)
+        self.values[slots] = np.where(ok, recent[:self.size], 0)[:, None, :]
+        self.present[slots] = ok[:, None, :]
+        self.sums, self.counts = {}, {}
+        for w in windows:
+            self.sums[w] = self.values[slots[:w]].sum(axis=0)
+            self.counts[w] = self.present[slots[:w]].sum(axis=0)
+
+    def mean(self, w: int) -> np.ndarray:
+        # NaN where the window holds no values (counts are exact, sums may carry rounding)
+        out = np.full_like(self.sums[w], np.nan)
+        return np.divide(self.sums[w], self.counts[w], out=out, where=self.counts[w] > 0)
+
+    def push(self, values: np.ndarray, present=1.0):
+        """Appends one step; ``present`` is 0 where the value is missing (``values`` 0 there)."""
+        for w in self.sums:
+            old = (self.t - w) % self.size
+            self.sums[w] += values
+            self.sums[w] -= self.values[old]
+            self.counts[w] += present
+            self.counts[w] -= self.present[old]
+        self.values[self.t % self.size] = values
+        self.present[self.t % self.size] = present
+        self.t += 1
+
+
+def simulate_rest_of_season(model, rows: pd.DataFrame, through_week: int, n_sims: int = 2000,
+                            seed: int = None, percentiles=DEFAULT_PERCENTILES,
+                            first_week: int = None) -> pd.DataFrame:
+    """
+    Monte Carlo rest-of-season totals for every player in ``rows`` (featurized
+    rows of one season, all before ``first_week``) over weeks ``first_week``
+    through ``through_week``. ``first_week`` defaults to the week after the
+    latest in ``rows``.
+
+    Each simulated week scores the op/eff models on the current features,
+    blends them with the team priors as the server does, draws touches from a
+    Poisson around the opportunity estimate and per-game efficiency from a
+    normal whose spread shrinks with touches (model.fppt_touch_std per touch), then pushes both into the
+    rolling features (roll_touch*, roll_fppt*) and adds a game with the team.
+    Every trajectory of every player advances together as [sims, players]
+    arrays. Players are assumed to stay on their team and play every week;
+    team-level features hold at their latest value and opponent features at
+    the season average, since future opponents aren't in the data.
+    """
+    rng = np.random.default_rng(seed)
+    features = list(dict.fromkeys(model.op_features + model.eff_features))
+    rolling = {f: (m.group(1), int(m.group(2))) for f in features if (m := _ROLLING.match(f))}
+    windows = {"touch": sorted({w for s, w in rolling.values() if s == "touch"}) or [1],
+               "fppt": sorted({w for s, w in rolling.values() if s == "fppt"}) or [1]}
+
+    last, recent_touches, recent_fppt = _start_state(
+        rows, max(windows["touch"] + windows["fppt"]))
+    n_players = len(last)
+    season = int(rows["season"].max())
+    if first_week is None:
+        first_week = int(rows["week"].max()) + 1
+    n_weeks = max(through_week - first_week + 1, 0)
+
+    # Per-player inputs that don't depend on the draws
+    static = {}
+    for f in features:
+        if f in rolling or f in ("games_with_team", "team_change"):
+            continue
+        col = rows[f].to_numpy(dtype=float)
+        fallback = np.nanmean(col) if np.isfinite(col).any() else 0.0
+        value = (np.full(n_players, fallback) if f.startswith("opp_")
+                 else last[f].to_numpy(dtype=float))
+        static[f] = np.where(np.isnan(value), fallback, value)
+    games = last["games_with_team"].to_numpy(dtype=float)
+    prior_touch, prior_fppt = model.priors.lookup(last["recent_team"], np.full(n_players, season))
+    sd = np.float32(model.fppt_touch_std or DEFAULT_FPPT_TOUCH_STD)
+    poisson, normal = _poisson_table(), _normal_table()
+
+    def linear_terms(linear, names, n):
+        # Static terms fold into one per-player offset; rolling ones vary per sim
+        offset = np.full(n_players, linear.intercept)
+        terms = []
+        for coef, f in zip(linear.coef, names):
+            if f in rolling:
+                terms.append((np.float32(coef), *rolling[f]))
+            elif f == "games_with_team":
+                offset = offset + coef * n
+            elif f != "team_change":        # no team changes: always 0
+                offset = offset + coef * static[f]
+        return offset.astype(np.float32), terms
+
+    weeks = []
+    for t in range(n_weeks):
+        n = games + t + 1
+        weight = n / (n + model.blend_k)
+        weeks.append((weight.astype(np.float32),
+                      linear_terms(model.op_model, model.op_features, n),
+                      linear_terms(model.eff_model, model.eff_features, n),
+                      ((1 - weight) * prior_touch).astype(np.float32),
+                      ((1 - weight) * prior_fppt).astype(np.float32)))
+    fppt_fallback = prior_fppt.astype(np.float32)
+
+    totals = np.zeros((n_sims, n_players), dtype=np.float32)
+    # Sims are independent: run them in chunks small enough to stay in cache
+    chunk = max(1, _CHUNK_CELLS // max(n_players, 1))
+    for start in range(0, n_sims, chunk):
+        m = min(chunk, n_sims - start)
+        total = totals[start:start + m]
+        roll = {"touch": _Rolling(recent_touches, windows["touch"], m),
+                "fppt": _Rolling(recent_fppt, windows["fppt"], m)}
+
+        def score(offset, terms):
+            out = np.repeat(offset[None, :], m, axis=0)
+            for coef, stat, w in terms:
+                term = roll[stat].mean(w)
+                term *= coef
+                out += term
+            return out
+
+        for weight, op, eff, prior_touch_part, prior_fppt_part in weeks:
+            touch_mean = score(*op)
+            touch_mean *= weight
+            touch_mean += prior_touch_part
+            fppt_mean = score(*eff)
+            # Three straight touchless weeks leave no efficiency history: use the prior alone
+            np.copyto(fppt_mean, np.broadcast_to(fppt_fallback, fppt_mean.shape),
+                      where=np.isnan(fppt_mean))
+            fppt_mean *= weight
+            fppt_mean += prior_fppt_part
+
+            u = np.frombuffer(rng.bytes(3 * m * n_players), dtype=np.uint8)
+            np.clip(touch_mean, 0, _LAM_MAX, out=touch_mean)
+            touch_mean *= _LAM_STEPS
+            touch_mean += 0.5
+            cell = touch_mean.astype(np.int32)
+            cell <<= 8
+            cell += u[:m * n_players].reshape(m, n_players)
+            touches = poisson.take(cell)
+            z = normal.take(u[m * n_players:].view(np.uint16).reshape(m, n_players))
+
+            # Points = touches * game efficiency, whose noise is sd / sqrt(touches)
+            z *= np.sqrt(touches)
+            z *= sd
+            points = np.multiply(touches, fppt_mean, out=fppt_mean)
+            points += z
+            total += points
+            roll["touch"].push(touches)
+            # Game fp_per_touch; touchless games add nothing to roll_fppt, as in add_features
+            played = np.minimum(touches, 1)
+            roll["fppt"].push(np.divide(points, np.maximum(touches, 1), out=z), played)
+
+    out = pd.DataFrame({"player_id": last["player_id"].astype(object),
+                        "recent_team": last["recent_team"].astype(object),
+                        "mean": totals.mean(axis=0, dtype=np.float64),
+                        "std": totals.std(axis=0, dtype=np.float64)})
+    for q, values in zip(percentiles, np.percentile(totals, percentiles, axis=0)):
+        out[f"p{q:g}"] = values
+    out.attrs.update(season=season, first_week=first_week, through_week=through_week,
+                     n_sims=n_sims, percentiles=[f"p{q:g}" for q in percentiles])
+    return out.sort_values("mean", ascending=False, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Monte Carlo rest-of-season projections for every player")
+    parser.add_argument("--season", type=int, required=True)
+    parser.add_argument("--from-week", type=int, required=True,
+                        help="first week to simulate; earlier weeks are history")
+    parser.add_argument("--through-week", type=int, default=None)
+    parser.add_argument("--sims", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    # Imported here: the simulation itself needs only a model and rows
+    from src.feature_store import require_features, season_store
+    from src.model_registry import ModelRegistry
+
+    registry = ModelRegistry()
+    model = registry.load()
+    require_features(model.op_features + model.eff_features)
+    df = season_store(args.season).df
+    rows = df[df["week"] < args.from_week]
+    t0 = time.perf_counter()
+    out = simulate_rest_of_season(model, rows, args.through_week or last_regular_week(args.season),
+                                  args.sims, args.seed, first_week=args.from_week)
+    print(f"{len(out)} players x {args.sims} sims in {time.perf_counter() - t0:.3f}s")
+    print(out.head(args.top).round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 # src/train.py
-import pickle
-import nfl_data_py as nfl
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import pandas as pd
 import numpy as np
 from sklearn.linear_model import Ridge
@@ -8,64 +11,165 @@ from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 from pathlib import Path
 
-def add_features(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df["fp"] = df["fantasy_points_ppr"]
-    df["touches"] = df["carries"].fillna(0) + df["targets"].fillna(0)
-    df["fp_per_touch"] = df["fp"] / df["touches"].replace(0, np.nan)
+from src.data_utils import load_weekly, load_weekly_seasons, needs_fetch, season_path
+from src.features import (FEATURE_VERSION, PLAYER_WINDOWS, TEAM_WINDOWS, add_features,
+                          add_features_after, windowed_features, windows_for)
+from src.model_utils import MODELS_DIR, save_bundle
 
-    df["roll_touch3"] = (
-        df.groupby("player_id")["touches"]
-          .transform(lambda s: s.shift().rolling(3, min_periods=1).mean())
-    )
-    df["roll_fppt3"] = (
-        df.groupby("player_id")["fp_per_touch"]
-          .transform(lambda s: s.shift().rolling(3, min_periods=1).mean())
-    )
-    df["team_rb_fp5"] = (
-        df.groupby("recent_team")["fp"]
-          .transform(lambda s: s.shift().rolling(5, min_periods=1).mean())
-    )
-    df["opp_rb_fp5"] = (
-        df.groupby("opponent_team")["fp"]
-          .transform(lambda s: s.shift().rolling(5, min_periods=1).mean())
-    )
-    df["team_change"] = (
-        df.groupby("player_id")["recent_team"]
-          .transform(lambda s: (s != s.shift()).astype(int))
-    )
-    df["games_with_team"] = (
-        df.groupby(["player_id", "recent_team"]).cumcount() + 1
-    )
-    df["games_since"] = (
-        df.groupby("player_id")["week"].diff().fillna(1)
-    )
-    return df
+SHARD_DIR = Path(os.environ.get(
+    "NFL_SHARD_DIR", Path(__file__).parent.parent / "data" / "feature_shards"))
+OP_FEATURES  = ["roll_touch3","team_rb_fp5","opp_rb_fp5","games_with_team","team_change"]
+EFF_FEATURES = ["roll_fppt3","opp_rb_fp5","games_with_team","team_change"]
+# Hyperparameters; src/tune.py searches these and train --config reads its output.
+# prior_decay None keeps one set of team priors; a value builds them per season (build_priors).
+DEFAULT_CONFIG = {"op_alpha": 1.0, "eff_alpha": 1.0, "blend_k": 5,
+                  "player_window": PLAYER_WINDOWS[0], "team_window": TEAM_WINDOWS[0],
+                  "prior_decay": None}
+
+def build_priors(df: pd.DataFrame, decay: float = None):
+    """
+    Team mean touches and fp-per-touch. With ``decay``, priors are built per
+    season instead: season s uses only earlier seasons, each weighted by
+    decay ** (s - 1 - season), so recent years count most.
+    """
+    global_touch, global_fppt = df["touches"].mean(), df["fp_per_touch"].mean()
+    if decay is None:
+        priors = (
+            df.groupby("recent_team", observed=True)
+              .agg(team_touch_mean=("touches", "mean"),
+                   team_fppt_mean=("fp_per_touch", "mean"))
+        )
+        return priors, global_touch, global_fppt
 
-def build_priors(df: pd.DataFrame):
-    priors = (
-        df.groupby("recent_team")
-          .agg(team_touch_mean=("touches", "mean"),
-               team_fppt_mean=("fp_per_touch", "mean"))
+    sums = (
+        df.groupby(["season", "recent_team"], observed=True)
+          .agg(touch_sum=("touches", "sum"), touch_n=("touches", "count"),
+               fppt_sum=("fp_per_touch", "sum"), fppt_n=("fp_per_touch", "count"))
     )
-    return priors, df["touches"].mean(), df["fp_per_touch"].mean()
+    past_seasons = sums.index.get_level_values("season")
+    seasons = sorted(past_seasons.unique())
+    frames = []
+    for target in seasons[1:] + [seasons[-1] + 1]:
+        past = sums[past_seasons < target]
+        weight = decay ** (target - 1 - past.index.get_level_values("season").to_numpy())
+        agg = past.mul(weight, axis=0).groupby(level="recent_team", observed=True).sum()
+        frames.append(pd.DataFrame({
+            "season": target,
+            "team_touch_mean": agg["touch_sum"] / agg["touch_n"],
+            "team_fppt_mean": agg["fppt_sum"] / agg["fppt_n"],
+        }))
+    priors = pd.concat(frames).set_index("season", append=True).swaplevel()
+    return priors, global_touch, global_fppt
+
+def _fetch_season(season: int) -> int:
+    return len(load_weekly(season))
+
+def fetch_seasons(seasons, workers: int = None):
+    """Downloads every season not already fresh in the data cache, one process per season."""
+    missing = [s for s in seasons if needs_fetch(s)]
+    if missing:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_fetch_season, missing))
+    return missing
+
+def _fingerprint(seasons, windows=(PLAYER_WINDOWS, TEAM_WINDOWS)) -> str:
+    """Changes whenever the raw data for any of ``seasons``, the windows or the feature code changes."""
+    h = hashlib.sha256((Path(__file__).parent / "features.py").read_bytes())
+    h.update(repr(windows).encode())
+    for season in seasons:
+        stat = season_path(season).stat()
+        h.update(f"{season}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return h.hexdigest()
+
+def _shard_path(season: int) -> Path:
+    return SHARD_DIR / f"features_{season}.parquet"
 
-def main():
-    wk = nfl.import_weekly_data(years=list(range(2018, 2025)))
-    df = add_features(wk)
+def _build_shard(season: int, earlier, windows=(PLAYER_WINDOWS, TEAM_WINDOWS)) -> int:
+    history = load_weekly_seasons(earlier) if earlier else None
+    shard = add_features_after(history, load_weekly(season), *windows)
+    SHARD_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = _shard_path(season).with_suffix(".tmp")
+    shard.to_parquet(tmp, index=False)
+    tmp.replace(_shard_path(season))
+    return season
 
-    train_df = df[df["season"] < 2024]
+def load_features_incremental(seasons, workers: int = None,
+                              windows=(PLAYER_WINDOWS, TEAM_WINDOWS)) -> pd.DataFrame:
+    """
+    Featurized seasons from per-season shards. A shard is rebuilt only when its
+    season, an earlier season or the feature code changed, so a weekly retrain
+    recomputes just the newest season. Shards are built in parallel processes and
+    match add_features over the concatenated seasons exactly.
+    """
+    seasons = sorted(seasons)
+    fetch_seasons(seasons, workers)
+    manifest_path = SHARD_DIR / "manifest.json"
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
 
-    priors_team, global_touch, global_fppt = build_priors(train_df)
-    op_features  = ["roll_touch3","team_rb_fp5","opp_rb_fp5","games_with_team","team_change"]
-    eff_features = ["roll_fppt3","opp_rb_fp5","games_with_team","team_change"]
+    fingerprints = {s: _fingerprint(seasons[:i + 1], windows) for i, s in enumerate(seasons)}
+    stale = [s for s in seasons
+             if manifest.get(str(s)) != fingerprints[s] or not _shard_path(s).exists()]
+    if stale:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            earlier = [[e for e in seasons if e < s] for s in stale]
+            for season in pool.map(_build_shard, stale, earlier, [windows] * len(stale)):
+                manifest[str(season)] = fingerprints[season]
+        SHARD_DIR.mkdir(parents=True, exist_ok=True)
+        manifest_path.write_text(json.dumps(manifest, indent=2))
+    print(f"Feature shards: rebuilt {stale or 'none'}, reused {len(seasons) - len(stale)}")
+    return pd.concat([pd.read_parquet(_shard_path(s)) for s in seasons], ignore_index=True)
 
-    train_op  = train_df.dropna(subset=op_features + ["touches"])
-    train_eff = train_df.dropna(subset=eff_features + ["fp_per_touch"])
-    op_model = Pipeline([("sc", StandardScaler()), ("lr", Ridge(alpha=1.0))])
-    eff_model = Pipeline([("sc", StandardScaler()), ("lr", Ridge(alpha=1.0))])
-    op_model.fit(train_op[op_features], train_op["touches"])
-    eff_model.fit(train_eff[eff_features], train_eff["fp_per_touch"])
+def _fit(df: pd.DataFrame, features, target: str, alpha: float):
+    data = df.dropna(subset=features + [target])
+    model = Pipeline([("sc", StandardScaler()), ("lr", Ridge(alpha=alpha))])
+    return model.fit(data[features], data[target])
+
+def fppt_touch_std(eff_model, df: pd.DataFrame, eff_features) -> float:
+    """
+    Spread of fp-per-touch around the efficiency model, per single touch. A
+    game's fp_per_touch averages over its touches, so its residual variance is
+    about std**2 / touches; src.simulate draws game efficiency that way.
+    """
+    data = df.dropna(subset=eff_features + ["fp_per_touch"])
+    resid = data["fp_per_touch"] - eff_model.predict(data[eff_features])
+    return float(np.sqrt(np.mean(resid ** 2 * data["touches"])))
+
+def fit_models(train_df: pd.DataFrame, alpha: float = 1.0, eff_alpha: float = None,
+               op_features=OP_FEATURES, eff_features=EFF_FEATURES):
+    """Fits the opportunity and efficiency models concurrently; ``eff_alpha`` defaults to ``alpha``."""
+    eff_alpha = alpha if eff_alpha is None else eff_alpha
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        op = pool.submit(_fit, train_df, op_features, "touches", alpha)
+        eff = pool.submit(_fit, train_df, eff_features, "fp_per_touch", eff_alpha)
+        return op.result(), eff.result()
+
+def load_config(path: Path = None, **overrides) -> dict:
+    """
+    DEFAULT_CONFIG, updated from a tune.py result file (its "best" entry) and
+    then from any non-None ``overrides``.
+    """
+    config = dict(DEFAULT_CONFIG)
+    if path is not None:
+        saved = json.loads(Path(path).read_text())
+        saved = saved.get("best", saved)
+        config.update({k: saved[k] for k in DEFAULT_CONFIG if k in saved})
+    config.update({k: v for k, v in overrides.items() if v is not None})
+    return config
+
+def config_features(config: dict):
+    """The (op, eff) feature lists for ``config``'s rolling windows."""
+    windows = config["player_window"], config["team_window"]
+    return windowed_features(OP_FEATURES, *windows), windowed_features(EFF_FEATURES, *windows)
+
+def train_bundle(df: pd.DataFrame, config: dict, train_before: int,
+                 models_dir: Path = MODELS_DIR) -> Path:
+    """Fits on featurized ``df`` rows before ``train_before`` and saves the bundle."""
+    op_features, eff_features = config_features(config)
+    train_df = df[df["season"] < train_before]
+
+    priors_team, global_touch, global_fppt = build_priors(train_df, config["prior_decay"])
+    op_model, eff_model = fit_models(train_df, config["op_alpha"], config["eff_alpha"],
+                                     op_features, eff_features)
 
     bundle = {
         "op_model":       op_model,
@@ -75,13 +179,59 @@ def main():
         "global_fppt":    global_fppt,
         "op_features":    op_features,
         "eff_features":   eff_features,
-        "blend_k":        5
+        "blend_k":        config["blend_k"],
+        "feature_version": FEATURE_VERSION,
+        "fppt_touch_std": fppt_touch_std(eff_model, train_df, eff_features),
+        "training":       config,
     }
-    models_dir = Path(__file__).parent.parent / "models"
-    models_dir.mkdir(exist_ok=True)
-    with open(models_dir / "model_bundle.pkl", "wb") as f:
-        pickle.dump(bundle, f)
-    print(f"Trained & saved bundle to {models_dir/'model_bundle.pkl'}")
+    return save_bundle(bundle, models_dir)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the fantasy-points model bundle")
+    parser.add_argument("--first-season", type=int, default=2018)
+    parser.add_argument("--last-season", type=int, default=2024)
+    parser.add_argument("--train-before", type=int, default=2024,
+                        help="fit on seasons strictly before this one")
+    parser.add_argument("--incremental", action="store_true",
+                        help="reuse cached per-season feature shards, rebuilding only what changed")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes for fetching/featurizing seasons")
+    parser.add_argument("--models-dir", type=Path, default=MODELS_DIR)
+    parser.add_argument("--backtest", action="store_true",
+                        help="walk-forward evaluate over the seasons instead of saving a bundle")
+    parser.add_argument("--config", type=Path,
+                        help="hyperparameters from `python -m src.tune --out ...`")
+    parser.add_argument("--op-alpha", type=float)
+    parser.add_argument("--eff-alpha", type=float)
+    parser.add_argument("--blend-k", type=float)
+    parser.add_argument("--player-window", type=int)
+    parser.add_argument("--team-window", type=int)
+    parser.add_argument("--prior-decay", type=float,
+                        help="per-season team priors, each earlier season weighted by decay ** age")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config, op_alpha=args.op_alpha, eff_alpha=args.eff_alpha,
+                         blend_k=args.blend_k, player_window=args.player_window,
+                         team_window=args.team_window, prior_decay=args.prior_decay)
+    op_features, eff_features = config_features(config)
+    windows = windows_for(op_features + eff_features)
+
+    seasons = list(range(args.first_season, args.last_season + 1))
+    if args.incremental:
+        df = load_features_incremental(seasons, args.workers, windows)
+    else:
+        fetch_seasons(seasons, args.workers)
+        df = add_features(load_weekly_seasons(seasons), *windows)
+
+    if args.backtest:
+        from src.backtest import run
+        run(df, alpha=config["op_alpha"], eff_alpha=config["eff_alpha"],
+            blend_k=config["blend_k"], op_features=op_features, eff_features=eff_features,
+            prior_decay=config["prior_decay"])
+        return
+
+    out = train_bundle(df, config, args.train_before, args.models_dir)
+    print(f"Trained & saved bundle to {out}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,303 @@
+# src/tune.py
+import argparse
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.backtest import ridge_path_from_stats, weekly_stats
+from src.data_utils import load_weekly_seasons
+from src.features import add_features
+from src.model_utils import MODELS_DIR
+from src.train import (DEFAULT_CONFIG, config_features, fetch_seasons,
+                       load_features_incremental, train_bundle)
+
+DEFAULT_ALPHAS = np.logspace(-2, 4, 25)
+DEFAULT_BLEND_K = (1, 2, 3, 5, 8, 12, 20, 30)
+DEFAULT_PLAYER_WINDOWS = (2, 3, 4, 5, 6)
+DEFAULT_TEAM_WINDOWS = (3, 4, 5, 6, 8)
+# Rows x alphas^2 per block when scoring the full alpha grid; bounds worker memory.
+_BLOCK_CELLS = 4_000_000
+
+# Set in each worker by _attach: one shared float64 matrix and its column positions.
+_data = None
+_columns = None
+_shm = None
+
+
+def _share(df: pd.DataFrame, columns):
+    """Copies ``columns`` of ``df`` into one shared-memory float64 block."""
+    shape = (len(df), len(columns))
+    shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * 8))
+    block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    for j, col in enumerate(columns):
+        block[:, j] = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+    return shm, shape
+
+
+def _attach(name: str, shape, columns):
+    global _data, _columns, _shm
+    _shm = shared_memory.SharedMemory(name=name)
+    _data = np.ndarray(shape, dtype=np.float64, buffer=_shm.buf)
+    _columns = {c: j for j, c in enumerate(columns)}
+
+
+def _col(name):
+    return _data[:, _columns[name]]
+
+
+def _cols(names):
+    return _data[:, [_columns[n] for n in names]]
+
+
+def _fold_priors(season_idx, team, fold, decay=None):
+    """
+    Team mean touches / fp-per-touch over seasons before ``fold``, global mean
+    for unseen teams. With ``decay`` each season is weighted by
+    decay ** (fold - 1 - season), as build_priors(decay=...) does.
+    """
+    train = season_idx < fold
+    n_teams = int(team.max()) + 1
+    out = []
+    for col in ("touches", "fp_per_touch"):
+        v = _col(col)
+        ok = train & ~np.isnan(v)
+        w = np.ones(int(ok.sum())) if decay is None else float(decay) ** (fold - 1 - season_idx[ok])
+        sums = np.bincount(team[ok], weights=v[ok] * w, minlength=n_teams)
+        counts = np.bincount(team[ok], weights=w, minlength=n_teams)
+        overall = v[ok].mean() if ok.any() else np.nan
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(counts > 0, sums / counts, overall)
+        out.append(means)
+    return out
+
+
+def _evaluate(player_window, team_window, folds, alphas, blend_ks, metric, samples=None,
+              prior_decay=None):
+    """
+    Pooled cross-validated error for one pair of windows over every
+    (op_alpha, eff_alpha, blend_k) in the grid, or only the ``samples`` index
+    triples. Each fold fits on the seasons before it and scores that season.
+    """
+    config = dict(DEFAULT_CONFIG, player_window=player_window, team_window=team_window)
+    op_features, eff_features = config_features(config)
+    season_idx = _col("season_idx").astype(np.intp)
+    team = _col("team_code").astype(np.intp)
+    n_seasons = int(season_idx.max()) + 1
+    fp = _col("fp")
+
+    paths = {}
+    for name, features, target in (("op", op_features, "touches"),
+                                   ("eff", eff_features, "fp_per_touch")):
+        X = _cols(features)
+        G, b = weekly_stats(X, _col(target), season_idx, n_seasons)
+        paths[name] = (X, np.cumsum(G, axis=0), np.cumsum(b, axis=0))
+
+    A, K = len(alphas), len(blend_ks)
+    total = np.zeros((A, A, K)) if samples is None else np.zeros(len(samples))
+    count = 0
+    for fold in folds:
+        (X_op, G_op, b_op), (X_eff, G_eff, b_eff) = paths["op"], paths["eff"]
+        coef_op, icpt_op = ridge_path_from_stats(G_op[fold - 1], b_op[fold - 1], alphas)
+        coef_eff, icpt_eff = ridge_path_from_stats(G_eff[fold - 1], b_eff[fold - 1], alphas)
+        prior_touch, prior_fppt = _fold_priors(season_idx, team, fold, prior_decay)
+
+        rows = np.flatnonzero((season_idx == fold) & ~np.isnan(X_op).any(axis=1)
+                              & ~np.isnan(X_eff).any(axis=1) & ~np.isnan(fp))
+        touch_hat = X_op[rows] @ coef_op.T + icpt_op        # rows x alphas
+        fppt_hat = X_eff[rows] @ coef_eff.T + icpt_eff
+        pt, pf = prior_touch[team[rows]], prior_fppt[team[rows]]
+        n = _col("games_with_team")[rows]
+        y = fp[rows]
+        count += len(rows)
+
+        for k_i, k in enumerate(blend_ks):
+            w = (n / (n + k))[:, None]
+            touch = w * touch_hat + (1 - w) * pt[:, None]
+            fppt = w * fppt_hat + (1 - w) * pf[:, None]
+            if samples is not None:
+                sel = [i for i, s in enumerate(samples) if s[2] == k_i]
+                if sel:
+                    ia = np.array([samples[i][0] for i in sel])
+                    ie = np.array([samples[i][1] for i in sel])
+                    err = touch[:, ia] * fppt[:, ie] - y[:, None]
+                    total[sel] += (np.abs(err) if metric == "mae" else err ** 2).sum(axis=0)
+                continue
+            step = max(1, _BLOCK_CELLS // (A * A))
+            for start in range(0, len(rows), step):
+                sl = slice(start, start + step)
+                err = touch[sl, :, None] * fppt[sl, None, :] - y[sl, None, None]
+                total[:, :, k_i] += (np.abs(err) if metric == "mae" else err ** 2).sum(axis=0)
+
+    score = total / max(count, 1)
+    if metric == "rmse":
+        score = np.sqrt(score)
+    return player_window, team_window, score, count
+
+
+def _parse_list(text, cast=float):
+    return [cast(x) for x in text.split(",")] if text else None
+
+
+def _parse_alphas(text):
+    """"0.01:10000:25" is a log-spaced grid; otherwise a comma list."""
+    if text and ":" in text:
+        lo, hi, num = text.split(":")
+        return np.logspace(np.log10(float(lo)), np.log10(float(hi)), int(num))
+    return _parse_list(text)
+
+
+def search(df: pd.DataFrame, folds: int = 3, alphas=DEFAULT_ALPHAS, blend_ks=DEFAULT_BLEND_K,
+           player_windows=DEFAULT_PLAYER_WINDOWS, team_windows=DEFAULT_TEAM_WINDOWS,
+           metric: str = "mae", samples: int = None, seed: int = 0, workers: int = None,
+           prior_decay: float = None):
+    """
+    Cross-validated grid (or ``samples`` random draws from it) over per-model
+    Ridge alphas, blend_k and rolling windows. ``df`` must be featurized with
+    every candidate window. The last ``folds`` seasons are each scored by a fit
+    on all seasons before them.
+
+    The numeric columns are put in shared memory once and each worker process
+    scores one window pair. Within a pair, every alpha comes from one
+    closed-form Ridge path, so a dense alpha grid costs little more than one fit.
+    The current defaults are always included so the gain over them is reported.
+    ``prior_decay`` is held fixed (see build_priors) and recorded in each result.
+    """
+    alphas = np.unique(np.append(np.asarray(alphas, dtype=float),
+                                 [DEFAULT_CONFIG["op_alpha"], DEFAULT_CONFIG["eff_alpha"]]))
+    blend_ks = sorted(set(blend_ks) | {DEFAULT_CONFIG["blend_k"]})
+    player_windows = sorted(set(player_windows) | {DEFAULT_CONFIG["player_window"]})
+    team_windows = sorted(set(team_windows) | {DEFAULT_CONFIG["team_window"]})
+
+    seasons = sorted(df["season"].unique())
+    if folds >= len(seasons):
+        raise ValueError(f"Need more than {folds} seasons for {folds} folds, got {len(seasons)}")
+    fold_idx = list(range(len(seasons) - folds, len(seasons)))
+
+    windows = list(itertools.product(player_windows, team_windows))
+    per_window = {w: None for w in windows}
+    if samples:
+        rng = np.random.default_rng(seed)
+        draws = zip(rng.integers(0, len(windows), samples), rng.integers(0, len(alphas), samples),
+                    rng.integers(0, len(alphas), samples), rng.integers(0, len(blend_ks), samples))
+        per_window = {}
+        for w_i, a_op, a_eff, k_i in draws:
+            per_window.setdefault(windows[w_i], []).append((a_op, a_eff, k_i))
+        default = (alphas.tolist().index(DEFAULT_CONFIG["op_alpha"]),
+                   alphas.tolist().index(DEFAULT_CONFIG["eff_alpha"]),
+                   blend_ks.index(DEFAULT_CONFIG["blend_k"]))
+        per_window.setdefault((DEFAULT_CONFIG["player_window"],
+                               DEFAULT_CONFIG["team_window"]), []).append(default)
+
+    frame = df.assign(
+        season_idx=np.searchsorted(seasons, df["season"].to_numpy()),
+        team_code=pd.factorize(df["recent_team"])[0])
+    columns = sorted({c for pw, tw in per_window for c in itertools.chain(
+        *config_features(dict(DEFAULT_CONFIG, player_window=pw, team_window=tw)))}
+        | {"season_idx", "team_code", "touches", "fp_per_touch", "fp", "games_with_team"})
+    shm, shape = _share(frame, columns)
+    try:
+        jobs = [(pw, tw, fold_idx, alphas, blend_ks, metric, picks, prior_decay)
+                for (pw, tw), picks in per_window.items()]
+        if workers == 0:
+            _attach(shm.name, shape, columns)
+            outputs = [_evaluate(*job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                     initargs=(shm.name, shape, columns)) as pool:
+                outputs = list(pool.map(_evaluate, *zip(*jobs)))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    results = []
+    for pw, tw, score, n in outputs:
+        picks = per_window[(pw, tw)]
+        cells = (np.ndindex(score.shape) if picks is None
+                 else ((a, e, k) for a, e, k in picks))
+        flat = score.ravel() if picks is None else score
+        for value, (a, e, k) in zip(flat, cells):
+            results.append({"op_alpha": float(alphas[a]), "eff_alpha": float(alphas[e]),
+                            "blend_k": blend_ks[k], "player_window": pw, "team_window": tw,
+                            "prior_decay": prior_decay,
+                            "score": float(value), "rows": int(n)})
+    results.sort(key=lambda r: r["score"])
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Search Ridge alphas, blend_k and rolling windows with season-by-season CV")
+    parser.add_argument("--first-season", type=int, default=2018)
+    parser.add_argument("--last-season", type=int, default=2024)
+    parser.add_argument("--folds", type=int, default=3,
+                        help="validate on each of the last N seasons, fitting on the ones before")
+    parser.add_argument("--alphas", help='log grid "lo:hi:num" or comma list (default 0.01:10000:25)')
+    parser.add_argument("--blend-k", help="comma list (default 1,2,3,5,8,12,20,30)")
+    parser.add_argument("--player-windows", help="comma list (default 2,3,4,5,6)")
+    parser.add_argument("--team-windows", help="comma list (default 3,4,5,6,8)")
+    parser.add_argument("--metric", choices=["mae", "rmse"], default="mae")
+    parser.add_argument("--prior-decay", type=float,
+                        help="score every config with per-season priors built with this decay")
+    parser.add_argument("--samples", type=int, help="random search: score this many draws from the grid")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes (default: all cores; 0 runs in-process)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="reuse cached per-season feature shards")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--out", type=Path, help="write the best config and top results as JSON")
+    parser.add_argument("--write-bundle", action="store_true",
+                        help="train on seasons before --train-before with the best config and save it")
+    parser.add_argument("--train-before", type=int, default=2024)
+    parser.add_argument("--models-dir", type=Path, default=MODELS_DIR)
+    args = parser.parse_args(argv)
+
+    alphas = _parse_alphas(args.alphas)
+    alphas = DEFAULT_ALPHAS if alphas is None else alphas
+    blend_ks = _parse_list(args.blend_k) or DEFAULT_BLEND_K
+    player_windows = _parse_list(args.player_windows, int) or DEFAULT_PLAYER_WINDOWS
+    team_windows = _parse_list(args.team_windows, int) or DEFAULT_TEAM_WINDOWS
+    windows = (tuple(sorted(set(player_windows) | {DEFAULT_CONFIG["player_window"]})),
+               tuple(sorted(set(team_windows) | {DEFAULT_CONFIG["team_window"]})))
+
+    # Featurize once with every candidate window; each becomes its own column
+    seasons = list(range(args.first_season, args.last_season + 1))
+    if args.incremental:
+        df = load_features_incremental(seasons, args.workers, windows)
+    else:
+        fetch_seasons(seasons, args.workers)
+        df = add_features(load_weekly_seasons(seasons), *windows)
+
+    results = search(df, args.folds, alphas, blend_ks, player_windows, team_windows,
+                     args.metric, args.samples, args.seed,
+                     args.workers if args.workers is not None else os.cpu_count(),
+                     args.prior_decay)
+    best = results[0]
+    default = next(r for r in results
+                   if all(r[k] == v for k, v in DEFAULT_CONFIG.items() if k != "prior_decay"))
+
+    print(f"Scored {len(results)} configs ({args.metric.upper()}, {args.folds} season folds)")
+    print(pd.DataFrame(results[:args.top]).drop(columns="rows").to_string(index=False))
+    print(f"\nDefault config {args.metric.upper()} {default['score']:.4f}; "
+          f"best {best['score']:.4f} ({best['score'] / default['score'] - 1:+.2%})")
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps({"metric": args.metric, "folds": args.folds,
+                                        "best": best, "default": default,
+                                        "top": results[:args.top]}, indent=2))
+    if args.write_bundle:
+        config = {k: best[k] for k in DEFAULT_CONFIG}
+        out = train_bundle(df, dict(config, cv_metric=args.metric, cv_score=best["score"]),
+                           args.train_before, args.models_dir)
+        print(f"Trained & saved bundle with the best config to {out}")
+
+
+if __name__ == "__main__":
+    main()
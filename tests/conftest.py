@@ -0,0 +1,45 @@
+import atexit
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# src modules read these at import, so they are set before any test imports one:
+# synthetic data and a bundle trained on it, never the network or models/
+ROOT = Path(tempfile.mkdtemp(prefix="nfl-tests-"))
+atexit.register(shutil.rmtree, ROOT, ignore_errors=True)
+os.environ.update(NFL_CACHE_DIR=str(ROOT / "weekly"), NFL_OFFLINE="1",
+                  NFL_MODELS_DIR=str(ROOT / "models"),
+                  NFL_FEATURE_PATH=str(ROOT / "features.parquet"),
+                  NFL_SHARD_DIR=str(ROOT / "shards"),
+                  CHAT_CACHE_PATH=str(ROOT / "chat_cache.sqlite"))
+
+from src.data_utils import current_season  # noqa: E402
+
+# Two finished seasons and the one in progress
+SEASONS = [current_season() - 2, current_season() - 1, current_season()]
+os.environ["NFL_HISTORY_START"] = str(SEASONS[0])
+
+
+@pytest.fixture(scope="session")
+def seasons():
+    return SEASONS
+
+
+@pytest.fixture(scope="session")
+def synthetic_cache():
+    """Weekly data written to NFL_CACHE_DIR, plus a bundle trained on all but the last season."""
+    from bench.synthetic import write_bundle, write_cache
+    weekly = write_cache(ROOT / "weekly", SEASONS, n_players=120, seed=3)
+    write_bundle(ROOT / "models", weekly)
+    return weekly
+
+
+@pytest.fixture
+def client(synthetic_cache):
+    from fastapi.testclient import TestClient
+    from src.server import app
+    with TestClient(app) as c:
+        yield c
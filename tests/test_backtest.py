@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.backtest import ridge_from_stats, ridge_path_from_stats, weekly_stats
+from src.model_utils import LinearModel
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, 4)) * [1, 10, 0.1, 3] + [0, 5, -2, 1]
+    X[:, 3] = 2.0                                   # a constant column
+    y = X @ [1.5, -0.2, 4.0, 0.0] + rng.normal(size=500)
+    X[rng.random(X.shape) < 0.05] = np.nan          # incomplete rows are skipped
+    codes = rng.integers(0, 10, len(X))
+    return X, y, codes
+
+
+def _sklearn(X, y, alpha):
+    ok = ~np.isnan(X).any(axis=1)
+    pipe = Pipeline([("sc", StandardScaler()), ("lr", Ridge(alpha=alpha))])
+    return LinearModel.from_pipeline(pipe.fit(X[ok], y[ok]))
+
+
+@pytest.mark.parametrize("alpha", [0.01, 1.0, 100.0])
+def test_ridge_from_stats_matches_sklearn(data, alpha):
+    X, y, codes = data
+    G, b = weekly_stats(X, y, codes, 10)
+    model = ridge_from_stats(G.sum(axis=0), b.sum(axis=0), alpha)
+    expected = _sklearn(X, y, alpha)
+    np.testing.assert_allclose(model.coef, expected.coef, rtol=1e-8, atol=1e-10)
+    assert model.intercept == pytest.approx(expected.intercept, rel=1e-8)
+
+
+
+def test_ridge_path_matches_single_fits(data):
+    X, y, codes = data
+    G, b = weekly_stats(X, y, codes, 10)
+    G, b = G.sum(axis=0), b.sum(axis=0)
+    alphas = [0.01, 1.0, 100.0]
+    coef, intercept = ridge_path_from_stats(G, b, alphas)
+    for i, alpha in enumerate(alphas):
+        expected = _sklearn(X, y, alpha)
+        np.testing.assert_allclose(coef[i], expected.coef, rtol=1e-8, atol=1e-10)
+        assert intercept[i] == pytest.approx(expected.intercept, rel=1e-8)
@@ -0,0 +1,55 @@
+import pytest
+
+from src import cache_utils
+from src.cache_utils import SQLiteCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_utils.time, "time", clock)
+    return clock
+
+
+def test_round_trip_and_persistence(tmp_path, clock):
+    cache = SQLiteCache(tmp_path / "sub" / "cache.sqlite")
+    assert cache.get("a") is None and cache.get("a", "x") == "x"
+    cache.set("a", "reply")
+    cache.set("a", "newer reply")
+    assert cache.get("a") == "newer reply"
+    assert cache.stats() == {"size": 1, "maxsize": 1000, "hits": 1, "misses": 2}
+    # A second connection (another process or a restart) sees the same entries
+    assert SQLiteCache(tmp_path / "sub" / "cache.sqlite").get("a") == "newer reply"
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_evicts_least_recently_used(tmp_path, clock):
+    cache = SQLiteCache(tmp_path / "cache.sqlite", maxsize=2)
+    for key in "abc":
+        clock.now += 1
+        if key == "c":
+            cache.get("a")          # "b" is now the stalest
+            clock.now += 1
+        cache.set(key, key.upper())
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+
+
+def test_ttl(tmp_path, clock):
+    cache = SQLiteCache(tmp_path / "cache.sqlite", ttl=60)
+    cache.set("a", "A")
+    clock.now += 59
+    assert cache.get("a") == "A"
+    clock.now += 2                  # reads don't extend an entry's life
+    assert cache.get("a") is None
+    assert len(cache) == 0
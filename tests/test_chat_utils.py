@@ -0,0 +1,63 @@
+import pytest
+
+from src.chat_utils import explain_predictions, extract_prediction_requests, response_cache_key
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("Predict fantasy points for player 12345 in season 2024 week 1", [(12345, 2024, 1)]),
+    ("What are the expected points for player 67890, 2024 season, week 5?", [(67890, 2024, 5)]),
+    ("Can you predict fantasy points for player 11111 in 2024 week 10?", [(11111, 2024, 10)]),
+    ("Compare 123, 456 and 789 for 2024 week 5", [(123, 2024, 5), (456, 2024, 5), (789, 2024, 5)]),
+    ("predict player 42 2024 7", [(42, 2024, 7)]),
+    ("predict player 123 for 2024 week 5 and top 10", [(123, 2024, 5)]),
+    ("I have 2 questions: predict player 55 2024 week 4", [(55, 2024, 4)]),
+    ("compare player 123, 456 and 789 for 2024 week 5", [(123, 2024, 5), (456, 2024, 5), (789, 2024, 5)]),
+    ("I have 2 questions: predict 55 for 2024 week 4", [(55, 2024, 4)]),
+    ("predict 123 for 2024 week 5, top 10 scorers", [(123, 2024, 5)]),
+    ("predict player 12 and player 34 for 2024 week 3, top 5", [(12, 2024, 3), (34, 2024, 3)]),
+    ("compare 123 vs 456 in 2024 week 2", [(123, 2024, 2), (456, 2024, 2)]),
+    ("Will 12345 score in 2024 week 5?", [(12345, 2024, 5)]),
+])
+def test_baseline_phrasings(message, expected):
+    found = extract_prediction_requests(message)
+    assert [(r["player_id"], r["season"], r["week"]) for r in found] == expected
+
+
+@pytest.mark.parametrize("message", [
+    "What factors affect fantasy football performance?",
+    "How do I interpret fantasy point predictions?",
+    "What's the difference between PPR and standard scoring?",
+    "predict player 12345 in 2024",            # no week
+    "predict player 12345 in 2024 week 30",    # week out of range
+])
+def test_no_request(message):
+    assert extract_prediction_requests(message) == []
+
+
+def test_season_defaults():
+    assert extract_prediction_requests("predict player 7 week 3", default_season=2024) == [
+        {"player_id": 7, "season": 2024, "week": 3}]
+    assert extract_prediction_requests("predict player 7 week 3") == []
+
+
+
+def _result(player_id, points, name=None):
+    return {"success": True, "data": {"player_id": player_id, "player_name": name,
+                                      "season": 2024, "week": 5, "expected_points": points}}
+
+
+def test_explain_predictions():
+    one = explain_predictions([_result(1, 16.4, "Bijan Robinson")])
+    assert "Bijan Robinson projects for **16.40**" in one and "a strong starter" in one
+    two = explain_predictions([_result(1, 9.0), _result(2, 21.5)])
+    assert "Start **Player 2**: projected 12.50 points ahead of Player 1" in two
+    assert "It's close" in explain_predictions([_result(1, 9.0), _result(2, 9.5)])
+    failed = explain_predictions([{"success": False, "message": "No data"}])
+    assert "No data" in failed and "Double-check" in failed
+
+
+def test_response_cache_key():
+    key = response_cache_key("Predict player 1, week 5?", [_result(1, 12.3401)])
+    assert key == response_cache_key("predict  PLAYER 1 week 5", [_result(1, 12.3449)])
+    assert key != response_cache_key("predict player 1 week 5", [_result(1, 12.36)])
+    assert key != response_cache_key("predict player 1 week 5", [_result(1, 12.34)], model="other")
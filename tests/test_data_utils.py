@@ -0,0 +1,99 @@
+import os
+import time
+from datetime import date
+
+import pytest
+
+import src.data_utils as du
+from bench.synthetic import weekly_data
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """An empty cache directory, online unless a test says otherwise, with no fetches allowed."""
+    monkeypatch.setattr(du, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(du, "OFFLINE", False)
+    fetched = []
+
+    def fetch(season):
+        fetched.append(season)
+        return weekly_data([season], n_players=20, seed=season)
+
+    monkeypatch.setattr(du, "_fetch", fetch)
+    du._memory.clear()
+    yield fetched
+    du._memory.clear()
+
+
+def _write(season, age=0.0):
+    path = du.season_path(season)
+    weekly_data([season], n_players=20).to_parquet(path, index=False)
+    os.utime(path, (time.time() - age, time.time() - age))
+    return path
+
+
+def test_current_season_turns_over_in_september():
+    assert du.current_season(date(2024, 8, 31)) == 2023
+    assert du.current_season(date(2024, 9, 1)) == 2024
+
+
+def test_only_the_current_season_expires():
+    assert du.season_ttl(du.current_season() - 1) is None
+    assert du.season_ttl(du.current_season()) == du.CURRENT_SEASON_TTL
+
+
+def test_finished_seasons_never_refetch(cache):
+    season = du.current_season() - 1
+    _write(season, age=10 * du.CURRENT_SEASON_TTL)
+    assert not du.needs_fetch(season)
+    df = du.load_weekly(season)
+    assert cache == []
+    assert list(df.columns) == [c for c in du.WEEKLY_COLUMNS if c in df.columns]
+    assert str(df["player_id"].dtype) == "category" and str(df["week"].dtype) == "int8"
+
+
+def test_current_season_refetches_after_ttl(cache):
+    season = du.current_season()
+    _write(season)
+    du.load_weekly(season)
+    assert cache == []
+    du._memory.clear()
+    _write(season, age=du.CURRENT_SEASON_TTL + 60)
+    assert du.needs_fetch(season)
+    du.load_weekly(season)
+    assert cache == [season]
+    assert not du.needs_fetch(season)     # the fetch rewrote the file
+
+
+def test_stale_copy_survives_an_upstream_failure(cache, monkeypatch):
+    season = du.current_season()
+    _write(season, age=du.CURRENT_SEASON_TTL + 60)
+
+    def down(season):
+        raise ConnectionError("upstream down")
+
+    monkeypatch.setattr(du, "_fetch", down)
+    assert len(du.load_weekly(season)) > 0
+    with pytest.raises(ConnectionError):
+        du.load_weekly(season - 5)
+
+
+def test_offline_serves_stale_data_and_never_fetches(cache, monkeypatch):
+    monkeypatch.setattr(du, "OFFLINE", True)
+    season = du.current_season()
+    _write(season, age=du.CURRENT_SEASON_TTL + 60)
+    assert not du.needs_fetch(season)
+    assert len(du.load_weekly(season)) > 0
+    with pytest.raises(FileNotFoundError):
+        du.load_weekly(season - 5)
+    assert cache == []
+
+
+def test_memory_hits_share_one_frame(cache):
+    season = du.current_season() - 1
+    _write(season)
+    assert du.load_weekly(season) is du.load_weekly(season)
+    assert du.peek_weekly(season) is du.load_weekly(season)
+    refreshed = du.refresh_season(season)
+    assert cache == [season]
+    assert du.peek_weekly(season) is refreshed
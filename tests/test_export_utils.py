@@ -0,0 +1,54 @@
+import pytest
+
+from src.export_utils import ARROW_STREAM, JSON, MSGPACK, NDJSON, negotiate
+
+OFFERED = [JSON, ARROW_STREAM, MSGPACK]
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, JSON),
+    ("", JSON),
+    ("*/*", JSON),
+    ("application/json", JSON),
+    (ARROW_STREAM, ARROW_STREAM),
+    ("application/x-msgpack;q=0.5, application/vnd.apache.arrow.stream;q=0.9", ARROW_STREAM),
+    ("application/*;q=0.2, application/x-msgpack", MSGPACK),
+    ("text/html, application/json;q=0.1", JSON),
+    ("text/html", None),
+    ("application/json;q=0", None),
+    ("APPLICATION/VND.APACHE.ARROW.STREAM", ARROW_STREAM),
+    ("application/json;q=oops, application/x-msgpack", MSGPACK),
+])
+def test_negotiate(accept, expected):
+    assert negotiate(accept, OFFERED) == expected
+
+
+def test_negotiate_prefers_earlier_offer_on_ties():
+    assert negotiate("application/*", [ARROW_STREAM, NDJSON]) == ARROW_STREAM
+    assert negotiate("application/*", [NDJSON, ARROW_STREAM]) == NDJSON
+
+
+@pytest.mark.parametrize("media_type", [ARROW_STREAM, JSON, NDJSON])
+def test_encode_round_trips(media_type):
+    import json
+    import pandas as pd
+    import pyarrow as pa
+    from src.export_utils import encode, record_batch, schema_for
+
+    frame = pd.DataFrame({"player_id": ["a", None, "c"], "week": [1, 2, 3],
+                          "fp": [1.5, float("nan"), 3.0]})
+    schema = schema_for(frame)
+    batches = [record_batch(frame.iloc[:2], schema), record_batch(frame.iloc[2:], schema),
+               record_batch(frame.iloc[:0], schema)]
+    body = b"".join(encode(media_type, schema, iter(batches)))
+    if media_type == ARROW_STREAM:
+        rows = pa.ipc.open_stream(body).read_all().to_pylist()
+        assert rows[1]["fp"] != rows[1]["fp"]           # NaN stays NaN in Arrow
+        rows[1]["fp"] = None
+    elif media_type == JSON:
+        rows = json.loads(body)
+    else:
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+    assert rows == [{"player_id": "a", "week": 1, "fp": 1.5},
+                    {"player_id": None, "week": 2, "fp": None},
+                    {"player_id": "c", "week": 3, "fp": 3.0}]
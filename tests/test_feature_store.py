@@ -0,0 +1,80 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from bench.synthetic import weekly_data
+from src.feature_store import FeatureStore
+from src.features import add_features
+
+
+@pytest.fixture(scope="module")
+def featurized():
+    return add_features(weekly_data([2023], n_players=100, seed=2))
+
+
+def test_version_follows_content(featurized):
+    # A process restart or another worker builds the same version from the same data
+    assert FeatureStore(featurized).version == FeatureStore(featurized.copy()).version
+    changed = featurized.copy()
+    changed.loc[changed.index[0], "touches"] += 1
+    assert FeatureStore(changed).version != FeatureStore(featurized).version
+
+
+def test_loaded_store_versions_by_file(featurized, tmp_path):
+    path = tmp_path / "features.parquet"
+    FeatureStore(featurized).save(path)
+    assert FeatureStore.load(path).version == f"store-{path.stat().st_mtime_ns}"
+
+
+@pytest.fixture
+def fresh(monkeypatch, synthetic_cache):
+    """Empty feature_store caches and no persisted store, restored afterwards."""
+    import src.feature_store as fs
+    fs._season_stores.clear()
+    fs.forget_history()
+    monkeypatch.setattr(fs, "_persisted", None)
+    yield fs
+    fs._season_stores.clear()
+    fs.forget_history()
+
+
+def test_season_store_matches_training_featurization(fresh, synthetic_cache, seasons):
+    current = seasons[-1]
+    served = fresh.season_store(current).df
+    full = FeatureStore(add_features(synthetic_cache)).df
+    expected = full[full["season"] == current].reset_index(drop=True)
+    columns = [c for c in served.columns if c not in ("player_id", "recent_team", "opponent_team")]
+    pd.testing.assert_frame_equal(served[columns], expected[columns], check_dtype=False)
+
+
+def test_history_seasons_that_fail_are_skipped(fresh, monkeypatch, caplog, seasons):
+    load_weekly = fresh.load_weekly
+
+    def flaky(season):
+        if season == seasons[0]:
+            raise ConnectionError("upstream down")
+        return load_weekly(season)
+
+    monkeypatch.setattr(fresh, "load_weekly", flaky)
+    with caplog.at_level("WARNING", logger="src.feature_store"):
+        store = fresh.season_store(seasons[-1])
+    assert len(store) > 0
+    assert f"without history season {seasons[0]}" in caplog.text
+    # Not cached, so the season is retried on the next rebuild
+    assert fresh._histories.get(seasons[-1]) is None
+
+
+def test_persisted_store_never_serves_the_season_in_progress(fresh, monkeypatch, synthetic_cache,
+                                                             seasons):
+    persisted = FeatureStore(add_features(synthetic_cache))
+    monkeypatch.setattr(fresh, "_persisted", persisted)
+    assert fresh._store_for(seasons[0]) is persisted
+    assert fresh._store_for(seasons[-1]) is not persisted
+
+
+def test_warm_stores_prepares_the_season(fresh, seasons):
+    assert fresh._ready_store(seasons[-1]) is None
+    assert asyncio.run(fresh.warm_stores([seasons[-1], 2001])) == [2001]
+    assert fresh._ready_store(seasons[-1]) is not None
+    assert fresh._histories.get(seasons[-1]) is not None
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench.bench_features import check_equivalence
+from bench.synthetic import weekly_data
+from src.data_utils import load_weekly_seasons
+from src.features import add_features, add_features_after, is_windowed
+
+
+@pytest.fixture(scope="module")
+def weekly():
+    return weekly_data(range(2021, 2024), n_players=300, seed=1)
+
+
+def test_add_features_matches_reference(weekly):
+    check_equivalence(weekly)
+
+
+COLUMNS = ["touches", "fp_per_touch", "roll_touch3", "roll_fppt3", "team_rb_fp5",
+           "opp_rb_fp5", "team_change", "games_with_team", "games_since"]
+
+
+def test_later_weeks_do_not_change_earlier_features(weekly):
+    full = add_features(weekly)
+    key = weekly["season"] * 100 + weekly["week"]
+    cut = 2022 * 100 + 9
+    truncated = add_features(weekly[key <= cut])
+    np.testing.assert_allclose(
+        truncated.loc[(key == cut)[key <= cut].to_numpy(), COLUMNS].to_numpy(dtype=float),
+        full.loc[(key == cut).to_numpy(), COLUMNS].to_numpy(dtype=float))
+
+
+@pytest.mark.parametrize("windows", [((3,), (5,)), ((2, 6), (3, 8))])
+def test_add_features_after_matches_full_rebuild(weekly, windows):
+    full = add_features(weekly, *windows)
+    for season in (2022, 2023):
+        incremental = add_features_after(weekly[weekly["season"] < season],
+                                         weekly[weekly["season"] == season], *windows)
+        expected = full[full["season"] == season]
+        columns = [c for c in incremental.columns if c in COLUMNS or is_windowed(c)]
+        np.testing.assert_allclose(incremental[columns].to_numpy(dtype=float),
+                                   expected[columns].to_numpy(dtype=float), rtol=1e-12)
+    pd.testing.assert_frame_equal(add_features_after(None, weekly, *windows), full)
+
+
+def test_incremental_shards_match_a_full_rebuild(synthetic_cache, seasons, capsys):
+    from src.train import load_features_incremental
+    full = add_features(load_weekly_seasons(seasons))
+    sharded = load_features_incremental(seasons, workers=2)
+    np.testing.assert_allclose(sharded[COLUMNS].to_numpy(dtype=float),
+                               full[COLUMNS].to_numpy(dtype=float), rtol=1e-12)
+    load_features_incremental(seasons, workers=2)
+    assert "rebuilt none, reused 3" in capsys.readouterr().out
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from src.features import FEATURE_VERSION
+from src.model_registry import ModelRegistry
+from src.model_utils import LinearModel, TeamPriors, save_bundle
+
+
+def _bundle(scale):
+    return {
+        "op_model": LinearModel([scale, 0.0], 1.0),
+        "eff_model": LinearModel([0.0, scale], 0.5),
+        "priors": TeamPriors(["ATL", "NYJ"], [[10.0, 12.0, 11.0]], [[0.8, 0.9, 0.85]]),
+        "global_touch": 11.0,
+        "global_fppt": 0.85,
+        "op_features": ["a", "b"],
+        "eff_features": ["a", "b"],
+        "blend_k": 8,
+        "feature_version": FEATURE_VERSION,
+    }
+
+
+@pytest.fixture
+def registry(tmp_path):
+    for i, version in enumerate(["v1", "v2", "v3", "v4"]):
+        save_bundle(_bundle(float(i + 1)), tmp_path, version=version)
+    return ModelRegistry(tmp_path, max_versions=3)
+
+
+def test_load_follows_current_and_swaps_default(registry):
+    assert registry.load().version == "v4"
+    registry.load("v1")
+    assert registry.default_version == "v1"
+    registry.load("v2", make_default=False)
+    assert registry.default_version == "v1"
+    assert registry.get().version == "v1"
+    assert registry.get("v2").version == "v2"
+    with pytest.raises(KeyError):
+        registry.get("v3")
+
+
+def test_eviction_keeps_default_and_split(registry):
+    for version in ["v1", "v2", "v3"]:
+        registry.load(version, make_default=version == "v1")
+    registry.set_split({"v1": 0.5, "v2": 0.5})
+    registry.load("v4", make_default=False)
+    assert registry.versions() == ["v1", "v2", "v4"]
+
+
+def test_split_is_deterministic_per_key(registry):
+    registry.load("v1")
+    registry.load("v2", make_default=False)
+    registry.set_split({"v1": 3, "v2": 1})
+    assert registry.split == pytest.approx({"v1": 0.75, "v2": 0.25})
+    arms = [registry.get(key=f"00-{i:07d}").version for i in range(2000)]
+    assert arms == [registry.get(key=f"00-{i:07d}").version for i in range(2000)]
+    assert 0.7 < np.mean([a == "v1" for a in arms]) < 0.8
+    registry.set_split(None)
+    assert {registry.get(key=i).version for i in range(100)} == {"v1"}
+
+
+def test_split_rejects_unknown_versions(registry):
+    registry.load("v1")
+    with pytest.raises(KeyError):
+        registry.set_split({"v1": 0.5, "v9": 0.5})
+    with pytest.raises(ValueError):
+        registry.set_split({"v1": 0})
+    assert registry.split is None
+
+
+@pytest.mark.parametrize("weights", [{"v1": 2, "v2": -1}, {"v1": float("nan"), "v2": 1},
+                                     {"v1": float("inf"), "v2": 1}])
+def test_split_rejects_bad_weights(registry, weights):
+    registry.load("v1")
+    registry.load("v2", make_default=False)
+    with pytest.raises(ValueError):
+        registry.set_split(weights)
+    assert registry.split is None
+
+
+def test_unload_guards_default_and_split(registry):
+    registry.load("v1")
+    registry.load("v2", make_default=False)
+    registry.load("v3", make_default=False)
+    registry.set_split({"v1": 0.5, "v2": 0.5})
+    with pytest.raises(ValueError):
+        registry.unload("v1")
+    with pytest.raises(ValueError):
+        registry.unload("v2")
+    registry.unload("v3")
+    assert registry.versions() == ["v1", "v2"]
+
+
+@pytest.mark.parametrize("version", ["../v1", "..", ".", "", "a/b", "a\\b", "/tmp/v1"])
+def test_load_rejects_paths(registry, version):
+    with pytest.raises(ValueError):
+        registry.load(version)
+
+
+def test_load_refuses_other_feature_versions(registry, tmp_path):
+    old = dict(_bundle(1.0))
+    del old["feature_version"]      # bundles from before versions were recorded
+    save_bundle(old, tmp_path, version="old", make_current=False)
+    with pytest.raises(ValueError, match="feature version 1"):
+        registry.load("old")
+    assert registry.default_version is None
@@ -0,0 +1,76 @@
+import json
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.model_utils import (LEGACY_FEATURE_VERSION, SCHEMA_VERSION, LinearModel, TeamPriors,
+                             load_bundle, load_bundle_dir, save_bundle)
+
+
+@pytest.fixture(scope="module")
+def legacy():
+    """A bundle shaped like the old model_bundle.pkl: fitted Pipelines and a priors frame."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 2)) * [2, 5] + [1, -3]
+    pipes = [Pipeline([("sc", StandardScaler()), ("lr", Ridge(alpha=1.0))]).fit(X, X @ w)
+             for w in ([1.0, 0.5], [-0.2, 0.1])]
+    priors = pd.DataFrame({"team_touch_mean": [10.0, 12.0], "team_fppt_mean": [0.8, 1.1]},
+                          index=pd.Index(["ATL", "NYJ"], name="recent_team"))
+    return {"op_model": pipes[0], "eff_model": pipes[1], "priors_team": priors,
+            "global_touch": 11.0, "global_fppt": 0.9, "op_features": ["a", "b"],
+            "eff_features": ["a", "b"], "blend_k": 5}, X
+
+
+def test_round_trip(legacy, tmp_path):
+    bundle, X = legacy
+    save_bundle(bundle, tmp_path, version="v1")
+    manifest = json.loads((tmp_path / "v1" / "manifest.json").read_text())
+    assert manifest["schema_version"] == SCHEMA_VERSION
+    loaded = load_bundle(tmp_path)
+    assert loaded["version"] == "v1"
+    np.testing.assert_allclose(loaded["op_model"].predict(X), bundle["op_model"].predict(X))
+    np.testing.assert_allclose(loaded["eff_model"].predict(X), bundle["eff_model"].predict(X))
+    touch, fppt = loaded["priors"].lookup(["NYJ", "KC"], [2024, 2024])
+    np.testing.assert_allclose(touch, [12.0, 11.0])     # unknown teams get the global mean
+    np.testing.assert_allclose(fppt, [1.1, 0.9])
+    assert loaded["feature_version"] == LEGACY_FEATURE_VERSION
+
+
+def test_checksum_mismatch_is_refused(legacy, tmp_path):
+    out = save_bundle(legacy[0], tmp_path, version="v1")
+    np.save(out / "op_coef.npy", np.zeros(2))
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        load_bundle_dir(out)
+    assert not load_bundle_dir(out, verify=False)["op_model"].coef.any()
+
+
+def test_unknown_schema_is_refused(legacy, tmp_path):
+    out = save_bundle(legacy[0], tmp_path, version="v1")
+    manifest = json.loads((out / "manifest.json").read_text())
+    manifest["schema_version"] = 99
+    (out / "manifest.json").write_text(json.dumps(manifest))
+    with pytest.raises(ValueError, match="Unsupported bundle schema"):
+        load_bundle_dir(out)
+
+
+def test_legacy_pickle_fallback(legacy, tmp_path):
+    bundle, X = legacy
+    with open(tmp_path / "model_bundle.pkl", "wb") as f:
+        pickle.dump(bundle, f)
+    loaded = load_bundle(tmp_path)       # no CURRENT: the pickle is read
+    assert loaded["version"] == "legacy"
+    assert loaded["feature_version"] == LEGACY_FEATURE_VERSION
+    assert isinstance(loaded["op_model"], LinearModel)
+    np.testing.assert_allclose(loaded["op_model"].predict(X), bundle["op_model"].predict(X))
+    priors = TeamPriors.from_frame(loaded["priors_team"], 11.0, 0.9)
+    assert priors.lookup(["ATL"], [2024])[0][0] == 10.0
+
+    # Converting it keeps its (old) feature version, and CURRENT then wins over the pickle
+    save_bundle(loaded, tmp_path, version="converted")
+    assert load_bundle(tmp_path)["version"] == "converted"
+    assert load_bundle(tmp_path)["feature_version"] == LEGACY_FEATURE_VERSION
@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from src.chat_utils import extract_prediction_requests
+from src.player_index import PlayerIndex, build_player_index, normalize
+
+BIJAN, BREECE, ROBINSON_OLD, AMON_RA = "00-0038542", "00-0037744", "00-0030001", "00-0036963"
+
+
+@pytest.fixture(scope="module")
+def index():
+    weekly = pd.DataFrame({
+        "player_id": [BIJAN, BREECE, ROBINSON_OLD, AMON_RA],
+        "player_name": ["B.Robinson", "B.Hall", "A.Robinson", "A.St. Brown"],
+        "player_display_name": ["Bijan Robinson", "Breece Hall", "Allen Robinson II",
+                                "Amon-Ra St. Brown"],
+        "recent_team": ["ATL", "NYJ", "PIT", "DET"],
+        "position": ["RB", "RB", "WR", "WR"],
+        "season": [2024, 2024, 2022, 2024],
+        "week": [5, 5, 17, 5],
+    })
+    rosters = pd.DataFrame({"player_id": [AMON_RA], "football_name": ["Sun God"],
+                            "first_name": ["Amon-Ra"], "last_name": ["St. Brown"]})
+    return PlayerIndex.from_frames(weekly, rosters)
+
+
+def _id(player):
+    return None if player is None else player.player_id
+
+
+def test_normalize():
+    assert normalize("Amon-Ra St. Brown") == "amon ra st brown"
+    assert normalize("Allen Robinson II") == "allen robinson"
+    assert normalize("José  Núñez Jr.") == "jose nunez"
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Bijan Robinson", BIJAN),          # full name
+    ("bijan", BIJAN),                   # first name
+    ("B. Robinson", BIJAN),             # abbreviated
+    ("robinson", BIJAN),                # ties go to the most recent season
+    ("Allen Robinson", ROBINSON_OLD),
+    ("Sun God", AMON_RA),               # roster nickname
+    ("St. Brown", AMON_RA),
+    ("Bre", BREECE),                    # prefix
+    ("Bijon Robinsen", BIJAN),          # typos: trigram fuzzy match
+    ("Brece Hal", BREECE),
+    ("Patrick Mahomes", None),
+])
+def test_resolve(index, query, expected):
+    assert _id(index.resolve(query)) == expected
+
+
+def test_resolve_filters(index):
+    assert _id(index.resolve("robinson", position="WR")) == ROBINSON_OLD
+    assert _id(index.resolve("robinson", team="NYJ")) is None
+
+
+def test_fuzzy_ranks_closest_first(index):
+    assert [p.player_id for p in index.fuzzy("breece hal")][:1] == [BREECE]
+    assert index.fuzzy("zzz") == []
+
+
+def test_chat_names(index):
+    found = extract_prediction_requests("Bijan vs Breece Hall week 5", index, default_season=2024)
+    assert [(r["player_id"], r["player_name"]) for r in found] == [
+        (BIJAN, "Bijan Robinson"), (BREECE, "Breece Hall")]
+    # Ordinary words never fuzzy-match a name
+    assert extract_prediction_requests("How did the season go?", index, default_season=2024) == []
+    assert extract_prediction_requests("predict the sun god week 3", index,
+                                       default_season=2024)[0]["player_id"] == AMON_RA
+
+
+def test_build_from_cache(synthetic_cache, seasons):
+    built = build_player_index(seasons + [2001])         # a missing season is skipped
+    first = synthetic_cache.iloc[0]
+    assert _id(built.resolve(first["player_display_name"])) == first["player_id"]
+    with pytest.raises(FileNotFoundError):
+        build_player_index([2001])
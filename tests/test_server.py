@@ -0,0 +1,155 @@
+import pytest
+
+
+@pytest.fixture(scope="module")
+def keys(synthetic_cache, seasons):
+    """A few (player_id, season, week) keys from the middle of a finished season."""
+    rows = synthetic_cache[(synthetic_cache["season"] == seasons[1])
+                           & (synthetic_cache["week"] == 8)].head(5)
+    return [(str(r.player_id), int(r.season), int(r.week)) for r in rows.itertuples()]
+
+
+def _item(key):
+    return {"player_id": key[0], "season": key[1], "week": key[2]}
+
+
+def test_single_and_batch_agree(client, keys):
+    batch = client.post("/predict/batch", json={"items": [_item(k) for k in keys]})
+    assert batch.status_code == 200
+    for key, item in zip(keys, batch.json()["predictions"]):
+        single = client.post("/predict", json=_item(key)).json()
+        assert item["error"] is None
+        assert item["expected_points"] == pytest.approx(single["expected_points"], rel=1e-12)
+        assert item["model_version"] == single["model_version"]
+
+
+def test_batch_reports_errors_per_item(client, synthetic_cache, keys, seasons):
+    # A player's first game has no rolling history yet
+    first = synthetic_cache.sort_values(["season", "week"]).iloc[0]
+    first_game = (str(first["player_id"]), int(first["season"]), int(first["week"]))
+    items = [_item(keys[0]), _item(("00-9999999", seasons[1], 8)), _item((keys[0][0], 2001, 8)),
+             _item(first_game)]
+    got = client.post("/predict/batch", json={"items": items}).json()["predictions"]
+    assert got[0]["error"] is None
+    assert got[1]["error"] == got[2]["error"] == "No data for that player/season/week"
+    assert got[1]["expected_points"] is None
+    assert got[3]["error"].startswith("Missing required features")
+    assert client.post("/predict", json=_item(first_game)).status_code == 400
+
+
+def test_single_predict_errors(client, keys, seasons):
+    assert client.post("/predict", json=_item(("00-9999999", seasons[1], 8))).status_code == 404
+    assert client.post("/predict", json=_item((keys[0][0], 2001, 8))).status_code == 404
+    assert client.post("/predict", json=dict(_item(keys[0]), model_version="nope")).status_code == 404
+
+
+def test_week_scores_every_player(client, synthetic_cache, seasons):
+    got = client.post("/predict/week", json={"season": seasons[1], "week": 8}).json()["predictions"]
+    week = synthetic_cache[(synthetic_cache["season"] == seasons[1]) & (synthetic_cache["week"] == 8)]
+    assert sorted(p["player_id"] for p in got) == sorted(week["player_id"].astype(str))
+    assert all(p["expected_points"] is not None for p in got if p["error"] is None)
+    assert client.post("/predict/week", json={"season": 2001, "week": 8}).status_code == 404
+
+
+def test_etag_revalidates_until_the_model_changes(client, keys):
+    from src.model_utils import load_bundle_dir, save_bundle
+    from src.server import registry, result_cache
+    first = client.post("/predict", json=_item(keys[0]))
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+    again = client.post("/predict", json=_item(keys[0]), headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["etag"] == etag
+    assert len(result_cache) > 0
+
+    # A hot swap clears cached results and changes every ETag, even for the same numbers
+    old = registry.default_version
+    save_bundle(load_bundle_dir(registry.models_dir / old), registry.models_dir,
+                "20000101T000000Z", make_current=False)
+    try:
+        registry.load("20000101T000000Z")
+        assert len(result_cache) == 0
+        swapped = client.post("/predict", json=_item(keys[0]), headers={"If-None-Match": etag})
+        assert swapped.status_code == 200 and swapped.headers["etag"] != etag
+        assert swapped.json()["model_version"] == "20000101T000000Z"
+        assert swapped.json()["expected_points"] == first.json()["expected_points"]
+    finally:
+        registry.load(old)
+        registry.unload("20000101T000000Z")
+
+
+def test_project_season(client, synthetic_cache, seasons):
+    season = seasons[-1]
+    week = synthetic_cache[synthetic_cache["season"] == season]
+    body = {"season": season, "from_week": 12, "sims": 200, "seed": 3}
+    got = client.post("/project/season", json=body)
+    assert got.status_code == 200
+    out = got.json()
+    assert out["from_week"] == 12 and out["through_week"] == 18
+    assert out == client.post("/project/season", json=body).json()
+    assert len(out["projections"]) == week.loc[week["week"] < 12, "player_id"].nunique()
+
+    one = out["projections"][0]["player_id"]
+    some = client.post("/project/season", json=dict(body, player_ids=[one], through_week=14))
+    assert [p["player_id"] for p in some.json()["projections"]] == [one]
+    assert some.json()["through_week"] == 14
+
+    # from_week defaults to the week after the latest with data: none left here
+    done = client.post("/project/season", json={"season": season})
+    assert done.status_code == 400
+    assert f"from_week {int(week['week'].max()) + 1}" in done.json()["detail"]
+
+
+def test_project_season_errors(client, seasons):
+    season = seasons[1]
+    assert client.post("/project/season", json={"season": season, "from_week": 10,
+                                                "through_week": 9}).status_code == 400
+    assert client.post("/project/season", json={"season": season, "sims": 0}).status_code == 400
+    assert client.post("/project/season", json={"season": season, "from_week": 5,
+                                                "player_ids": ["00-9999999"]}).status_code == 404
+    assert client.post("/project/season", json={"season": 2001}).status_code == 404
+
+
+def test_probes(client, monkeypatch):
+    import time
+    from src import server
+    assert client.get("/livez").json() == {"status": "ok"}
+    for _ in range(100):
+        ready = client.get("/readyz")
+        if ready.status_code == 200:
+            break
+        time.sleep(0.05)
+    assert ready.status_code == 200
+    assert ready.json()["status"] == "ready"
+    assert ready.json()["model_version"] == server.registry.default_version
+
+    monkeypatch.setitem(server.warmup, "data", False)
+    warming = client.get("/readyz")
+    assert warming.status_code == 503 and warming.json()["status"] == "warming"
+    assert client.get("/livez").status_code == 200
+
+
+def test_exports(client, synthetic_cache, seasons):
+    import json
+    import pyarrow as pa
+    season = seasons[1]
+    rows = synthetic_cache[synthetic_cache["season"] == season]
+
+    arrow = client.get(f"/export/predictions/{season}")
+    assert arrow.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(arrow.content).read_all()
+    assert table.num_rows == len(rows)
+    assert set(table.column_names) >= {"player_id", "week", "expected_points", "error"}
+
+    as_json = client.get(f"/export/predictions/{season}", headers={"Accept": "application/json"})
+    assert as_json.headers["content-type"] == "application/json"
+    assert json.loads(as_json.content) == table.to_pylist()
+
+    ndjson = client.get(f"/export/features/{season}", headers={"Accept": "application/x-ndjson"})
+    lines = ndjson.content.decode().splitlines()
+    assert len(lines) == len(rows)
+    assert {json.loads(lines[0])["season"]} == {season}
+
+    assert client.get(f"/export/features/{season}",
+                      headers={"Accept": "text/html"}).status_code == 406
+    assert client.get("/export/predictions/2001").status_code == 404
+    assert client.get(f"/export/predictions/{season}?model_version=nope").status_code == 404
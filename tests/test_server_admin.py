@@ -0,0 +1,43 @@
+import pytest
+
+import src.server as server
+
+ADMIN_ROUTES = [("get", "/admin/models"), ("post", "/admin/models/reload"),
+                ("post", "/admin/models/split"), ("delete", "/admin/models/v1"),
+                ("post", "/cache/refresh/2024")]
+
+
+@pytest.fixture
+def token(monkeypatch):
+    monkeypatch.setattr(server, "ADMIN_TOKEN", "s3cret")
+    return {"Authorization": "Bearer s3cret"}
+
+
+@pytest.mark.parametrize("method, path", ADMIN_ROUTES)
+def test_admin_disabled_without_token(client, monkeypatch, method, path):
+    monkeypatch.setattr(server, "ADMIN_TOKEN", None)
+    kwargs = {"json": {}} if method == "post" else {}
+    assert getattr(client, method)(path, **kwargs).status_code == 403
+
+
+@pytest.mark.parametrize("method, path", ADMIN_ROUTES)
+@pytest.mark.parametrize("header", [None, "Bearer wrong", "s3cret", "Basic s3cret"])
+def test_admin_needs_the_token(client, token, method, path, header):
+    headers = {"Authorization": header} if header else {}
+    kwargs = {"json": {}} if method == "post" else {}
+    assert getattr(client, method)(path, headers=headers, **kwargs).status_code == 401
+
+
+def test_admin_with_token(client, token):
+    models = client.get("/admin/models", headers=token).json()
+    version = models["default"]
+    assert client.post("/admin/models/reload", json={}, headers=token).json()["loaded"] == version
+    ok = client.post("/admin/models/split", json={"weights": {version: 1}}, headers=token)
+    assert ok.json()["split"] == {version: 1.0}
+    bad = client.post("/admin/models/split", json={"weights": {version: -1}}, headers=token)
+    assert bad.status_code == 400
+    unknown = client.post("/admin/models/split", json={"weights": {"nope": 1}}, headers=token)
+    assert unknown.status_code == 404
+    assert client.post("/admin/models/reload", json={"version": "../models"},
+                       headers=token).status_code == 400
+    client.post("/admin/models/split", json={}, headers=token)
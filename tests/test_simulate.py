@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from bench.synthetic import weekly_data
+from src.features import add_features
+from src.model_registry import LoadedModel
+from src.model_utils import load_bundle
+from src.simulate import simulate_rest_of_season
+
+
+@pytest.fixture(scope="module")
+def model(synthetic_cache):
+    return LoadedModel(load_bundle())
+
+
+@pytest.fixture(scope="module")
+def rows():
+    df = add_features(weekly_data([2023], n_players=60, seed=4))
+    return df[df["week"] <= 10]
+
+
+def test_seeded_runs_repeat(model, rows):
+    a = simulate_rest_of_season(model, rows, 18, n_sims=300, seed=7)
+    b = simulate_rest_of_season(model, rows, 18, n_sims=300, seed=7)
+    c = simulate_rest_of_season(model, rows, 18, n_sims=300, seed=8)
+    assert a.equals(b) and not a.equals(c)
+
+
+def test_summary(model, rows):
+    out = simulate_rest_of_season(model, rows, 18, n_sims=500, seed=0)
+    assert out.attrs["first_week"] == 11 and out.attrs["through_week"] == 18
+    assert sorted(out["player_id"]) == sorted(rows["player_id"].unique())
+    pct = out[out.attrs["percentiles"]].to_numpy()
+    assert (np.diff(pct, axis=1) >= 0).all()
+    assert (out["mean"] >= 0).all() and (out["std"] > 0).any()
+    # Eight more weeks outscore one
+    one = simulate_rest_of_season(model, rows, 11, n_sims=500, seed=0)
+    assert out["mean"].sum() > 4 * one["mean"].sum()
+
+
+def test_empty_range(model, rows):
+    out = simulate_rest_of_season(model, rows, 18, n_sims=50, seed=0, first_week=19)
+    assert (out["mean"] == 0).all() and (out["p90"] == 0).all()
@@ -0,0 +1,40 @@
+import pytest
+
+from bench.synthetic import weekly_data
+from src.features import add_features
+from src.train import DEFAULT_CONFIG
+from src.tune import search
+
+GRID = dict(alphas=[0.1, 10.0], blend_ks=[2], player_windows=[4], team_windows=[8])
+
+
+@pytest.fixture(scope="module")
+def featurized():
+    return add_features(weekly_data(range(2019, 2024), n_players=150, seed=2), (3, 4), (5, 8))
+
+
+def _key(r):
+    return r["op_alpha"], r["eff_alpha"], r["blend_k"], r["player_window"], r["team_window"]
+
+
+def test_grid_includes_defaults_and_is_sorted(featurized):
+    results = search(featurized, folds=2, workers=0, **GRID)
+    # {0.1, 1, 10} x {0.1, 1, 10} alphas, {2, 5} blend_k, {3, 4} x {5, 8} windows
+    assert len(results) == 3 * 3 * 2 * 2 * 2
+    scores = [r["score"] for r in results]
+    assert scores == sorted(scores)
+    defaults = tuple(DEFAULT_CONFIG[k] for k in
+                     ("op_alpha", "eff_alpha", "blend_k", "player_window", "team_window"))
+    assert defaults in {_key(r) for r in results}
+
+
+def test_samples_score_like_the_full_grid(featurized):
+    grid = {_key(r): r["score"] for r in search(featurized, folds=2, workers=0, **GRID)}
+    sampled = search(featurized, folds=2, samples=6, seed=1, workers=0, **GRID)
+    for r in sampled:
+        assert r["score"] == pytest.approx(grid[_key(r)], rel=1e-9)
+
+
+def test_needs_more_seasons_than_folds(featurized):
+    with pytest.raises(ValueError):
+        search(featurized, folds=5, workers=0, **GRID)